@@ -1,56 +1,62 @@
 import os
-import shutil
-import subprocess
-from flask import Flask, Response, json
+from flask import Flask, g, request
 from flask_cors import CORS
 from flask_restx import Api
 
-from controllers.admin_controller import bp as admin_bp
-from controllers.entity_controller import bp as entity_bp
-from controllers.data_controller import bp as data_bp
-from controllers.health_controller import bp as health_check_bp
+from instrumentation import begin_request, end_request, metrics
+from migrate_db import init_database
+from profiler import profiler
+from serialization import output_json
 
-# Helper functions
-def to_camel_case(snake_str):
-    parts = snake_str.split('_')
-    return parts[0] + ''.join(word.capitalize() for word in parts[1:])
+# Swagger UI on /docs; its spec is only built when first requested
+API_DOCS = os.environ.get("API_DOCS", "1") == "1"
+# Socket.IO change feed (realtime.py); set to 0 to serve HTTP only
+CHANGE_FEED = os.environ.get("CHANGE_FEED", "1") == "1"
 
-def convert_keys_to_camel_case(obj):
-    if isinstance(obj, list):
-        return [convert_keys_to_camel_case(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {to_camel_case(k): convert_keys_to_camel_case(v) for k, v in obj.items()}
-    else:
-        return obj
 
 def create_app():
+    # Imported here so that `import app` (e.g. for init_database) stays cheap
+    from controllers.admin_controller import bp as admin_bp
+    from controllers.entity_controller import bp as entity_bp
+    from controllers.data_controller import bp as data_bp
+    from controllers.health_controller import bp as health_check_bp
+    from services.codec_service import migrations
+
     app = Flask(__name__)
     CORS(app)
 
-    # Path to your database file
-    DB_FILE = "metadata.db"
-
-    # Determine which python command is available
-    python_cmd = shutil.which("python3") or shutil.which("python")
-    if not python_cmd:
-        raise RuntimeError("No Python interpreter found!")
-
-    # Check if the database exists
-    if not os.path.exists(DB_FILE):
-        print(f"{DB_FILE} not found. Initializing database and seeding data...")
-        # Run init.db.py
-        subprocess.run([python_cmd, "init_db.py"], check=True)
-        # Run seed_data.py
-        subprocess.run([python_cmd, "seed_data.py"], check=True)
-        print("Database created and seeded!")
+    init_database()
+    # Finish codec migrations interrupted by a restart
+    migrations.resume()
 
     # Your existing Flask routes
     @app.route("/")
     def home():
         return "Hello, Flask is running!"
 
+    # Per-request timings: Server-Timing header, /health/metrics, slow request profiles
+    @app.before_request
+    def start_timing():
+        g.timing_token = begin_request()
+        g.profile = profiler.start_request()
+
+    @app.after_request
+    def finish_timing(response):
+        timings = end_request(g.timing_token)
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        seconds = timings.elapsed()
+        metrics.observe_request(endpoint, request.method, response.status_code, seconds)
+        response.headers["Server-Timing"] = timings.server_timing()
+        profile = profiler.end_request(g.profile, f"{request.method} {endpoint}", seconds)
+        if profile:
+            app.logger.warning("Slow request %s %s (%.0f ms), profile: %s",
+                               request.method, request.path, seconds * 1000, profile)
+        return response
+
     # Swagger API
-    api = Api(app, doc="/docs")
+    api = Api(app, doc="/docs" if API_DOCS else False)
+    # camelCase keys while serializing, instead of re-parsing every response
+    api.representation("application/json")(output_json)
 
     # Add namespaces
     api.add_namespace(admin_bp, path="/api/admin/entities")
@@ -58,21 +64,18 @@ def create_app():
     api.add_namespace(data_bp, path="/api/data")
     api.add_namespace(health_check_bp, path="/health")
 
-    # After request hook - must be registered **after app is created**
-    @app.after_request
-    def camel_case_response(response: Response):
-        try:
-            if response.content_type == "application/json":
-                data = json.loads(response.get_data())
-                camel_data = convert_keys_to_camel_case(data)
-                response.set_data(json.dumps(camel_data))
-        except Exception:
-            pass
-        return response
+    # Record / metadata change notifications on /socket.io
+    if CHANGE_FEED:
+        from realtime import init_socketio
+        init_socketio(app)
 
     return app
 
 if __name__ == "__main__":
     app = create_app()
-    app.run(host="0.0.0.0", port=5050, debug=True)
+    socketio = app.extensions.get("socketio")
+    if socketio:
+        socketio.run(app, host="0.0.0.0", port=5050, debug=True, allow_unsafe_werkzeug=True)
+    else:
+        app.run(host="0.0.0.0", port=5050, debug=True)
 
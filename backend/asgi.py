@@ -0,0 +1,662 @@
+# asgi.py
+"""
+ASGI entry point: the admin, entity, data and health routes of app.py on
+FastAPI with async handlers.
+
+    uvicorn asgi:app --port 5050
+
+The services are shared with the Flask app. Handlers run them through
+`run_db`, which drives their SQLAlchemy calls on the aiosqlite driver from
+a greenlet, so a slow query awaits instead of holding a worker thread.
+Outbound option lookups (blocking HTTP) run in the threadpool. The
+change feed is served on /socket.io by python-socketio in front of the
+FastAPI app.
+"""
+import os
+
+# Must be set before db.py is imported (directly or through a service)
+os.environ["DB_ASYNC"] = "1"
+
+import asyncio
+import json
+import socketio
+import tempfile
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from sqlalchemy.util import greenlet_spawn
+from starlette.concurrency import run_in_threadpool
+from werkzeug.http import parse_etags, quote_etag
+
+from controllers.data_controller import CSV_TYPES, NDJSON_TYPES, PAGING_ARGS
+from controllers.etag import CACHE_CONTROL, make_etag
+from instrumentation import begin_request, end_request, metrics, timed
+from migrate_db import init_database
+from realtime import asgi_socketio, listen
+from serialization import to_wire
+from services.aggregate_service import AggregateService
+from services.bootstrap_service import SECTIONS, BootstrapService
+from services.bulk_service import IMPORT_BATCH_SIZE, WRITE_CHUNK_SIZE, BulkService
+from services.change_feed import change_feed
+from services.codec_service import CODECS, CodecService, migrations
+from services.column_store import column_store
+from services.entity_service import EntityService
+from services.metadata_cache import metadata_cache
+from services.options_cache import options_cache
+from services.options_service import OptionsError, OptionsService, OptionsUnresolved
+from services.record_service import RecordService
+from services.revision_service import RevisionService
+from services.search_service import SearchService
+from services.validation_service import ValidationError
+from services.write_queue import write_queue
+
+# Request bodies above this size are spooled to disk during bulk imports
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+# Socket.IO change feed, as in app.py; set to 0 to serve HTTP only
+CHANGE_FEED = os.environ.get("CHANGE_FEED", "1") == "1"
+
+
+async def run_db(fn, *args, **kwargs):
+    """Run synchronous service code against the async engine."""
+    return await greenlet_spawn(fn, *args, **kwargs)
+
+
+async def iterate_db(gen):
+    """Async view of a service generator that queries between items."""
+    done = object()
+    while True:
+        item = await run_db(next, gen, done)
+        if item is done:
+            return
+        yield item
+
+
+# -----------------------------
+# Responses
+# -----------------------------
+def wire_json(data, status: int = 200, headers: dict = None) -> Response:
+    """camelCase + serialize once, same as serialization.output_json."""
+    with timed("serialize"):
+        body = json.dumps(to_wire(data), sort_keys=True) + "\n"
+    return Response(body, status_code=status, media_type="application/json", headers=headers)
+
+
+def error(message: str, status: int, **extra) -> Response:
+    return wire_json({"error": message, **extra}, status)
+
+
+def is_fresh(request: Request, tag: str) -> bool:
+    return parse_etags(request.headers.get("if-none-match")).contains(tag)
+
+
+def not_modified(tag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": quote_etag(tag), "Cache-Control": CACHE_CONTROL})
+
+
+def with_etag(data, tag: str) -> Response:
+    return wire_json(data, headers={"ETag": quote_etag(tag), "Cache-Control": CACHE_CONTROL})
+
+
+async def json_object(request: Request):
+    """The request body if it is a JSON object, else None."""
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def split_arg(value):
+    return [v for v in (value or "").split(",") if v] or None
+
+
+async def entity_metadata(request: Request, entity_id: str, not_found: str) -> Response:
+    if request.headers.get("if-none-match"):
+        rev = await run_db(RevisionService.metadata, entity_id)
+        if rev is not None and is_fresh(request, make_etag("m", rev)):
+            return not_modified(make_etag("m", rev))
+
+    meta = await run_db(EntityService.get_full_wire, entity_id)
+    if not meta:
+        return error(not_found, 404)
+    return with_etag(meta, make_etag("m", meta["revision"]))
+
+
+# -----------------------------
+# Admin
+# -----------------------------
+admin = APIRouter(prefix="/api/admin/entities", tags=["admin/entities"])
+
+
+@admin.get("")
+async def admin_list(request: Request):
+    """Return full metadata for all entities"""
+    tag = make_etag("m", await run_db(RevisionService.current))
+    if is_fresh(request, tag):
+        return not_modified(tag)
+    return with_etag(await run_db(EntityService.list_full, wire=True), tag)
+
+
+@admin.post("")
+async def admin_create(request: Request):
+    """Create entity with full definition"""
+    payload = await request.json()
+    await run_db(EntityService.create_full, payload)
+    return wire_json({"id": payload["id"]}, 201)
+
+
+@admin.get("/{entity_id}")
+async def admin_get(request: Request, entity_id: str):
+    return await entity_metadata(request, entity_id, "Not found")
+
+
+@admin.put("/{entity_id}")
+async def admin_update(request: Request, entity_id: str):
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Not found", 404)
+    await run_db(EntityService.update_full, entity_id, await request.json())
+    return wire_json({"status": "ok"})
+
+
+@admin.delete("/{entity_id}")
+async def admin_delete(entity_id: str):
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Not found", 404)
+    await run_db(EntityService.delete, entity_id)
+    return Response(status_code=204)
+
+
+@admin.get("/{entity_id}/codec")
+async def admin_codec(entity_id: str):
+    """Storage codec, layout and stored size of an entity's rows"""
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Not found", 404)
+    return wire_json(to_wire(await run_db(CodecService.info, entity_id)))
+
+
+@admin.put("/{entity_id}/codec")
+async def admin_codec_migrate(request: Request, entity_id: str):
+    """Migrate an entity's rows to another storage codec in the background; GET reports progress"""
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Not found", 404)
+    body = await json_object(request)
+    if body is None:
+        return error("Expected a JSON object", 400)
+    target = body.get("codec")
+    if target not in CODECS:
+        return error(f"Expected codec to be one of: {', '.join(CODECS)}", 400)
+
+    entity = await run_db(EntityService.get_full, entity_id)
+    await run_db(migrations.start, entity_id, target, [f["name"] for f in entity["fields"]])
+    return wire_json(to_wire(await run_db(CodecService.info, entity_id)), 202)
+
+
+# -----------------------------
+# Runtime metadata
+# -----------------------------
+entity = APIRouter(prefix="/api/entity", tags=["entity_meta"])
+
+
+@entity.get("/")
+async def entity_list(request: Request):
+    """List entities available to the frontend, with summary counts"""
+    version = await run_db(RevisionService.snapshot)
+    tag = make_etag("l", *version)
+    if is_fresh(request, tag):
+        return not_modified(tag)
+    return with_etag(await run_db(EntityService.list, version), tag)
+
+
+@entity.get("/{entity_id}")
+async def entity_get(request: Request, entity_id: str):
+    """Get full metadata for a single entity"""
+    return await entity_metadata(request, entity_id, "Entity not found")
+
+
+@entity.get("/{entity_id}/options")
+async def entity_options(request: Request, entity_id: str):
+    """Option lists for a form in one round trip"""
+    values = dict(request.query_params)
+    names = split_arg(values.pop("fields", None))
+
+    meta = await run_db(EntityService.get_full, entity_id)
+    if not meta:
+        return error("Entity not found", 404)
+    options = await run_in_threadpool(
+        OptionsService.options_for, meta, values, set(names) if names else None
+    )
+    return wire_json(options)
+
+
+@entity.get("/{entity_id}/options/{field}")
+async def field_options(request: Request, entity_id: str, field: str):
+    """Options for one select / dynamic-select field"""
+    meta = await run_db(EntityService.get_full, entity_id)
+    if not meta:
+        return error("Field not found", 404)
+    try:
+        options = await run_in_threadpool(
+            OptionsService.options_for_field, meta, field, dict(request.query_params)
+        )
+    except OptionsUnresolved as e:
+        return error(str(e), 404, optionsAPI=e.url)
+    except OptionsError as e:
+        return error(str(e), 502)
+    if options is None:
+        return error("Field not found", 404)
+    return wire_json(options)
+
+
+@entity.get("/{entity_id}/bootstrap")
+async def entity_bootstrap(request: Request, entity_id: str):
+    """Open a form / grid in one round trip"""
+    args = request.query_params
+    include = split_arg(args.get("include"))
+    fields = split_arg(args.get("fields"))
+    try:
+        page = {
+            "limit": int(args["limit"]) if args.get("limit") else None,
+            "sort": args.get("sort"),
+            "filters": json.loads(args["filter"]) if args.get("filter") else None,
+            "start_row": 0,
+        }
+        # Option sources are slow HTTP calls: keep them off the event loop
+        result = await run_db(BootstrapService.get, entity_id, include, fields, page, with_options=False)
+        if result is None:
+            return error("Entity not found", 404)
+        if "options" in (include or SECTIONS):
+            meta = await run_db(EntityService.get_full, entity_id)
+            names = BootstrapService.option_fields(meta, fields)
+            result["options"] = await run_in_threadpool(OptionsService.options_for, meta, {}, names)
+    except ValueError as e:
+        return error(str(e), 400)
+    return wire_json(result)
+
+
+# -----------------------------
+# Records
+# -----------------------------
+data = APIRouter(prefix="/api/data", tags=["user_records"])
+
+
+@data.get("/{entity_id}")
+async def record_list(request: Request, entity_id: str):
+    """
+    List records for an entity: the full list without paging arguments,
+    a single keyset page with any of them.
+    """
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+
+    tag = make_etag("r", await run_db(RevisionService.rows, entity_id))
+    if is_fresh(request, tag):
+        return not_modified(tag)
+
+    args = request.query_params
+    if not any(a in args for a in PAGING_ARGS):
+        return with_etag(await run_db(RecordService.list, entity_id), tag)
+
+    try:
+        page = await run_db(
+            RecordService.list_page,
+            entity_id,
+            limit=int(args["limit"]) if args.get("limit") else None,
+            cursor=args.get("cursor"),
+            sort=args.get("sort"),
+            filters=json.loads(args["filter"]) if args.get("filter") else None,
+            start_row=int(args["start_row"]) if args.get("start_row") else None,
+        )
+    except ValueError as e:
+        return error(str(e), 400)
+    return with_etag(page, tag)
+
+
+@data.post("/{entity_id}")
+async def record_create(request: Request, entity_id: str):
+    """Create a record for an entity"""
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+    try:
+        return wire_json(await run_db(RecordService.create, entity_id, await request.json()))
+    except ValidationError as e:
+        return error(str(e), 400, errors=e.errors)
+
+
+@data.patch("/{entity_id}")
+async def record_patch_many(request: Request, entity_id: str):
+    """
+    Merge-patch (RFC 7396) many records in one transaction.
+    Body: [{"id": record id, "data": patch}, ...]; returns the patched records.
+    """
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+    try:
+        return wire_json({"rowData": await run_db(RecordService.patch, entity_id, await request.json())})
+    except ValidationError as e:
+        return error(str(e), 400, errors=e.errors)
+    except ValueError as e:
+        return error(str(e), 400)
+
+
+async def _spool(request: Request):
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    async for chunk in request.stream():
+        body.write(chunk)
+    body.seek(0)
+    return body
+
+
+@data.post("/{entity_id}/import")
+async def record_import(request: Request, entity_id: str):
+    """
+    Bulk import records from an NDJSON or CSV request body; streams back
+    one NDJSON progress report per committed batch.
+    """
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+
+    mimetype = request.headers.get("content-type", "").split(";")[0].strip()
+    if mimetype not in NDJSON_TYPES + CSV_TYPES:
+        return error("Expected an application/x-ndjson or text/csv body", 415)
+
+    body = await _spool(request)
+    if mimetype in NDJSON_TYPES:
+        records = BulkService.parse_ndjson(body)
+    else:
+        records = BulkService.parse_csv(entity_id, body)
+    try:
+        batch_size = max(1, int(request.query_params.get("batch_size", IMPORT_BATCH_SIZE)))
+    except ValueError:
+        # Same as Flask's type=int: an unparseable value falls back to the default
+        batch_size = IMPORT_BATCH_SIZE
+
+    async def progress():
+        try:
+            async for report in iterate_db(BulkService.import_rows(entity_id, records, batch_size)):
+                yield json.dumps(to_wire(report), sort_keys=True) + "\n"
+        finally:
+            body.close()
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+@data.post("/{entity_id}/bulk-delete")
+async def record_bulk_delete(request: Request, entity_id: str):
+    """
+    Delete records by id list and / or filter.
+    Body: {"ids": [...]} and / or {"filter": AG Grid filter model}; returns {deleted, chunks}.
+    """
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+    body = await json_object(request)
+    if body is None:
+        return error("Expected a JSON object", 400)
+    try:
+        chunk_size = int(request.query_params.get("chunk_size", WRITE_CHUNK_SIZE))
+        return wire_json(await run_db(
+            BulkService.delete_where, entity_id, body.get("ids"), body.get("filter"), chunk_size
+        ))
+    except ValueError as e:
+        return error(str(e), 400)
+
+
+@data.post("/{entity_id}/bulk-update")
+async def record_bulk_update(request: Request, entity_id: str):
+    """
+    Set field values (a merge patch) on records selected by id list and / or filter.
+    Body: {"set": {...}, "ids": [...], "filter": {...}}; returns {updated, chunks}.
+    """
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+    body = await json_object(request)
+    if body is None:
+        return error("Expected a JSON object", 400)
+    try:
+        chunk_size = int(request.query_params.get("chunk_size", WRITE_CHUNK_SIZE))
+        return wire_json(await run_db(
+            BulkService.update_where, entity_id, body.get("set"), body.get("ids"), body.get("filter"), chunk_size
+        ))
+    except ValidationError as e:
+        return error(str(e), 400, errors=e.errors)
+    except ValueError as e:
+        return error(str(e), 400)
+
+
+@data.get("/{entity_id}/export")
+async def record_export(request: Request, entity_id: str, format: str = "ndjson"):
+    """Stream all records of an entity, oldest first, as NDJSON or CSV"""
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+
+    if format == "csv":
+        body, mimetype = BulkService.export_csv(entity_id), "text/csv"
+    elif format == "ndjson":
+        body, mimetype = BulkService.export_ndjson(entity_id), "application/x-ndjson"
+    else:
+        return error(f"Unsupported format '{format}'", 400)
+
+    return StreamingResponse(
+        iterate_db(body),
+        media_type=mimetype,
+        headers={
+            "Content-Disposition": f'attachment; filename="{entity_id}.{format}"',
+        },
+    )
+
+
+@data.get("/{entity_id}/aggregate")
+async def record_aggregate(request: Request, entity_id: str):
+    """Grouped counts / sums / averages / extremes with footer totals"""
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+
+    tag = make_etag(
+        "g",
+        await run_db(RevisionService.rows, entity_id),
+        await run_db(RevisionService.metadata, entity_id),
+    )
+    if is_fresh(request, tag):
+        return not_modified(tag)
+
+    args = request.query_params
+    try:
+        result = await run_db(
+            AggregateService.aggregate,
+            entity_id,
+            group_by=[f for f in args.get("group_by", "").split(",") if f],
+            aggs=AggregateService.parse_aggs(args.get("agg")),
+            filters=json.loads(args["filter"]) if args.get("filter") else None,
+        )
+    except ValueError as e:
+        return error(str(e), 400)
+    return with_etag(result, tag)
+
+
+@data.get("/{entity_id}/search")
+async def record_search(request: Request, entity_id: str, q: str = ""):
+    """Full-text search over an entity's records, best match first"""
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+
+    tag = make_etag(
+        "s",
+        await run_db(RevisionService.rows, entity_id),
+        await run_db(RevisionService.metadata, entity_id),
+    )
+    if is_fresh(request, tag):
+        return not_modified(tag)
+
+    args = request.query_params
+    try:
+        page = await run_db(
+            SearchService.search,
+            entity_id,
+            q,
+            limit=int(args["limit"]) if args.get("limit") else None,
+            offset=int(args["offset"]) if args.get("offset") else None,
+        )
+    except ValueError as e:
+        return error(str(e), 400)
+    return with_etag(page, tag)
+
+
+@data.put("/{entity_id}/{record_id}")
+async def record_update(request: Request, entity_id: str, record_id: str):
+    """Update a record"""
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+    try:
+        return wire_json(await run_db(RecordService.update, entity_id, record_id, await request.json()))
+    except ValidationError as e:
+        return error(str(e), 400, errors=e.errors)
+
+
+@data.patch("/{entity_id}/{record_id}")
+async def record_patch(request: Request, entity_id: str, record_id: str):
+    """Merge-patch (RFC 7396) a record; keys set to null are removed"""
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+    patches = [{"id": record_id, "data": await request.json()}]
+    try:
+        records = await run_db(RecordService.patch, entity_id, patches)
+    except ValidationError as e:
+        return error(str(e), 400, errors=e.errors)
+    if not records:
+        return error("Record not found", 404)
+    return wire_json(records[0])
+
+
+@data.delete("/{entity_id}/{record_id}")
+async def record_delete(entity_id: str, record_id: str):
+    """Delete a record"""
+    entity_id = await run_db(EntityService.resolve_id, entity_id)
+    if not entity_id:
+        return error("Entity not found", 404)
+    return wire_json(await run_db(RecordService.delete, entity_id, record_id))
+
+
+# -----------------------------
+# Health
+# -----------------------------
+health = APIRouter(prefix="/health", tags=["health"])
+
+
+@health.get("/")
+async def health_check():
+    """API health check"""
+    return wire_json({"status": "ok"})
+
+
+@health.get("/cache")
+async def cache_stats():
+    """Metadata cache size and hit/miss counters"""
+    return wire_json(metadata_cache.stats())
+
+
+@health.get("/cache/options")
+async def options_cache_stats():
+    """Options cache size and hit/miss/coalescing counters"""
+    return wire_json(options_cache.stats())
+
+
+@health.get("/cache/columns")
+async def column_store_stats():
+    """Columnar aggregation cache size and hit/build counters"""
+    return wire_json(column_store.stats())
+
+
+@health.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Request, phase and row counters in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@health.get("/changes")
+async def change_feed_stats():
+    """Change feed listeners and published event counters"""
+    return wire_json(change_feed.stats())
+
+
+@health.get("/writes")
+async def write_queue_stats():
+    """Write batching (group commit) counters"""
+    return wire_json(write_queue.stats())
+
+
+# -----------------------------
+# App
+# -----------------------------
+def spawn_db(loop, tasks: set):
+    """Background runner for services (see MigrationRunner.spawn): fn() as a task on `loop`."""
+    def spawn(fn):
+        def create():
+            task = loop.create_task(run_db(fn))
+            # The loop only keeps weak references to tasks
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        loop.call_soon_threadsafe(create)
+    return spawn
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_db(init_database)
+    # Codec migrations run on the event loop, where the async engine can be driven
+    migrations.spawn = spawn_db(asyncio.get_running_loop(), set())
+    await run_db(migrations.resume)
+    sio = getattr(app.state, "sio", None)
+    unsubscribe = listen(sio) if sio else None
+    yield
+    if unsubscribe:
+        unsubscribe()
+
+
+def create_asgi_app():
+    app = FastAPI(lifespan=lifespan, docs_url="/docs", redirect_slashes=False)
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+
+    @app.middleware("http")
+    async def server_timing(request: Request, call_next):
+        token = begin_request()
+        try:
+            response = await call_next(request)
+        finally:
+            timings = end_request(token)
+        route = request.scope.get("route")
+        seconds = timings.elapsed()
+        metrics.observe_request(route.path if route else "unmatched", request.method,
+                                response.status_code, seconds)
+        response.headers["Server-Timing"] = timings.server_timing()
+        return response
+
+    @app.get("/", response_class=PlainTextResponse)
+    async def home():
+        return "Hello, FastAPI is running!"
+
+    for router in (admin, entity, data, health):
+        app.include_router(router)
+
+    # Record / metadata change notifications on /socket.io (realtime.py)
+    if CHANGE_FEED:
+        app.state.sio = asgi_socketio(run_db)
+        return socketio.ASGIApp(app.state.sio, other_asgi_app=app)
+    return app
+
+
+app = create_asgi_app()
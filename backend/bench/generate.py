@@ -0,0 +1,138 @@
+# backend/bench/generate.py
+"""Synthetic entities and rows for benchmark.py."""
+import json
+import random
+import sys
+import time
+from sqlalchemy import text
+from db import engine
+from services.entity_service import EntityService
+from services.revision_service import RevisionService
+
+ROW_BATCH_SIZE = 10_000
+
+FIELD_TYPES = ("text", "number", "date", "checkbox", "select", "text", "number")
+
+FIRST_NAMES = ("Ada", "Grace", "Alan", "Linus", "Margaret", "Ken", "Barbara", "Dennis",
+               "Frances", "John", "Radia", "Edsger", "Hedy", "Tim", "Sophie", "Guido")
+LAST_NAMES = ("Lovelace", "Hopper", "Turing", "Torvalds", "Hamilton", "Thompson", "Liskov",
+              "Ritchie", "Allen", "McCarthy", "Perlman", "Dijkstra", "Lamarr", "Berners-Lee")
+WORDS = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india",
+         "juliet", "kilo", "lima", "metro", "north", "oscar", "papa", "quartz", "river")
+STATUSES = ("draft", "active", "pending", "archived", "rejected", "approved")
+
+
+def entity_id(index: int) -> str:
+    return f"bench{index}"
+
+
+def entity_definition(index: int, n_fields: int, n_columns: int, n_indexed: int) -> dict:
+    """
+    create_full payload: `n_fields` typed fields (text fields searchable),
+    the first `n_columns` shown as columns.
+    """
+    fields = [{"name": "title", "label": "Title", "type": "text", "required": True,
+               "searchable": True, "sortOrder": 0}]
+    for i in range(1, n_fields):
+        ftype = FIELD_TYPES[i % len(FIELD_TYPES)]
+        field = {"name": f"{ftype}{i}", "label": f"{ftype.title()} {i}", "type": ftype,
+                 "searchable": ftype == "text", "sortOrder": i}
+        if ftype == "select":
+            field["config"] = {"options": [{"label": s.title(), "value": s} for s in STATUSES]}
+        fields.append(field)
+
+    columns = [
+        {
+            "headerName": f["label"],
+            "field": f["name"],
+            "indexed": i < n_indexed,
+            "sortOrder": i,
+        }
+        for i, f in enumerate(fields[:n_columns])
+    ]
+    return {
+        "id": entity_id(index),
+        "title": f"Benchmark {index}",
+        "api": f"/api/data/{entity_id(index)}",
+        "formType": "schema",
+        "fields": fields,
+        "columns": columns,
+        "actions": [],
+    }
+
+
+def make_row(fields: list, rng: random.Random) -> dict:
+    """A record that passes the entity's validation, with realistic value sizes."""
+    row = {}
+    for f in fields:
+        ftype, name = f["type"], f["name"]
+        if ftype == "text":
+            if name == "title":
+                row[name] = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            elif rng.random() < 0.3:
+                row[name] = f"{rng.choice(WORDS)}.{rng.choice(WORDS)}@example.com"
+            else:
+                row[name] = " ".join(rng.choices(WORDS, k=rng.randint(1, 8)))
+        elif ftype == "number":
+            row[name] = round(rng.uniform(0, 10_000), rng.choice((0, 2)))
+        elif ftype == "date":
+            row[name] = f"20{rng.randint(10, 29)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        elif ftype == "checkbox":
+            row[name] = rng.random() < 0.5
+        elif ftype == "select":
+            row[name] = rng.choice(STATUSES)
+    return row
+
+
+def _row_count(entity: str) -> int:
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT COUNT(*) FROM entity_rows WHERE entity_id = :eid"),
+            {"eid": entity},
+        ).scalar()
+
+
+def generate(n_entities: int, n_fields: int, n_columns: int, n_indexed: int,
+             n_rows: int, seed: int = 42) -> list:
+    """
+    Create the synthetic entities (through EntityService, like the admin UI
+    does) and top their rows up to `n_rows` with batched inserts. Entities
+    and rows that already exist are reused. Returns the entity ids.
+    """
+    rng = random.Random(seed)
+    ids = []
+    for index in range(n_entities):
+        definition = entity_definition(index, n_fields, n_columns, n_indexed)
+        eid = definition["id"]
+        if EntityService.get_full(eid) is None:
+            EntityService.create_full(definition)
+        ids.append(eid)
+
+        missing = n_rows - _row_count(eid)
+        if missing <= 0:
+            continue
+
+        fields = definition["fields"]
+        started = time.perf_counter()
+        inserted = 0
+        while inserted < missing:
+            size = min(ROW_BATCH_SIZE, missing - inserted)
+            batch = [
+                {"eid": eid, "data": json.dumps(make_row(fields, rng))}
+                for _ in range(size)
+            ]
+            with engine.begin() as conn:
+                conn.execute(
+                    text("INSERT INTO entity_rows (entity_id, data) VALUES (:eid, :data)"),
+                    batch,
+                )
+                RevisionService.bump_rows(conn, eid, size)
+            inserted += size
+            print(f"\r  {eid}: {inserted}/{missing} rows", end="", file=sys.stderr, flush=True)
+        elapsed = time.perf_counter() - started
+        print(f"\r  {eid}: {missing} rows in {elapsed:.1f}s ({missing / elapsed:,.0f} rows/s)",
+              file=sys.stderr)
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    return ids
@@ -0,0 +1,288 @@
+# backend/bench/runner.py
+"""Timing, reporting and the operation list for benchmark.py."""
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from sqlalchemy import text
+
+from app import create_app
+from bench.generate import LAST_NAMES, WORDS, entity_definition, generate, make_row
+from db import DB_FILE, read_engine
+from services.aggregate_service import AggregateService
+from services.bulk_service import BulkService
+from services.entity_service import EntityService
+from services.metadata_cache import metadata_cache
+from services.record_service import RecordService
+from services.revision_service import RevisionService
+from services.search_service import SearchService
+
+RESULTS_DIR = "bench_results"
+
+# Full scans are far slower than everything else; keep their runs short
+SLOW_ITERATIONS = 3
+
+# Cold start of a worker: fresh interpreter, import app, create_app()
+STARTUP_SCRIPT = "import app; app.create_app()"
+# Budget for its p50 that CI holds it to (--startup-budget-ms, tests/test_startup.py)
+STARTUP_BUDGET_MS = 800
+
+
+# -----------------------------
+# Measuring
+# -----------------------------
+def _percentile(sorted_values: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _peak_memory_kb(fn) -> float:
+    """Peak Python heap allocated during one call, in KiB."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def measure(fn, iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+
+    timings.sort()
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "iterations": iterations,
+        "mean_ms": ms(sum(timings) / len(timings)),
+        "p50_ms": ms(_percentile(timings, 50)),
+        "p90_ms": ms(_percentile(timings, 90)),
+        "p99_ms": ms(_percentile(timings, 99)),
+        "max_ms": ms(timings[-1]),
+        "ops_per_sec": round(iterations / total, 1) if total else None,
+        # Measured on a separate call, tracemalloc slows everything down
+        "peak_kb": _peak_memory_kb(fn),
+    }
+
+
+# -----------------------------
+# Operations
+# -----------------------------
+def _id_range(entity_id: str):
+    with read_engine.connect() as conn:
+        return conn.execute(
+            text("SELECT MIN(id), MAX(id) FROM entity_rows WHERE entity_id = :eid"),
+            {"eid": entity_id},
+        ).one()
+
+
+def operations(args, entity_ids: list, client) -> list:
+    """(name, callable, iterations or None for --iterations) per operation."""
+    rng = random.Random(args.seed)
+    eid = entity_ids[0]
+    definition = entity_definition(0, args.fields, args.columns, args.indexed)
+    fields = definition["fields"]
+    columns = [c["field"] for c in definition["columns"]]
+    indexed = columns[min(args.indexed, len(columns)) - 1] if args.indexed else None
+    plain = columns[-1]
+    select = next((f["name"] for f in fields if f["type"] == "select" and f["name"] in columns), None)
+    low, high = _id_range(eid)
+    if low is None:
+        low = high = 0
+
+    created = []
+
+    def create():
+        created.append(RecordService.create(eid, make_row(fields, rng)))
+
+    def update():
+        record_id = rng.choice(created) if created else rng.randint(low, high)
+        RecordService.update(eid, record_id, make_row(fields, rng))
+
+    def patch(count: int):
+        # Single-cell edits: one field per record
+        def run():
+            ids = [rng.choice(created) if created else rng.randint(low, high) for _ in range(count)]
+            RecordService.patch(eid, [
+                {"id": record_id, "data": {plain: make_row(fields, rng).get(plain)}} for record_id in ids
+            ])
+        return run
+
+    def delete():
+        if created:
+            RecordService.delete(eid, created.pop())
+
+    def get_cold():
+        metadata_cache.invalidate(eid)
+        EntityService.get_full(eid)
+
+    def export():
+        for _ in BulkService.export_ndjson(eid):
+            pass
+
+    def startup():
+        subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], check=True,
+                       stdout=subprocess.DEVNULL, env=dict(os.environ, DB_FILE=DB_FILE))
+
+    entity_tag = {}
+
+    def http_entity_list_304():
+        if "tag" not in entity_tag:
+            entity_tag["tag"] = client.get("/api/entity/").headers["ETag"]
+        client.get("/api/entity/", headers={"If-None-Match": entity_tag["tag"]})
+
+    ops = [
+        ("startup.create_app", startup, SLOW_ITERATIONS),
+        ("entity.list", lambda: EntityService.list(RevisionService.snapshot()), None),
+        ("entity.list.uncached", lambda: EntityService.list(), None),
+        ("entity.get_full.warm", lambda: EntityService.get_full(eid), None),
+        ("entity.get_full.cold", get_cold, None),
+        ("entity.list_full", lambda: EntityService.list_full(wire=True), None),
+        ("record.get", lambda: RecordService.get(eid, rng.randint(low, high)), None),
+        ("record.list_page", lambda: RecordService.list_page(eid, limit=100), None),
+        ("record.list_page.sort_json", lambda: RecordService.list_page(eid, limit=100, sort=f"-{plain}"), None),
+    ]
+    if indexed:
+        ops.append((
+            "record.list_page.sort_indexed",
+            lambda: RecordService.list_page(eid, limit=100, sort=f"-{indexed}"),
+            None,
+        ))
+    if select:
+        ops.append((
+            "record.list_page.filter",
+            lambda: RecordService.list_page(
+                eid, limit=100,
+                filters={select: {"filterType": "text", "type": "equals", "filter": "active"}},
+            ),
+            None,
+        ))
+    number = next((f["name"] for f in fields if f["type"] == "number"), None)
+    if select and number:
+        ops.append((
+            "record.aggregate",
+            lambda: AggregateService.aggregate(eid, [select], [(number, "sum"), (plain, "count")]),
+            None,
+        ))
+    # Databases generated before fields were searchable have no index
+    if any(f.get("searchable") for f in EntityService.get_full(eid)["fields"]):
+        ops += [
+            ("record.search", lambda: SearchService.search(eid, rng.choice(WORDS), limit=50), None),
+            ("record.search.prefix",
+             lambda: SearchService.search(eid, rng.choice(LAST_NAMES)[:3], limit=50), None),
+        ]
+    ops += [
+        ("record.create", create, None),
+        ("record.update", update, None),
+        ("record.patch", patch(1), None),
+        ("record.patch.batch100", patch(100), None),
+        ("record.delete", delete, None),
+        ("bulk.count", lambda: BulkService.count(eid), None),
+        ("bulk.export_ndjson", export, SLOW_ITERATIONS),
+        ("http.entity_list", lambda: client.get("/api/entity/"), None),
+        ("http.entity_list.304", http_entity_list_304, None),
+        ("http.entity_meta", lambda: client.get(f"/api/entity/{eid}"), None),
+        ("http.record_page", lambda: client.get(f"/api/data/{eid}?limit=100"), None),
+        ("http.record_create", lambda: client.post(f"/api/data/{eid}", json=make_row(fields, rng)), None),
+    ]
+    return ops
+
+
+# -----------------------------
+# Reporting
+# -----------------------------
+def _git(*args) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _metadata(args) -> dict:
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD") or None,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "db_file": DB_FILE,
+        "config": {
+            k: getattr(args, k)
+            for k in ("entities", "fields", "columns", "indexed", "rows", "iterations", "warmup", "seed")
+        },
+    }
+
+
+def _print_table(results: dict, baseline: dict = None):
+    header = f"{'operation':32} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'ops/s':>10} {'peak KiB':>10}"
+    if baseline:
+        header += f" {'p50 Δ':>8} {'ops/s Δ':>8}"
+    print(header)
+    for name, r in results.items():
+        line = (f"{name:32} {r['p50_ms']:9.3f} {r['p90_ms']:9.3f} {r['p99_ms']:9.3f} "
+                f"{r['ops_per_sec'] or 0:10.1f} {r['peak_kb']:10.1f}")
+        before = (baseline or {}).get(name)
+        if before:
+            change = lambda new, old: f"{(new - old) / old * 100:+7.1f}%" if old else f"{'n/a':>8}"
+            line += f" {change(r['p50_ms'], before['p50_ms'])} {change(r['ops_per_sec'] or 0, before['ops_per_sec'] or 0)}"
+        print(line)
+
+
+def run(args) -> int:
+    print(f"Database: {DB_FILE}", file=sys.stderr)
+    app = create_app()
+    client = app.test_client()
+
+    print("Generating synthetic data...", file=sys.stderr)
+    entity_ids = generate(args.entities, args.fields, args.columns, args.indexed, args.rows, args.seed)
+
+    only = [p for p in (args.only or "").split(",") if p]
+    results = {}
+    for name, fn, iterations in operations(args, entity_ids, client):
+        if only and not any(name.startswith(p) for p in only):
+            continue
+        print(f"  {name}", file=sys.stderr)
+        results[name] = measure(fn, iterations or args.iterations, min(args.warmup, iterations or args.warmup))
+
+    report = {"meta": _metadata(args), "results": results}
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{report['meta']['commit'] or 'nogit'}-{stamp}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    _print_table(results, baseline)
+    print(f"Results saved to {output}", file=sys.stderr)
+
+    startup = results.get("startup.create_app")
+    if args.startup_budget_ms and startup and startup["p50_ms"] > args.startup_budget_ms:
+        print(f"Startup took {startup['p50_ms']:.0f} ms (p50), over the "
+              f"{args.startup_budget_ms:.0f} ms budget", file=sys.stderr)
+        return 1
+    return 0
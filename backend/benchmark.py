@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark the backend services and endpoints against synthetic data.
+
+Generates entities with many fields / columns and up to millions of
+entity_rows in a separate database, then times EntityService,
+RecordService, BulkService and the Flask endpoints (through the test
+client). Reports latency percentiles, throughput and peak Python memory
+per operation and saves them as JSON for comparison between commits.
+
+Usage:
+  python benchmark.py                              # defaults, temporary DB
+  python benchmark.py --rows 1000000 --db bench.db # keep the DB for reruns
+  python benchmark.py --only record. --iterations 500
+  python benchmark.py --compare bench_results/<previous>.json
+  python benchmark.py --only startup --startup-budget-ms 800   # CI startup check
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+# db.py reads DB_FILE at import time, so pick the database before any
+# service is imported (see main()).
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the backend services")
+    parser.add_argument("--db", help="Database file to generate into / reuse (default: temporary)")
+    parser.add_argument("--entities", type=int, default=3, help="Synthetic entities")
+    parser.add_argument("--fields", type=int, default=30, help="Fields per entity")
+    parser.add_argument("--columns", type=int, default=12, help="Grid columns per entity")
+    parser.add_argument("--indexed", type=int, default=2, help="Columns with an indexed projection")
+    parser.add_argument("--rows", type=int, default=100_000, help="entity_rows per entity")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per operation")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed calls per operation")
+    parser.add_argument("--only", help="Comma separated operation name prefixes to run")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for generated data")
+    parser.add_argument("--startup-budget-ms", type=float,
+                        help="Exit with status 1 if the startup.create_app p50 exceeds this")
+    parser.add_argument("--output", help="Result file (default: bench_results/<commit>-<time>.json)")
+    parser.add_argument("--compare", help="Previous result file to diff against")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.db:
+        os.environ["DB_FILE"] = os.path.abspath(args.db)
+    else:
+        tmp = tempfile.mkdtemp(prefix="bench-")
+        os.environ["DB_FILE"] = os.path.join(tmp, "bench.db")
+
+    from bench.runner import run
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,10 @@
 from flask_restx import Namespace, Resource
 from flask import request
+from controllers.etag import is_fresh, make_etag, not_modified, with_etag
+from serialization import to_wire
+from services.codec_service import CODECS, CodecService, migrations
 from services.entity_service import EntityService
+from services.revision_service import RevisionService
 
 bp = Namespace(
     "admin/entities",
@@ -11,7 +15,10 @@ bp = Namespace(
 class EntityList(Resource):
     def get(self):
         """Return full metadata for all entities"""
-        return EntityService.list_full(), 200
+        tag = make_etag("m", RevisionService.current())
+        if is_fresh(tag):
+            return not_modified(tag)
+        return with_etag(EntityService.list_full(wire=True), tag)
 
     def post(self):
         """Create entity with full definition"""
@@ -23,16 +30,57 @@ class EntityList(Resource):
 @bp.route("/<string:entity_id>")
 class Entity(Resource):
     def get(self, entity_id):
-        entity = EntityService.get_full(entity_id)
+        if request.if_none_match:
+            rev = RevisionService.metadata(entity_id)
+            if rev is not None and is_fresh(make_etag("m", rev)):
+                return not_modified(make_etag("m", rev))
+
+        entity = EntityService.get_full_wire(entity_id)
         if not entity:
             return {"error": "Not found"}, 404
-        return entity, 200
+        return with_etag(entity, make_etag("m", entity["revision"]))
 
     def put(self, entity_id):
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Not found"}, 404
         payload = request.json
         EntityService.update_full(entity_id, payload)
         return {"status": "ok"}, 200
 
     def delete(self, entity_id):
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Not found"}, 404
         EntityService.delete(entity_id)
         return "", 204
+
+
+@bp.route("/<string:entity_id>/codec")
+class EntityCodec(Resource):
+    def get(self, entity_id):
+        """Storage codec, layout and stored size of an entity's rows"""
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Not found"}, 404
+        return to_wire(CodecService.info(entity_id))
+
+    def put(self, entity_id):
+        """
+        Migrate an entity's rows to another storage codec ({"codec":
+        "json" | "positional"}). The entity switches at once and its rows
+        are converted in the background; GET reports the progress.
+        """
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Not found"}, 404
+        body = request.json
+        if not isinstance(body, dict):
+            return {"error": "Expected a JSON object"}, 400
+        target = body.get("codec")
+        if target not in CODECS:
+            return {"error": f"Expected codec to be one of: {', '.join(CODECS)}"}, 400
+
+        fields = [f["name"] for f in EntityService.get_full(entity_id)["fields"]]
+        migrations.start(entity_id, target, fields)
+        return to_wire(CodecService.info(entity_id)), 202
@@ -1,28 +1,283 @@
 from flask_restx import Namespace, Resource
-from flask import request
+from flask import Response, request, json, stream_with_context
+from controllers.etag import is_fresh, make_etag, not_modified, with_etag
+from serialization import to_wire
+from services.aggregate_service import AggregateService
+from services.bulk_service import IMPORT_BATCH_SIZE, WRITE_CHUNK_SIZE, BulkService
+from services.entity_service import EntityService
 from services.record_service import RecordService
+from services.revision_service import RevisionService
+from services.search_service import SearchService
+from services.validation_service import ValidationError
 import logging
 
 bp = Namespace("user_records", description="User records operations")
 
+PAGING_ARGS = ("limit", "cursor", "sort", "filter", "start_row")
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+CSV_TYPES = ("text/csv", "application/csv")
+
 logger = logging.getLogger()
 @bp.route('/<string:entity_id>')
 class RecordList(Resource):
+    @bp.doc(params={
+        "limit": "Page size (capped server-side)",
+        "cursor": "Opaque cursor from the previous page's nextCursor",
+        "sort": "Column field to sort on, prefix with '-' for descending",
+        "filter": "AG Grid filter model as JSON, keyed by column field",
+        "start_row": "AG Grid startRow, used to report rowCount on the last page",
+    })
     def get(self, entity_id):
-        """List all records for an entity"""
-        return RecordService.list(entity_id)
+        """
+        List records for an entity.
+        Without paging arguments the full list is returned (legacy);
+        with any of them a single keyset page is returned.
+        Both carry an ETag that changes on every write to the entity's rows.
+        """
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
+
+        # Read the revision before the rows: a concurrent write can only
+        # make the tag older than the body, never newer.
+        tag = make_etag("r", RevisionService.rows(entity_id))
+        if is_fresh(tag):
+            return not_modified(tag)
+
+        args = request.args
+        if not any(a in args for a in PAGING_ARGS):
+            return with_etag(RecordService.list(entity_id), tag)
+
+        try:
+            filters = json.loads(args["filter"]) if args.get("filter") else None
+            page = RecordService.list_page(
+                entity_id,
+                limit=args.get("limit", type=int),
+                cursor=args.get("cursor"),
+                sort=args.get("sort"),
+                filters=filters,
+                start_row=args.get("start_row", type=int),
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return with_etag(page, tag)
 
     def post(self, entity_id):
         """Create a record for an entity"""
-        return RecordService.create(entity_id, request.json)
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
+        try:
+            return RecordService.create(entity_id, request.json)
+        except ValidationError as e:
+            return {"error": str(e), "errors": e.errors}, 400
+
+    def patch(self, entity_id):
+        """
+        Merge-patch (RFC 7396) many records in one transaction.
+        Body: [{"id": record id, "data": patch}, ...]; returns the patched records.
+        """
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
+        try:
+            return {"rowData": RecordService.patch(entity_id, request.json)}
+        except ValidationError as e:
+            return {"error": str(e), "errors": e.errors}, 400
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+@bp.route('/<string:entity_id>/import')
+class RecordImport(Resource):
+    @bp.doc(params={"batch_size": f"Rows per transaction (default {IMPORT_BATCH_SIZE})"})
+    def post(self, entity_id):
+        """
+        Bulk import records from an NDJSON (application/x-ndjson) or CSV
+        (text/csv, with a header row) request body. Streams back one NDJSON
+        progress report per committed batch.
+        """
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
+
+        if request.mimetype in NDJSON_TYPES:
+            records = BulkService.parse_ndjson(request.stream)
+        elif request.mimetype in CSV_TYPES:
+            records = BulkService.parse_csv(entity_id, request.stream)
+        else:
+            return {"error": "Expected an application/x-ndjson or text/csv body"}, 415
+
+        batch_size = max(1, request.args.get("batch_size", IMPORT_BATCH_SIZE, type=int))
+        reports = BulkService.import_rows(entity_id, records, batch_size)
+        return Response(
+            stream_with_context(json.dumps(to_wire(r)) + "\n" for r in reports),
+            mimetype="application/x-ndjson",
+        )
+
+
+@bp.route('/<string:entity_id>/bulk-delete')
+class RecordBulkDelete(Resource):
+    @bp.doc(params={"chunk_size": f"Rows per transaction (default {WRITE_CHUNK_SIZE})"})
+    def post(self, entity_id):
+        """
+        Delete records by id list and / or filter.
+        Body: {"ids": [...]} and / or {"filter": AG Grid filter model}; returns {deleted, chunks}.
+        """
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
+        body = request.json
+        if not isinstance(body, dict):
+            return {"error": "Expected a JSON object"}, 400
+        chunk_size = request.args.get("chunk_size", WRITE_CHUNK_SIZE, type=int)
+        try:
+            return BulkService.delete_where(entity_id, body.get("ids"), body.get("filter"), chunk_size)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+
+@bp.route('/<string:entity_id>/bulk-update')
+class RecordBulkUpdate(Resource):
+    @bp.doc(params={"chunk_size": f"Rows per transaction (default {WRITE_CHUNK_SIZE})"})
+    def post(self, entity_id):
+        """
+        Set field values (a merge patch) on records selected by id list and / or filter.
+        Body: {"set": {...}, "ids": [...], "filter": {...}}; returns {updated, chunks}.
+        """
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
+        body = request.json
+        if not isinstance(body, dict):
+            return {"error": "Expected a JSON object"}, 400
+        chunk_size = request.args.get("chunk_size", WRITE_CHUNK_SIZE, type=int)
+        try:
+            return BulkService.update_where(
+                entity_id, body.get("set"), body.get("ids"), body.get("filter"), chunk_size
+            )
+        except ValidationError as e:
+            return {"error": str(e), "errors": e.errors}, 400
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+
+@bp.route('/<string:entity_id>/export')
+class RecordExport(Resource):
+    @bp.doc(params={"format": "ndjson (default) or csv"})
+    def get(self, entity_id):
+        """Stream all records of an entity, oldest first, as NDJSON or CSV"""
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
+
+        fmt = request.args.get("format", "ndjson")
+        if fmt == "csv":
+            body, mimetype = BulkService.export_csv(entity_id), "text/csv"
+        elif fmt == "ndjson":
+            body, mimetype = BulkService.export_ndjson(entity_id), "application/x-ndjson"
+        else:
+            return {"error": f"Unsupported format '{fmt}'"}, 400
+
+        return Response(
+            body,
+            mimetype=mimetype,
+            headers={
+                "Content-Disposition": f'attachment; filename="{entity_id}.{fmt}"',
+            },
+        )
+
+
+@bp.route('/<string:entity_id>/aggregate')
+class RecordAggregate(Resource):
+    @bp.doc(params={
+        "group_by": "Comma separated fields to group by, outermost first",
+        "agg": "Comma separated field:func pairs, func one of count, sum, avg, min, max",
+        "filter": "AG Grid filter model as JSON, keyed by field",
+    })
+    def get(self, entity_id):
+        """Grouped counts / sums / averages / extremes with footer totals"""
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
+
+        tag = make_etag("g", RevisionService.rows(entity_id), RevisionService.metadata(entity_id))
+        if is_fresh(tag):
+            return not_modified(tag)
+
+        args = request.args
+        try:
+            result = AggregateService.aggregate(
+                entity_id,
+                group_by=[f for f in args.get("group_by", "").split(",") if f],
+                aggs=AggregateService.parse_aggs(args.get("agg")),
+                filters=json.loads(args["filter"]) if args.get("filter") else None,
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return with_etag(result, tag)
+
+
+@bp.route('/<string:entity_id>/search')
+class RecordSearch(Resource):
+    @bp.doc(params={
+        "q": "Words to search for in the entity's searchable fields (prefix match)",
+        "limit": "Page size (capped server-side)",
+        "offset": "Number of matches to skip, from the previous page's nextOffset",
+    })
+    def get(self, entity_id):
+        """Full-text search over an entity's records, best match first"""
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
+
+        # Results depend on the rows and on which fields are searchable
+        tag = make_etag("s", RevisionService.rows(entity_id), RevisionService.metadata(entity_id))
+        if is_fresh(tag):
+            return not_modified(tag)
+
+        args = request.args
+        try:
+            page = SearchService.search(
+                entity_id,
+                args.get("q", ""),
+                limit=args.get("limit", type=int),
+                offset=args.get("offset", type=int),
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return with_etag(page, tag)
+
 
 @bp.route('/<string:entity_id>/<string:record_id>')
 class Record(Resource):
     def put(self, entity_id, record_id):
         """Update a record"""
-        return RecordService.update(entity_id, record_id, request.json)
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
+        try:
+            return RecordService.update(entity_id, record_id, request.json)
+        except ValidationError as e:
+            return {"error": str(e), "errors": e.errors}, 400
+
+    def patch(self, entity_id, record_id):
+        """Merge-patch (RFC 7396) a record; keys set to null are removed"""
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
+        try:
+            records = RecordService.patch(entity_id, [{"id": record_id, "data": request.json}])
+        except ValidationError as e:
+            return {"error": str(e), "errors": e.errors}, 400
+        if not records:
+            return {"error": "Record not found"}, 404
+        return records[0]
 
     def delete(self, entity_id, record_id):
         """Delete a record"""
         logger.info("delete called")
+        entity_id = EntityService.resolve_id(entity_id)
+        if not entity_id:
+            return {"error": "Entity not found"}, 404
         return RecordService.delete(entity_id, record_id)
@@ -1,5 +1,10 @@
 from flask_restx import Namespace, Resource
+from flask import request, json
+from controllers.etag import is_fresh, make_etag, not_modified, with_etag
+from services.bootstrap_service import SECTIONS, BootstrapService
 from services.entity_service import EntityService
+from services.options_service import OptionsError, OptionsService, OptionsUnresolved
+from services.revision_service import RevisionService
 
 bp = Namespace(
     "entity_meta",
@@ -10,9 +15,14 @@ bp = Namespace(
 class EntityMetaList(Resource):
     def get(self):
         """
-        List entities available to the frontend
+        List entities available to the frontend, with row / field /
+        column counts. The ETag changes on any metadata or record write.
         """
-        return EntityService.list(), 200
+        version = RevisionService.snapshot()
+        tag = make_etag("l", *version)
+        if is_fresh(tag):
+            return not_modified(tag)
+        return with_etag(EntityService.list(version), tag)
 
 
 @bp.route("/<string:entity_id>")
@@ -21,7 +31,83 @@ class EntityMeta(Resource):
         """
         Get full metadata for a single entity
         """
-        meta = EntityService.get_full(entity_id)
+        if request.if_none_match:
+            rev = RevisionService.metadata(entity_id)
+            if rev is not None and is_fresh(make_etag("m", rev)):
+                return not_modified(make_etag("m", rev))
+
+        meta = EntityService.get_full_wire(entity_id)
         if not meta:
             return {"error": "Entity not found"}, 404
-        return meta, 200
+        return with_etag(meta, make_etag("m", meta["revision"]))
+
+
+@bp.route("/<string:entity_id>/options")
+class EntityOptions(Resource):
+    @bp.doc(params={
+        "fields": "Comma separated field names (default: every select / dynamic-select field)",
+    })
+    def get(self, entity_id):
+        """
+        Option lists for a form in one round trip. Other query arguments are
+        the current form values used for `{field}` placeholders,
+        e.g. ?country=US.
+        """
+        args = request.args.to_dict()
+        names = args.pop("fields", None)
+        names = {n for n in names.split(",") if n} if names else None
+
+        options = OptionsService.get_many(entity_id, args, names)
+        if options is None:
+            return {"error": "Entity not found"}, 404
+        return options, 200
+
+
+@bp.route("/<string:entity_id>/options/<string:field>")
+class FieldOptions(Resource):
+    def get(self, entity_id, field):
+        """
+        Options for one select / dynamic-select field, resolved against the
+        form values passed as query arguments (e.g. ?country=US).
+        """
+        try:
+            options = OptionsService.get(entity_id, field, request.args.to_dict())
+        except OptionsUnresolved as e:
+            return {"error": str(e), "optionsAPI": e.url}, 404
+        except OptionsError as e:
+            return {"error": str(e)}, 502
+        if options is None:
+            return {"error": "Field not found"}, 404
+        return options, 200
+
+
+@bp.route("/<string:entity_id>/bootstrap")
+class EntityBootstrap(Resource):
+    @bp.doc(params={
+        "include": f"Comma separated sections to return (default: {','.join(SECTIONS)})",
+        "fields": "Comma separated field names the caller renders (default: all)",
+        "limit": "Records page size",
+        "sort": "Column field to sort records on, prefix with '-' for descending",
+        "filter": "AG Grid filter model as JSON, keyed by column field",
+    })
+    def get(self, entity_id):
+        """
+        Open a form / grid in one round trip: metadata, the first page of
+        records and first-level option lists.
+        """
+        args = request.args
+        include = [s for s in args.get("include", "").split(",") if s] or None
+        fields = [f for f in args.get("fields", "").split(",") if f] or None
+        try:
+            page = {
+                "limit": args.get("limit", type=int),
+                "sort": args.get("sort"),
+                "filters": json.loads(args["filter"]) if args.get("filter") else None,
+                "start_row": 0,
+            }
+            result = BootstrapService.get(entity_id, include, fields, page)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        if result is None:
+            return {"error": "Entity not found"}, 404
+        return result, 200
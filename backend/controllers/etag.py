@@ -0,0 +1,23 @@
+from flask import Response, request
+from werkzeug.http import quote_etag
+
+# Clients may reuse a cached body, but must revalidate it on every request.
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag value built from revision counters, e.g. make_etag("m", 12)."""
+    return "-".join(str(p) for p in parts)
+
+
+def is_fresh(tag: str) -> bool:
+    """True if the request's If-None-Match already names `tag`."""
+    return request.if_none_match.contains(tag)
+
+
+def not_modified(tag: str) -> Response:
+    return Response(status=304, headers={"ETag": quote_etag(tag), "Cache-Control": CACHE_CONTROL})
+
+
+def with_etag(body, tag: str, status: int = 200):
+    return body, status, {"ETag": quote_etag(tag), "Cache-Control": CACHE_CONTROL}
@@ -1,4 +1,12 @@
 from flask_restx import Namespace, Resource
+from flask import Response, request
+from instrumentation import metrics
+from profiler import profiler
+from services.change_feed import change_feed
+from services.column_store import column_store
+from services.metadata_cache import metadata_cache
+from services.options_cache import options_cache
+from services.write_queue import write_queue
 
 bp = Namespace("health", description="Health check endpoints")
 
@@ -7,3 +15,58 @@ class HealthCheck(Resource):
     def get(self):
         """API health check"""
         return {"status": "ok"}
+
+@bp.route('/cache')
+class CacheStats(Resource):
+    def get(self):
+        """Metadata cache size and hit/miss counters"""
+        return metadata_cache.stats()
+
+@bp.route('/cache/options')
+class OptionsCacheStats(Resource):
+    def get(self):
+        """Options cache size and hit/miss/coalescing counters"""
+        return options_cache.stats()
+
+@bp.route('/cache/columns')
+class ColumnStoreStats(Resource):
+    def get(self):
+        """Columnar aggregation cache size and hit/build counters"""
+        return column_store.stats()
+
+@bp.route('/changes')
+class ChangeFeedStats(Resource):
+    def get(self):
+        """Change feed listeners and published event counters"""
+        return change_feed.stats()
+
+@bp.route('/writes')
+class WriteQueueStats(Resource):
+    def get(self):
+        """Write batching (group commit) counters"""
+        return write_queue.stats()
+
+@bp.route('/metrics')
+class Metrics(Resource):
+    def get(self):
+        """Request, phase and row counters in the Prometheus text format"""
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@bp.route('/profiler')
+class Profiler(Resource):
+    def get(self):
+        """Sampling profiler state"""
+        return profiler.stats()
+
+    def put(self):
+        """Turn the slow request profiler on / off: {enabled, slowMs, intervalMs}"""
+        body = request.json
+        if not isinstance(body, dict):
+            return {"error": "Expected a JSON object"}, 400
+        interval_ms = body.get("intervalMs")
+        try:
+            interval = None if interval_ms is None else profiler.positive("intervalMs", interval_ms) / 1000
+            profiler.configure(body.get("enabled"), body.get("slowMs"), interval)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return profiler.stats()
@@ -1,7 +1,88 @@
 # db.py
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from instrumentation import instrument_engine
 
-engine = create_engine(
-    "sqlite:///metadata.db",
-    connect_args={"check_same_thread": False}
-)
\ No newline at end of file
+DB_FILE = os.environ.get("DB_FILE", "metadata.db")
+
+# -----------------------------
+# Connection profile
+# -----------------------------
+# Applied to every new connection. WAL lets readers run alongside the
+# writer, busy_timeout makes concurrent writers wait instead of failing
+# with "database is locked", and synchronous=NORMAL only fsyncs at WAL
+# checkpoints (safe against corruption in WAL mode).
+PRAGMAS = {
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative values are KiB rather than pages
+    "cache_size": -int(os.environ.get("SQLITE_CACHE_SIZE_KB", str(64 * 1024))),
+    "temp_store": "MEMORY",
+}
+STATEMENT_CACHE_SIZE = int(os.environ.get("SQLITE_STATEMENT_CACHE_SIZE", "256"))
+
+# Writes go through `engine`; GET traffic reads through `read_engine`, a
+# separate pool of query_only connections, so readers never queue behind
+# writers for a pooled connection.
+POOL = {
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "5")),
+    "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+}
+READ_POOL = {
+    "pool_size": int(os.environ.get("DB_READ_POOL_SIZE", "10")),
+    "max_overflow": int(os.environ.get("DB_READ_MAX_OVERFLOW", "20")),
+    "pool_timeout": POOL["pool_timeout"],
+}
+
+# Set by asgi.py before any service is imported. The services keep using
+# the synchronous `engine` API; under ASGI it is the sync facade of an
+# aiosqlite engine and is driven from greenlets (see asgi.run_db), so
+# queries await instead of blocking the event loop.
+ASYNC_DRIVER = os.environ.get("DB_ASYNC") == "1"
+
+
+def _apply_profile(engine, read_only: bool = False):
+    instrument_engine(engine)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only = 1")
+        cursor.close()
+    return engine
+
+
+def _create(read_only: bool = False):
+    pool = READ_POOL if read_only else POOL
+    if ASYNC_DRIVER:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        async_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{DB_FILE}",
+            connect_args={"cached_statements": STATEMENT_CACHE_SIZE},
+            **pool,
+        )
+        _apply_profile(async_engine.sync_engine, read_only)
+        return async_engine, async_engine.sync_engine
+
+    return None, _apply_profile(
+        create_engine(
+            f"sqlite:///{DB_FILE}",
+            connect_args={
+                "check_same_thread": False,
+                "cached_statements": STATEMENT_CACHE_SIZE,
+            },
+            **pool,
+        ),
+        read_only,
+    )
+
+
+async_engine, engine = _create()
+async_read_engine, read_engine = _create(read_only=True)
@@ -1,13 +1,6 @@
-from db import engine
-from sqlalchemy import text
+from db import DB_FILE
+from migrate_db import create_schema
 
-with engine.begin() as conn:
-    with open("schema.sql") as f:
-        sql = f.read()
-        # Execute each statement separately because SQLite's DB-API
-        # does not allow executing multiple statements at once.
-        for statement in [s.strip() for s in sql.split(';')]:
-            if statement:
-                conn.execute(text(statement))
-
-print("SQLite database initialized (metadata.db)")
\ No newline at end of file
+if __name__ == "__main__":
+    create_schema()
+    print(f"SQLite database initialized ({DB_FILE})")
@@ -0,0 +1,210 @@
+# instrumentation.py
+"""
+Request timing and metrics.
+
+Each request collects its time per phase (SQL, JSON decode, serialization,
+service methods) and the number of rows it read. The totals are returned in
+a `Server-Timing` header and added to process-wide counters, which
+/health/metrics renders in the Prometheus text format.
+
+Phases overlap: a service method's time includes the SQL and JSON time
+spent inside it.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from sqlalchemy import event
+
+# Upper bounds (seconds) of the request latency histogram
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Phase totals of one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}  # name -> [seconds, count]
+        self.rows = 0
+
+    def add(self, name: str, seconds: float):
+        phase = self.phases.get(name)
+        if phase is None:
+            self.phases[name] = [seconds, 1]
+        else:
+            phase[0] += seconds
+            phase[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        entries = [
+            f'{name};dur={seconds * 1000:.2f};desc="{count}x"'
+            for name, (seconds, count) in self.phases.items()
+        ]
+        if self.rows:
+            entries.append(f'rows;desc="{self.rows}"')
+        entries.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(entries)
+
+
+class Metrics:
+    """Process-wide counters, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}  # (endpoint, method, status) -> [bucket counts, sum, count]
+        self._phases = {}    # phase -> [sum, count]
+        self._rows = {}      # source -> count
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float):
+        key = (endpoint, method, str(status))
+        with self._lock:
+            entry = self._requests.get(key)
+            if entry is None:
+                entry = self._requests[key] = [[0] * len(BUCKETS), 0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    entry[0][i] += 1
+            entry[1] += seconds
+            entry[2] += 1
+
+    def observe_phase(self, phase: str, seconds: float):
+        with self._lock:
+            entry = self._phases.get(phase)
+            if entry is None:
+                self._phases[phase] = [seconds, 1]
+            else:
+                entry[0] += seconds
+                entry[1] += 1
+
+    def add_rows(self, source: str, count: int):
+        with self._lock:
+            self._rows[source] = self._rows.get(source, 0) + count
+
+    def reset(self):
+        with self._lock:
+            self._requests.clear()
+            self._phases.clear()
+            self._rows.clear()
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return ",".join(f'{k}="{escape(v)}"' for k, v in labels.items())
+
+    def render(self) -> str:
+        with self._lock:
+            requests = {k: (list(v[0]), v[1], v[2]) for k, v in self._requests.items()}
+            phases = dict((k, tuple(v)) for k, v in self._phases.items())
+            rows = dict(self._rows)
+
+        lines = [
+            "# HELP app_request_duration_seconds Request latency by endpoint.",
+            "# TYPE app_request_duration_seconds histogram",
+        ]
+        for (endpoint, method, status), (buckets, total, count) in sorted(requests.items()):
+            labels = self._labels(endpoint=endpoint, method=method, status=status)
+            for bound, n in zip(BUCKETS, buckets):
+                lines.append(f'app_request_duration_seconds_bucket{{{labels},le="{bound}"}} {n}')
+            lines.append(f'app_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"app_request_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"app_request_duration_seconds_count{{{labels}}} {count}")
+
+        lines += [
+            "# HELP app_phase_seconds Time spent per phase (sql, json, serialize, service methods).",
+            "# TYPE app_phase_seconds summary",
+        ]
+        for phase, (total, count) in sorted(phases.items()):
+            labels = self._labels(phase=phase)
+            lines.append(f"app_phase_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"app_phase_seconds_count{{{labels}}} {count}")
+
+        lines += [
+            "# HELP app_rows_read_total Rows returned by record reads.",
+            "# TYPE app_rows_read_total counter",
+        ]
+        for source, count in sorted(rows.items()):
+            lines.append(f"app_rows_read_total{{{self._labels(source=source)}}} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+# -----------------------------
+# Recording
+# -----------------------------
+def begin_request():
+    """Start collecting timings for the current request; returns a reset token."""
+    return _current.set(RequestTimings())
+
+
+def end_request(token) -> RequestTimings:
+    timings = _current.get()
+    _current.reset(token)
+    return timings
+
+
+def record(phase: str, seconds: float):
+    timings = _current.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+    metrics.observe_phase(phase, seconds)
+
+
+def count_rows(source: str, count: int):
+    timings = _current.get()
+    if timings is not None:
+        timings.rows += count
+    metrics.add_rows(source, count)
+
+
+@contextmanager
+def timed(phase: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started)
+
+
+def instrumented(fn):
+    """Time a service method under its qualified name, e.g. RecordService.list."""
+    phase = fn.__qualname__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record(phase, time.perf_counter() - started)
+
+    return wrapper
+
+
+def instrument_engine(engine):
+    """Time every statement run on `engine` (a sync Engine or an async engine's sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        record("sql", time.perf_counter() - conn.info["query_started"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def failed(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+    return engine
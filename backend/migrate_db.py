@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Bring an existing metadata.db up to date with schema.sql.
+
+Usage:
+  python migrate_db.py
+"""
+
+import os
+from contextlib import contextmanager
+from sqlalchemy import text
+from db import DB_FILE, engine
+from services.stats_service import StatsService
+
+CHILD_TABLES = ["entity_columns", "entity_fields", "entity_actions", "entity_rows"]
+
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+
+try:
+    import fcntl
+except ImportError:  # Windows: single worker, no lock needed
+    fcntl = None
+
+
+def _apply_schema(conn):
+    # Every statement in schema.sql is idempotent (IF NOT EXISTS), so
+    # re-running it creates whatever tables / indexes are missing.
+    with open(SCHEMA_FILE) as f:
+        sql = f.read()
+    for statement in [s.strip() for s in sql.split(';')]:
+        if statement:
+            conn.execute(text(statement))
+
+
+def _add_column(conn, table: str, column: str, ddl: str):
+    columns = {r["name"] for r in conn.execute(text(f"PRAGMA table_info({table})")).mappings()}
+    if column not in columns:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+# -----------------------------
+# Migrations (version, step)
+# -----------------------------
+# Steps run before schema.sql is re-applied, so they can add columns that
+# new indexes depend on. They must be safe on a freshly initialized DB.
+
+def _normalize_entity_ids(conn):
+    # Older rows were stored with whatever casing the request URL used
+    # (e.g. "a" for entity "A"). Rewrite them to the canonical entity id.
+    for table in CHILD_TABLES:
+        conn.execute(
+            text(f"""
+                UPDATE OR IGNORE {table}
+                SET entity_id = (
+                    SELECT e.id FROM entities e
+                    WHERE e.id = {table}.entity_id COLLATE NOCASE
+                )
+                WHERE entity_id NOT IN (SELECT id FROM entities)
+                  AND EXISTS (
+                    SELECT 1 FROM entities e
+                    WHERE e.id = {table}.entity_id COLLATE NOCASE
+                  )
+            """)
+        )
+
+
+def _add_revisions(conn):
+    _add_column(conn, "entities", "revision", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(conn, "entities", "rows_revision", "INTEGER NOT NULL DEFAULT 0")
+
+
+def _add_projections(conn):
+    _add_column(conn, "entity_columns", "indexed", "BOOLEAN DEFAULT 0")
+
+
+def _add_entity_stats(conn):
+    # The table has to exist before it can be backfilled
+    _apply_schema(conn)
+    StatsService.refresh(conn)
+
+
+def _add_codecs(conn):
+    _apply_schema(conn)
+    _add_column(conn, "entity_projections", "source", "TEXT")
+
+
+def _add_search(conn):
+    _add_column(conn, "entity_fields", "searchable", "BOOLEAN DEFAULT 0")
+
+
+def _type_projections(conn):
+    # Rebuild projections as typed columns with partial indexes
+    from services.projection_service import ProjectionService
+
+    _add_column(conn, "entity_projections", "column_type", "TEXT")
+    entity_ids = conn.execute(text("SELECT DISTINCT entity_id FROM entity_projections")).scalars().all()
+    for entity_id in entity_ids:
+        ProjectionService.sync(conn, entity_id)
+
+
+MIGRATIONS = [
+    (1, _normalize_entity_ids),
+    (2, _add_revisions),
+    (3, _add_projections),
+    (4, _add_entity_stats),
+    (5, _add_codecs),
+    (6, _add_search),
+    (7, _type_projections),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate():
+    with engine.begin() as conn:
+        version = conn.execute(text("PRAGMA user_version")).scalar()
+        if version >= SCHEMA_VERSION:
+            return False
+
+        for target, step in MIGRATIONS:
+            if target > version:
+                step(conn)
+        _apply_schema(conn)
+        conn.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+    return True
+
+
+# -----------------------------
+# Startup
+# -----------------------------
+def _schema_version() -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+@contextmanager
+def _startup_lock():
+    """Serialize database bootstrap between worker processes starting together."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{DB_FILE}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def create_schema():
+    """Create every table / index of schema.sql that does not exist yet."""
+    with engine.begin() as conn:
+        _apply_schema(conn)
+
+
+def init_database(seed: bool = True) -> bool:
+    """
+    Create (and seed) the database on first run, then apply migrations.
+    Runs in-process and is idempotent: an up to date database costs one
+    PRAGMA read, and workers booting at the same time wait on a lock file
+    while the first one does the work. Returns True if anything changed.
+    """
+    if _schema_version() >= SCHEMA_VERSION:
+        return False
+
+    with _startup_lock():
+        with engine.connect() as conn:
+            fresh = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entities'")
+            ).first() is None
+        if fresh:
+            print(f"{DB_FILE} not found. Initializing database and seeding data...")
+            create_schema()
+            if seed:
+                from seed_data import seed as seed_entities
+                seed_entities()
+        migrate()
+    return True
+
+
+if __name__ == "__main__":
+    if migrate():
+        print(f"metadata.db migrated to schema version {SCHEMA_VERSION}")
+    else:
+        print("metadata.db already up to date")
@@ -0,0 +1,143 @@
+# profiler.py
+"""
+Opt-in sampling profiler for slow requests.
+
+While enabled, a background thread samples the stack of every thread that
+is handling a request every `interval` seconds (PROFILE_INTERVAL_MS, or
+intervalMs on PUT /health/profiler). When a request takes longer
+than `slow_ms`, its samples are written to `out_dir` in the folded stack
+format ("frame;frame;frame count" per line), which flamegraph.pl and
+speedscope turn into a flame graph. Requests are not sampled at all while
+the profiler is off.
+
+Enable with PROFILE_SLOW_MS=<ms> or at runtime through PUT /health/profiler.
+Only the threaded Flask server is covered; under asgi.py requests share the
+event loop thread, so their samples could not be told apart.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+
+class SamplingProfiler:
+    def __init__(self, slow_ms: float = None, interval: float = 0.005, out_dir: str = "profiles",
+                 max_depth: int = 128):
+        self.enabled = slow_ms is not None
+        self.slow_ms = slow_ms if slow_ms is not None else 500.0
+        self.interval = interval
+        self.out_dir = out_dir
+        self.max_depth = max_depth
+        self._active = {}  # thread ident -> Counter of folded stacks
+        self._lock = threading.Lock()
+        self._thread = None
+        self.sampled = 0
+        self.captured = 0
+        self.last_profile = None
+
+    @staticmethod
+    def positive(name: str, value) -> float:
+        """`value` as a float; ValueError naming `name` unless it is a positive number."""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be a number")
+        # NaN fails the comparison too; infinity would stop the sampler
+        if not 0 < value < float("inf"):
+            raise ValueError(f"{name} must be greater than 0")
+        return value
+
+    def configure(self, enabled: bool = None, slow_ms: float = None, interval: float = None):
+        """
+        `interval` is in seconds. Raises ValueError (changing nothing)
+        unless slow_ms / interval are positive numbers.
+        """
+        if slow_ms is not None:
+            slow_ms = self.positive("slowMs", slow_ms)
+        if interval is not None:
+            interval = self.positive("interval", interval)
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+        if interval is not None:
+            self.interval = interval
+        if enabled is not None:
+            self.enabled = bool(enabled)
+
+    def start_request(self):
+        """Begin sampling the calling thread; returns a handle for end_request (None when off)."""
+        if not self.enabled:
+            return None
+        samples = Counter()
+        with self._lock:
+            self._active[threading.get_ident()] = samples
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        return samples
+
+    def end_request(self, samples, name: str, seconds: float):
+        """Stop sampling; writes and returns the profile path if the request was slow."""
+        if samples is None:
+            return None
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+        if seconds * 1000 < self.slow_ms or not samples:
+            return None
+        return self._write(samples, name, seconds)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for ident, samples in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        samples[self._fold(frame)] += 1
+                        self.sampled += 1
+
+    def _fold(self, frame) -> str:
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def _write(self, samples: Counter, name: str, seconds: float) -> str:
+        os.makedirs(self.out_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")[:80]
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = os.path.join(self.out_dir, f"{stamp}-{slug}-{seconds * 1000:.0f}ms.folded")
+        with open(path, "w") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with self._lock:
+            self.captured += 1
+            self.last_profile = path
+        return path
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "slow_ms": self.slow_ms,
+                "interval_ms": self.interval * 1000,
+                "out_dir": self.out_dir,
+                "active": len(self._active),
+                "sampled": self.sampled,
+                "captured": self.captured,
+                "last_profile": self.last_profile,
+            }
+
+
+profiler = SamplingProfiler(
+    float(os.environ["PROFILE_SLOW_MS"]) if os.environ.get("PROFILE_SLOW_MS") else None,
+    float(os.environ.get("PROFILE_INTERVAL_MS", "5")) / 1000,
+    os.environ.get("PROFILE_DIR", "profiles"),
+)
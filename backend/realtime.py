@@ -0,0 +1,100 @@
+# backend/realtime.py
+"""
+Socket.IO transport for the change feed (services/change_feed.py), on
+Flask-SocketIO for app.py and python-socketio's ASGI server for asgi.py.
+
+Clients connect to /socket.io and emit `subscribe` with {"entity": id} to
+receive that entity's `rows` and `metadata` events, or with no entity for
+the `metadata` events of every entity (ENTITIES_ROOM); `unsubscribe` with
+the same argument leaves again. The `subscribe` acknowledgement is
+{"entity", "revision"} (the entity's current rows revision), or {"error"}.
+"""
+import asyncio
+from services.change_feed import ENTITIES_ROOM, change_feed, entity_room
+from services.entity_service import EntityService
+from services.revision_service import RevisionService
+
+
+def _entity(data):
+    return (data or {}).get("entity") if isinstance(data, dict) else data
+
+
+def _join(data):
+    """(room, acknowledgement) for a subscribe / unsubscribe request."""
+    requested = _entity(data)
+    if not requested:
+        return ENTITIES_ROOM, {"entity": None, "revision": None}
+    entity_id = EntityService.resolve_id(requested)
+    if not entity_id:
+        return None, {"error": "Entity not found"}
+    return entity_room(entity_id), {"entity": entity_id, "revision": RevisionService.rows(entity_id)}
+
+
+# -----------------------------
+# Flask (threading)
+# -----------------------------
+def init_socketio(app):
+    """Attach Socket.IO to the Flask app; run it with `socketio.run(app)`."""
+    from flask_socketio import SocketIO, join_room, leave_room
+
+    socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
+
+    @socketio.on("subscribe")
+    def subscribe(data=None):
+        room, ack = _join(data)
+        if room:
+            join_room(room)
+        return ack
+
+    @socketio.on("unsubscribe")
+    def unsubscribe(data=None):
+        room, ack = _join(data)
+        if room:
+            leave_room(room)
+        return ack
+
+    # Emits only queue the packets; the sockets' own threads send them
+    change_feed.subscribe(lambda event, rooms, payload: socketio.emit(event, payload, to=rooms))
+    return socketio
+
+
+# -----------------------------
+# ASGI
+# -----------------------------
+def asgi_socketio(run_db):
+    """
+    python-socketio server for asgi.py; `run_db` runs the (synchronous)
+    room lookups against the async engine. Call `listen` from the app's
+    lifespan to start forwarding the change feed.
+    """
+    import socketio
+
+    sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
+
+    @sio.on("subscribe")
+    async def subscribe(sid, data=None):
+        room, ack = await run_db(_join, data)
+        if room:
+            await sio.enter_room(sid, room)
+        return ack
+
+    @sio.on("unsubscribe")
+    async def unsubscribe(sid, data=None):
+        room, ack = await run_db(_join, data)
+        if room:
+            await sio.leave_room(sid, room)
+        return ack
+
+    return sio
+
+
+def listen(sio):
+    """
+    Forward change feed events to `sio` on the running event loop. Writes
+    publish from request greenlets or threadpool threads, so emits are
+    scheduled rather than awaited. Returns the unsubscribe function.
+    """
+    loop = asyncio.get_running_loop()
+    return change_feed.subscribe(
+        lambda event, rooms, payload: asyncio.run_coroutine_threadsafe(sio.emit(event, payload, to=rooms), loop)
+    )
@@ -13,6 +13,8 @@ CREATE TABLE IF NOT EXISTS entities (
   api TEXT NOT NULL, -- API endpoint for data operations
   form_type TEXT NOT NULL CHECK (form_type IN ('schema', 'component')),
   component TEXT,
+  revision INTEGER NOT NULL DEFAULT 0,      -- bumped on metadata writes
+  rows_revision INTEGER NOT NULL DEFAULT 0, -- bumped on record writes
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -27,6 +29,7 @@ CREATE TABLE IF NOT EXISTS entity_columns (
   renderer TEXT,
   renderer_params TEXT,
   hidden BOOLEAN DEFAULT 0,
+  indexed BOOLEAN DEFAULT 0, -- keep a typed, indexed projection on entity_rows
   sort_order INTEGER NOT NULL,
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
   FOREIGN KEY (entity_id) REFERENCES entities(id) ON DELETE CASCADE
@@ -42,6 +45,8 @@ CREATE TABLE IF NOT EXISTS entity_fields (
   label TEXT NOT NULL,
   type TEXT NOT NULL,
   required BOOLEAN DEFAULT 0,
+  -- Included in the entity's full-text index (see services/search_service.py)
+  searchable BOOLEAN DEFAULT 0,
   -- Arbitrary JSON configuration for future rules (e.g. requiredIf)
   config TEXT,
   depends_on TEXT,
@@ -86,3 +91,75 @@ CREATE TABLE IF NOT EXISTS entity_rows (
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
   FOREIGN KEY (entity_id) REFERENCES entities(id) ON DELETE CASCADE
 );
+
+-- =========================
+-- REVISIONS (ETags)
+-- =========================
+-- Global, never reused counters. Entity revisions are drawn from them so
+-- an ETag stays unique even if an entity is deleted and re-created.
+CREATE TABLE IF NOT EXISTS revisions (
+  name TEXT PRIMARY KEY,
+  value INTEGER NOT NULL DEFAULT 0
+);
+
+-- =========================
+-- PROJECTIONS
+-- =========================
+-- Generated columns added to entity_rows for indexed entity_columns
+-- (see services/projection_service.py).
+CREATE TABLE IF NOT EXISTS entity_projections (
+  column_name TEXT PRIMARY KEY,
+  entity_id TEXT NOT NULL,
+  field TEXT NOT NULL,
+  source TEXT,
+  column_type TEXT
+);
+
+-- =========================
+-- STORAGE CODECS
+-- =========================
+-- How entity_rows.data is encoded per entity. Entities without a row use
+-- plain JSON objects (see services/codec_service.py).
+CREATE TABLE IF NOT EXISTS entity_codecs (
+  entity_id TEXT PRIMARY KEY,
+  codec TEXT NOT NULL DEFAULT 'json',
+  layout TEXT,
+  migrating INTEGER NOT NULL DEFAULT 0,
+  FOREIGN KEY (entity_id) REFERENCES entities(id) ON DELETE CASCADE
+);
+
+-- =========================
+-- FULL-TEXT SEARCH
+-- =========================
+-- FTS5 tables and entity_rows triggers of entities with searchable
+-- fields (see services/search_service.py).
+CREATE TABLE IF NOT EXISTS entity_search (
+  entity_id TEXT PRIMARY KEY,
+  fields TEXT NOT NULL,
+  source TEXT NOT NULL
+);
+
+-- =========================
+-- ENTITY STATS
+-- =========================
+-- Summary counts served with the entity list, kept current by the write
+-- paths (see services/stats_service.py).
+CREATE TABLE IF NOT EXISTS entity_stats (
+  entity_id TEXT PRIMARY KEY,
+  row_count INTEGER NOT NULL DEFAULT 0,
+  field_count INTEGER NOT NULL DEFAULT 0,
+  column_count INTEGER NOT NULL DEFAULT 0,
+  last_modified DATETIME DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (entity_id) REFERENCES entities(id) ON DELETE CASCADE
+);
+
+-- =========================
+-- INDEXES
+-- =========================
+-- Case-insensitive resolution of user supplied entity ids to the
+-- canonical `entities.id`. Every other lookup uses the canonical id.
+CREATE INDEX IF NOT EXISTS idx_entities_id_nocase ON entities (id COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_entity_columns_entity ON entity_columns (entity_id, sort_order);
+CREATE INDEX IF NOT EXISTS idx_entity_fields_entity ON entity_fields (entity_id, sort_order);
+CREATE INDEX IF NOT EXISTS idx_entity_actions_entity ON entity_actions (entity_id);
+CREATE INDEX IF NOT EXISTS idx_entity_rows_entity ON entity_rows (entity_id, id DESC);
@@ -12,6 +12,8 @@ import json
 from sqlalchemy import text
 from db import engine
 from sample_data import ENTITIES
+from services.revision_service import RevisionService
+from services.stats_service import StatsService
 
 # -----------------------------
 # Seeder Logic
@@ -24,7 +26,7 @@ def seed(reset: bool = False):
             conn.execute(text("PRAGMA foreign_keys = OFF"))
 
             # Delete all data
-            tables = ["entity_actions", "entity_rows", "entity_fields", "entity_columns", "entities"]
+            tables = ["entity_stats", "entity_actions", "entity_rows", "entity_fields", "entity_columns", "entities"]
             for table in tables:
                 conn.execute(text(f"DELETE FROM {table}"))
 
@@ -138,6 +140,11 @@ def seed(reset: bool = False):
                     },
                 )
 
+            # Invalidate ETags handed out for the previous definition / rows
+            RevisionService.bump_metadata(conn, entity["id"])
+            RevisionService.bump_rows(conn, entity["id"])
+            StatsService.refresh(conn, entity["id"])
+
     print("✅ Metadata, rows, and actions seeded successfully.")
 
 
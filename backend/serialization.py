@@ -0,0 +1,47 @@
+# backend/serialization.py
+from functools import lru_cache
+from flask import json, make_response, request
+from instrumentation import timed
+
+
+class Wire(dict):
+    """A dict whose keys (recursively) are already in camelCase wire form."""
+
+
+class WireList(list):
+    """A list whose items are already in camelCase wire form."""
+
+
+@lru_cache(maxsize=4096)
+def to_camel_case(snake_str: str) -> str:
+    parts = snake_str.split('_')
+    return parts[0] + ''.join(word.capitalize() for word in parts[1:])
+
+
+def to_wire(obj):
+    """
+    Convert dict keys to camelCase, recursively.
+    Values already marked as Wire / WireList are returned untouched, so
+    precomputed payloads are not walked again.
+    """
+    if isinstance(obj, (Wire, WireList)):
+        return obj
+    if isinstance(obj, dict):
+        return Wire((to_camel_case(k) if isinstance(k, str) else k, to_wire(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return WireList(to_wire(i) for i in obj)
+    return obj
+
+
+def output_json(data, code, headers=None):
+    """
+    flask_restx representation for application/json: camelCases keys and
+    serializes the body exactly once. The Swagger spec is left as is.
+    """
+    with timed("serialize"):
+        if request.endpoint != "specs":
+            data = to_wire(data)
+        body = json.dumps(data) + "\n"
+    resp = make_response(body, code)
+    resp.headers.extend(headers or {})
+    return resp
@@ -0,0 +1,274 @@
+# backend/services/aggregate_service.py
+from sqlalchemy import text
+from db import read_engine
+from serialization import Wire, WireList, to_wire
+from instrumentation import count_rows, instrumented
+from services.codec_service import CodecService
+from services.column_store import _numpy, _sqlite_order, column_store
+from services.entity_service import EntityService
+from services.projection_service import ProjectionService
+from services.record_service import RecordService
+
+AGG_FUNCS = ("count", "sum", "avg", "min", "max")
+MAX_GROUPS = 10_000
+
+# Filters the columnar path evaluates itself; LIKE based ones are left to SQLite
+COLUMNAR_FILTERS = ("equals", "notEqual", "blank", "notBlank", "lessThan", "lessThanOrEqual",
+                    "greaterThan", "greaterThanOrEqual", "inRange")
+_COMPARISONS = {"lessThan": "<", "lessThanOrEqual": "<=", "greaterThan": ">", "greaterThanOrEqual": ">="}
+
+
+class AggregateService:
+    """
+    Grouped summaries of an entity's records (AG Grid row grouping and
+    footer totals).
+
+    Small entities are summarized by SQLite in a single GROUP BY scan over
+    entity_rows (json_extract runs at about a microsecond per field and
+    row). Large ones are computed with NumPy from the ColumnStore, which
+    keeps the fields' values in memory until the entity's rows change.
+    Both paths produce the same rows: g<i> group values, n, and c<i> /
+    a<i> per aggregation (non-null count, sum / min / max).
+    """
+
+    @staticmethod
+    def _fields(entity_id: str):
+        """(declared field names, {field: projection column}) of an entity."""
+        entity = EntityService.get_full(entity_id)
+        if not entity:
+            return set(), {}
+        declared = {f["name"] for f in entity["fields"]} | {c["field"] for c in entity["columns"]}
+        return declared, ProjectionService.for_entity(entity)
+
+    @staticmethod
+    def parse_aggs(spec: str) -> list:
+        """'salary:sum,age:avg' -> [(field, func), ...]"""
+        aggs = []
+        for item in filter(None, (s.strip() for s in (spec or "").split(","))):
+            field, _, func = item.rpartition(":")
+            if not field or func not in AGG_FUNCS:
+                raise ValueError(
+                    f"Invalid aggregation '{item}', expected field:func with func one of: {', '.join(AGG_FUNCS)}"
+                )
+            aggs.append((field, func))
+        return aggs
+
+    @staticmethod
+    @instrumented
+    def aggregate(entity_id: str, group_by=None, aggs=None, filters=None):
+        """
+        One row per distinct combination of the `group_by` field values,
+        ordered by them, with `childCount` and each aggregated field's
+        value under its own name (one function per field, as in AG Grid's
+        value columns). `totals` holds the same aggregations over all
+        matching rows, derived from the groups without a second scan.
+
+        - `group_by` is a list of declared fields (may be empty).
+        - `aggs` is a list of (field, func), func in count/sum/avg/min/max.
+          count counts the rows where the field is not null.
+        - `filters` is an AG Grid filter model, as for list_page.
+        """
+        group_by = list(group_by or [])
+        aggs = list(aggs or [])
+        filters = RecordService.filter_model(filters)
+
+        declared, projections = AggregateService._fields(entity_id)
+        unknown = (set(group_by) | {f for f, _ in aggs} | set(filters)) - declared
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+        if len(set(group_by)) != len(group_by):
+            raise ValueError("Duplicate group_by field")
+        agg_fields = [f for f, _ in aggs]
+        if len(set(agg_fields)) != len(agg_fields) or set(agg_fields) & set(group_by):
+            raise ValueError("Each field can be aggregated once and not grouped by at the same time")
+        # Malformed filters raise here: the columnar path builds no SQL
+        for field, spec in filters.items():
+            RecordService._filter_clause(0, field, spec, {}, "NULL")
+
+        codec = CodecService.for_entity(entity_id)
+        value = lambda field: projections.get(field) or codec.value_sql(field)
+
+        rows = None
+        if all(AggregateService._columnar_filter(spec) for spec in filters.values()):
+            needed = dict.fromkeys(group_by + agg_fields + list(filters))
+            # A plain COUNT(*) needs no field values: SQLite answers it from the index
+            columns = column_store.columns(entity_id, {f: value(f) for f in needed}) if needed else None
+            if columns is not None:
+                rows = AggregateService._from_columns(columns, group_by, aggs, filters)
+        if rows is None:
+            rows = AggregateService._from_sql(entity_id, value, group_by, aggs, filters)
+
+        if len(rows) > MAX_GROUPS:
+            raise ValueError(f"More than {MAX_GROUPS} groups, narrow the grouping with a filter")
+        count_rows("AggregateService.aggregate", len(rows))
+
+        def finish(r) -> dict:
+            out = {}
+            for i, (field, func) in enumerate(aggs):
+                if func == "count":
+                    out[field] = r[f"c{i}"]
+                elif func == "avg":
+                    out[field] = r[f"a{i}"] / r[f"c{i}"] if r[f"c{i}"] else None
+                else:
+                    out[field] = r[f"a{i}"]
+            return out
+
+        groups = WireList()
+        totals = {"n": 0}
+        for r in rows:
+            if not r["n"]:
+                continue  # ungrouped aggregate over no rows
+            group_row = {field: r[f"g{i}"] for i, field in enumerate(group_by)}
+            group_row.update(finish(r))
+            group_row = to_wire(group_row)
+            group_row["childCount"] = r["n"]
+            groups.append(group_row)
+
+            totals["n"] += r["n"]
+            for i, (_, func) in enumerate(aggs):
+                totals[f"c{i}"] = totals.get(f"c{i}", 0) + r[f"c{i}"]
+                key = f"a{i}"
+                if func == "count" or r[key] is None:
+                    continue
+                current = totals.get(key)
+                if current is None:
+                    totals[key] = r[key]
+                elif func == "min":
+                    totals[key] = min(current, r[key], key=_sqlite_order)
+                elif func == "max":
+                    totals[key] = max(current, r[key], key=_sqlite_order)
+                else:
+                    totals[key] = current + r[key]
+
+        footer = to_wire(finish({k: totals.get(k) for k in AggregateService._keys(aggs)}))
+        footer["childCount"] = totals["n"]
+        return Wire(rowData=groups, totals=footer)
+
+    @staticmethod
+    def _from_sql(entity_id: str, value, group_by: list, aggs: list, filters: dict) -> list:
+        params = {"eid": entity_id, "limit": MAX_GROUPS + 1}
+        where = ["entity_id = :eid"]
+        for index, (field, spec) in enumerate(sorted(filters.items())):
+            where.append(RecordService._filter_clause(index, field, spec, params, value(field)))
+
+        select = [f"{value(f)} AS g{i}" for i, f in enumerate(group_by)]
+        select.append("COUNT(*) AS n")
+        for i, (field, func) in enumerate(aggs):
+            v = value(field)
+            select.append(f"COUNT({v}) AS c{i}")
+            if func in ("sum", "avg"):
+                select.append(f"SUM({v}) AS a{i}")
+            elif func in ("min", "max"):
+                select.append(f"{func.upper()}({v}) AS a{i}")
+
+        group = ""
+        if group_by:
+            keys = ", ".join(f"g{i}" for i in range(len(group_by)))
+            group = f"GROUP BY {keys} ORDER BY {keys}"
+
+        with read_engine.connect() as conn:
+            return conn.execute(
+                text(f"""
+                    SELECT {", ".join(select)}
+                    FROM entity_rows
+                    WHERE {" AND ".join(where)}
+                    {group}
+                    LIMIT :limit
+                """),
+                params,
+            ).mappings().all()
+
+    @staticmethod
+    def _columnar_filter(spec: dict) -> bool:
+        if "operator" in spec or "conditions" in spec:
+            # Combined filters are left to SQLite
+            return False
+        if spec.get("filterType") == "set":
+            return True
+        return spec.get("type") in COLUMNAR_FILTERS
+
+    @staticmethod
+    def _filter_mask(column, spec: dict):
+        """Row mask of one filter, with the same semantics as RecordService._filter_clause."""
+        np = _numpy()
+        if spec.get("filterType") == "set":
+            mask = np.zeros(len(column), dtype=bool)
+            for value in spec.get("values") or []:
+                mask |= column.matches(value)
+            return mask
+
+        op = spec["type"]
+        value = spec.get("filter", spec.get("dateFrom"))
+        if op in ("blank", "notBlank"):
+            mask = ~column.present | column.matches("")
+            return mask if op == "blank" else ~mask
+        if op in _COMPARISONS:
+            return column.compare(_COMPARISONS[op], value)
+        if op == "inRange":
+            return column.compare(">=", value) & column.compare("<=", spec.get("filterTo", spec.get("dateTo")))
+        mask = column.matches(value)
+        return mask if op == "equals" else ~mask
+
+    @staticmethod
+    def _from_columns(columns: dict, group_by: list, aggs: list, filters: dict) -> list:
+        np = _numpy()
+        mask = None
+        for field, spec in filters.items():
+            match = AggregateService._filter_mask(columns[field], spec)
+            mask = match if mask is None else mask & match
+        pick = (lambda a: a) if mask is None else (lambda a: a[mask])
+
+        # Combined group code; ranks follow SQLite order, so codes sort
+        # like ORDER BY g0, g1, ...
+        sizes = [len(columns[f].uniques) for f in group_by]
+        if group_by:
+            if np.prod([float(n) for n in sizes]) >= 2 ** 62:
+                raise ValueError("Too many distinct group_by combinations")
+            code = np.zeros(len(pick(columns[group_by[0]].ranks)), dtype=np.int64)
+            for field, size in zip(group_by, sizes):
+                code = code * size + pick(columns[field].ranks)
+            codes, group = np.unique(code, return_inverse=True)
+            if len(codes) > MAX_GROUPS:
+                raise ValueError(f"More than {MAX_GROUPS} groups, narrow the grouping with a filter")
+        else:
+            first = next(iter(columns.values()))
+            size = len(first) if mask is None else int(mask.sum())
+            codes, group = np.zeros(1, dtype=np.int64), np.zeros(size, dtype=np.int64)
+        n_groups = len(codes)
+
+        out = [{"n": int(n)} for n in np.bincount(group, minlength=n_groups)]
+        keys = codes.copy()
+        for i in reversed(range(len(group_by))):
+            uniques = columns[group_by[i]].uniques
+            for row, rank in zip(out, (keys % sizes[i]).tolist()):
+                row[f"g{i}"] = uniques[rank]
+            keys //= sizes[i]
+
+        for i, (field, func) in enumerate(aggs):
+            column = columns[field]
+            present = pick(column.present)
+            counts = np.bincount(group, weights=present, minlength=n_groups)
+            if func in ("sum", "avg"):
+                values = np.bincount(group, weights=pick(column.numbers), minlength=n_groups).tolist()
+                if column.integral:
+                    values = [int(round(v)) for v in values]
+            elif func in ("min", "max"):
+                ranks = pick(column.ranks)[present]
+                if func == "min":
+                    extreme = np.full(n_groups, len(column.uniques), dtype=np.int64)
+                    np.minimum.at(extreme, group[present], ranks)
+                else:
+                    extreme = np.full(n_groups, -1, dtype=np.int64)
+                    np.maximum.at(extreme, group[present], ranks)
+                values = [column.uniques[r] if 0 <= r < len(column.uniques) else None
+                          for r in extreme.tolist()]
+            else:
+                values = [None] * n_groups
+            for row, count, v in zip(out, counts.tolist(), values):
+                row[f"c{i}"] = int(count)
+                row[f"a{i}"] = v if count else None
+        return out
+
+    @staticmethod
+    def _keys(aggs) -> list:
+        return [f"{p}{i}" for i in range(len(aggs)) for p in ("c", "a")]
@@ -0,0 +1,75 @@
+# backend/services/bootstrap_service.py
+from serialization import Wire, WireList
+from instrumentation import instrumented
+from services.entity_service import EntityService
+from services.options_service import OptionsService
+from services.record_service import RecordService
+
+SECTIONS = ("metadata", "records", "options")
+
+
+class BootstrapService:
+    """
+    Everything a form / grid needs to open, in one response: compiled
+    metadata, the first page of records and the option lists of fields
+    that do not depend on another field.
+    """
+
+    @staticmethod
+    def _select_metadata(meta: Wire, fields: set) -> Wire:
+        selected = Wire(meta)
+        selected["columns"] = WireList(c for c in meta["columns"] if c["field"] in fields)
+        selected["fields"] = WireList(f for f in meta["fields"] if f["name"] in fields)
+        return selected
+
+    @staticmethod
+    def _select_records(page: Wire, fields: set) -> Wire:
+        keep = fields | {"id", "createdAt"}
+        selected = Wire(page)
+        selected["rowData"] = WireList(
+            Wire((k, v) for k, v in row.items() if k in keep)
+            for row in page["rowData"]
+        )
+        return selected
+
+    @staticmethod
+    @instrumented
+    def get(entity_id: str, include=None, fields=None, page: dict = None,
+            with_options: bool = True):
+        """
+        `include` selects sections (default: all of SECTIONS) and `fields`
+        limits columns, form fields, record values and option lists to the
+        given field names. `page` is passed to RecordService.list_page.
+        With `with_options=False` the caller fetches option lists itself
+        (see option_fields).
+        Returns None if the entity does not exist; raises ValueError for an
+        unknown section or bad paging arguments.
+        """
+        include = set(include or SECTIONS)
+        unknown = include - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown section(s): {', '.join(sorted(unknown))}")
+        fields = set(fields) if fields else None
+
+        entity = EntityService.get_full(entity_id)
+        if not entity:
+            return None
+        entity_id = entity["id"]
+
+        result = Wire()
+        if "metadata" in include:
+            meta = EntityService.get_full_wire(entity_id)
+            result["metadata"] = BootstrapService._select_metadata(meta, fields) if fields else meta
+        if "records" in include:
+            records = RecordService.list_page(entity_id, **(page or {}))
+            result["records"] = BootstrapService._select_records(records, fields) if fields else records
+        if "options" in include and with_options:
+            names = BootstrapService.option_fields(entity, fields)
+            result["options"] = OptionsService.options_for(entity, {}, names)
+        return result
+
+    @staticmethod
+    def option_fields(entity: dict, fields=None) -> set:
+        """Names of the first-level (not dependent) fields whose options are bootstrapped."""
+        names = {f["name"] for f in entity["fields"] if not f.get("depends_on")}
+        return names & set(fields) if fields else names
@@ -0,0 +1,397 @@
+# backend/services/bulk_service.py
+import csv
+import io
+import json
+import logging
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from db import engine, read_engine
+from instrumentation import count_rows, instrumented
+from services.change_feed import change_feed
+from services.codec_service import CodecService
+from services.entity_service import EntityService
+from services.projection_service import ProjectionService
+from services.record_service import RecordService
+from services.revision_service import RevisionService
+from services.validation_service import ValidationError, ValidationService
+
+IMPORT_BATCH_SIZE = 5000
+EXPORT_BATCH_SIZE = 5000
+# Rows per transaction of set-based updates / deletes
+WRITE_CHUNK_SIZE = 5000
+# Errors reported per batch; the rest are only counted
+MAX_BATCH_ERRORS = 100
+
+# Keys produced by export that are not part of the stored record data
+_ROW_META_KEYS = ("id", "createdAt", "created_at")
+
+_TRUE = {"1", "true", "yes", "y", "on"}
+_FALSE = {"0", "false", "no", "n", "off"}
+
+logger = logging.getLogger(__name__)
+
+
+class BulkService:
+    """
+    Streaming import / export and set-based update / delete of entity_rows.
+
+    Imports insert in executemany batches, one transaction per batch, and
+    yield a progress report after each batch. Exports read in keyset
+    chunks and yield serialized lines, so neither side materializes the
+    full data set. Updates and deletes by id list or filter run as one
+    statement per keyset chunk, so the write lock is never held for long.
+    """
+
+    # -----------------------------
+    # Parsing
+    # -----------------------------
+    @staticmethod
+    def parse_ndjson(stream):
+        """Yield (line number, record or error message) from an NDJSON byte stream."""
+        for number, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8"), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield number, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield number, "Expected a JSON object"
+                continue
+            yield number, record
+
+    @staticmethod
+    def _field_types(entity_id: str) -> dict:
+        entity = EntityService.get_full(entity_id)
+        return {f["name"]: f["type"] for f in entity["fields"]} if entity else {}
+
+    @staticmethod
+    def _coerce(value: str, field_type: str):
+        if field_type == "number":
+            try:
+                return int(value)
+            except ValueError:
+                return float(value)
+        if field_type == "checkbox":
+            lowered = value.strip().lower()
+            if lowered in _TRUE:
+                return True
+            if lowered in _FALSE:
+                return False
+            raise ValueError(f"'{value}' is not a boolean")
+        return value
+
+    @staticmethod
+    def parse_csv(entity_id: str, stream):
+        """
+        Yield (line number, record or error message) from a CSV byte stream
+        with a header row. Cells are typed from the entity's form fields
+        (number, checkbox); empty cells are left out of the record.
+        """
+        types = BulkService._field_types(entity_id)
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+        for row in reader:
+            number = reader.line_num
+            record = {}
+            try:
+                for key, value in row.items():
+                    if key is None:
+                        raise ValueError("More cells than header columns")
+                    if value is None or value == "":
+                        continue
+                    try:
+                        record[key] = BulkService._coerce(value, types.get(key))
+                    except ValueError as e:
+                        raise ValueError(f"{key}: {e}")
+            except ValueError as e:
+                yield number, str(e)
+                continue
+            yield number, record
+
+    # -----------------------------
+    # Import
+    # -----------------------------
+    @staticmethod
+    def _insert_batch(entity_id: str, batch: list):
+        codec = CodecService.for_entity(entity_id)
+        with engine.begin() as conn:
+            conn.execute(
+                text("""
+                    INSERT INTO entity_rows (entity_id, data)
+                    VALUES (:eid, :data)
+                """),
+                [{"eid": entity_id, "data": codec.encode(conn, record)} for record in batch],
+            )
+            revision = RevisionService.bump_rows(conn, entity_id, len(batch))
+        # Too many rows to send: grids following the entity reload instead
+        change_feed.rows(entity_id, revision, reload=True)
+
+    @staticmethod
+    def import_rows(entity_id: str, records, batch_size: int = IMPORT_BATCH_SIZE):
+        """
+        Insert `records` ((line number, record or error message) pairs from
+        a parser), validated against the entity's field rules, and yield one
+        progress report per batch:
+        {batch, inserted, failed, errors, total_inserted, total_failed}.
+        Committed batches stay committed; a database error ends the import
+        with a final report carrying `error`.
+        """
+        validate = ValidationService.validator(entity_id)
+        batch, errors = [], []
+        failed = total_failed = total = batch_number = 0
+
+        def flush():
+            nonlocal total, batch_number
+            batch_number += 1
+            report = {
+                "batch": batch_number,
+                "inserted": 0,
+                "failed": failed,
+                "errors": errors,
+            }
+            if batch:
+                try:
+                    BulkService._insert_batch(entity_id, batch)
+                except SQLAlchemyError as e:
+                    logger.exception("import %s: batch %d failed", entity_id, batch_number)
+                    report["error"] = str(getattr(e, "orig", None) or e)
+                else:
+                    report["inserted"] = len(batch)
+                    total += len(batch)
+            report["total_inserted"] = total
+            report["total_failed"] = total_failed
+            logger.info("import %s: batch %d, %d rows", entity_id, batch_number, total)
+            return report
+
+        for number, record in records:
+            if not isinstance(record, str):
+                record = {k: v for k, v in record.items() if k not in _ROW_META_KEYS}
+                invalid = validate(record) if validate else None
+                if invalid:
+                    record = "; ".join(invalid.values())
+
+            if isinstance(record, str):
+                failed += 1
+                total_failed += 1
+                if len(errors) < MAX_BATCH_ERRORS:
+                    errors.append({"line": number, "error": record})
+                continue
+
+            batch.append(record)
+            if len(batch) >= batch_size:
+                report = flush()
+                yield report
+                if "error" in report:
+                    return
+                batch, errors, failed = [], [], 0
+
+        if batch or errors or batch_number == 0:
+            yield flush()
+
+    # -----------------------------
+    # Set-based update / delete
+    # -----------------------------
+    @staticmethod
+    def _where(entity_id: str, codec, ids=None, filters=None):
+        """(predicates, params) selecting an entity's rows by id list and / or AG Grid filter model."""
+        if ids is None and not filters:
+            raise ValueError("Pass ids or a filter: an empty selection would match every record")
+        params = {"eid": entity_id}
+        where = ["entity_id = :eid"]
+        if ids is not None:
+            try:
+                if not isinstance(ids, list):
+                    raise TypeError
+                params["ids"] = json.dumps([int(i) for i in ids])
+            except (TypeError, ValueError):
+                raise ValueError("ids must be a list of record ids")
+            where.append("id IN (SELECT value FROM json_each(:ids))")
+        if filters:
+            filters = RecordService.filter_model(filters)
+            entity = EntityService.get_full(entity_id)
+            declared = {f["name"] for f in entity["fields"]} | {c["field"] for c in entity["columns"]}
+            unknown = set(filters) - declared
+            if unknown:
+                raise ValueError(f"Cannot filter on unknown field(s): {', '.join(sorted(unknown))}")
+            projections = ProjectionService.for_entity(entity)
+            for index, (field, spec) in enumerate(sorted(filters.items())):
+                where.append(RecordService._filter_clause(
+                    index, field, spec, params, projections.get(field) or codec.value_sql(field)
+                ))
+        return where, params
+
+    @staticmethod
+    def _chunks(entity_id: str, statement, params: dict, chunk_size: int, deletes: bool):
+        """
+        Run `statement(conn)` (a single UPDATE / DELETE ... RETURNING id
+        over the next `:limit` matching rows after `:last_id`) in its own
+        transaction until it runs out of rows, yielding (ids, revision) per
+        chunk. The write lock is released between chunks.
+        """
+        last_id = 0
+        while True:
+            with engine.begin() as conn:
+                ids = conn.execute(
+                    statement(conn),
+                    {**params, "last_id": last_id, "limit": chunk_size},
+                ).scalars().all()
+                if not ids:
+                    return
+                revision = RevisionService.bump_rows(conn, entity_id, -len(ids) if deletes else 0)
+            yield ids, revision
+            if len(ids) < chunk_size:
+                return
+            last_id = max(ids)
+
+    @staticmethod
+    @instrumented
+    def delete_where(entity_id: str, ids=None, filters=None, chunk_size: int = WRITE_CHUNK_SIZE) -> dict:
+        """
+        Delete the records matching `ids` and / or `filters`, as one DELETE
+        per chunk of `chunk_size` rows. Chunks commit separately: if one
+        fails, the earlier ones stay deleted. Returns {deleted, chunks}.
+        """
+        codec = CodecService.for_entity(entity_id)
+        where, params = BulkService._where(entity_id, codec, ids, filters)
+        sql = text(f"""
+            DELETE FROM entity_rows
+            WHERE id IN (
+                SELECT id FROM entity_rows
+                WHERE {" AND ".join(where)} AND id > :last_id
+                ORDER BY id
+                LIMIT :limit
+            )
+            RETURNING id
+        """)
+
+        total = chunks = 0
+        chunked = BulkService._chunks(entity_id, lambda conn: sql, params, max(1, chunk_size), True)
+        for deleted, revision in chunked:
+            total += len(deleted)
+            chunks += 1
+            change_feed.rows(entity_id, revision, deleted=deleted)
+        count_rows("BulkService.delete_where", total)
+        logger.info("delete %s: %d rows in %d chunks", entity_id, total, chunks)
+        return {"deleted": total, "chunks": chunks}
+
+    @staticmethod
+    @instrumented
+    def update_where(entity_id: str, values: dict, ids=None, filters=None,
+                     chunk_size: int = WRITE_CHUNK_SIZE) -> dict:
+        """
+        Merge `values` into the records matching `ids` and / or `filters`
+        (a merge patch, as for RecordService.patch: null removes a field),
+        as one UPDATE per chunk of `chunk_size` rows. Chunks commit
+        separately. Returns {updated, chunks}.
+        """
+        if not isinstance(values, dict) or not values:
+            raise ValidationError({"": "Expected a non-empty object of field values"})
+        ValidationService.validate(entity_id, values, partial=True)
+
+        codec = CodecService.for_entity(entity_id)
+        where, params = BulkService._where(entity_id, codec, ids, filters)
+
+        def statement(conn):
+            # Built per chunk from the stored codec: a migration may switch
+            # it between chunks, and the positional codec may extend its layout
+            return text(f"""
+                UPDATE entity_rows
+                SET data = {CodecService.load(conn, entity_id).patch_sql(conn, values, params)}
+                WHERE id IN (
+                    SELECT id FROM entity_rows
+                    WHERE {" AND ".join(where)} AND id > :last_id
+                    ORDER BY id
+                    LIMIT :limit
+                )
+                RETURNING id
+            """)
+
+        total = chunks = 0
+        revision = None
+        chunked = BulkService._chunks(entity_id, statement, params, max(1, chunk_size), False)
+        for updated, revision in chunked:
+            total += len(updated)
+            chunks += 1
+        if revision is not None:
+            # Too many rows to send: grids following the entity reload instead
+            change_feed.rows(entity_id, revision, reload=True)
+        count_rows("BulkService.update_where", total)
+        logger.info("update %s: %d rows in %d chunks", entity_id, total, chunks)
+        return {"updated": total, "chunks": chunks}
+
+    # -----------------------------
+    # Export
+    # -----------------------------
+    @staticmethod
+    def _batches(entity_id: str, batch_size: int = EXPORT_BATCH_SIZE):
+        """Yield lists of rows in wire form, oldest first, one short read per batch."""
+        codec = CodecService.for_entity(entity_id)
+        last_id = 0
+        batch_number = 0
+        while True:
+            with read_engine.connect() as conn:
+                rows = conn.execute(
+                    text("""
+                        SELECT id, data, created_at
+                        FROM entity_rows
+                        WHERE entity_id = :eid AND id > :last_id
+                        ORDER BY id
+                        LIMIT :limit
+                    """),
+                    {"eid": entity_id, "last_id": last_id, "limit": batch_size},
+                ).mappings().all()
+
+            if rows:
+                batch_number += 1
+                logger.info("export %s: batch %d, %d rows", entity_id, batch_number, len(rows))
+                yield [RecordService._row(r, codec) for r in rows]
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]["id"]
+
+    @staticmethod
+    def count(entity_id: str) -> int:
+        with read_engine.connect() as conn:
+            return conn.execute(
+                text("SELECT COUNT(*) FROM entity_rows WHERE entity_id = :eid"),
+                {"eid": entity_id},
+            ).scalar()
+
+    @staticmethod
+    def export_ndjson(entity_id: str):
+        for rows in BulkService._batches(entity_id):
+            yield "".join(json.dumps(row) + "\n" for row in rows)
+
+    @staticmethod
+    def _csv_header(entity_id: str) -> list:
+        entity = EntityService.get_full(entity_id)
+        names = []
+        for name in [c["field"] for c in entity["columns"]] + [f["name"] for f in entity["fields"]]:
+            if name not in names and name not in _ROW_META_KEYS:
+                names.append(name)
+        return ["id"] + names + ["createdAt"]
+
+    @staticmethod
+    def export_csv(entity_id: str):
+        """
+        CSV with one column per declared column / form field. Keys not
+        declared in the metadata are left out; nested values are JSON.
+        """
+        header = BulkService._csv_header(entity_id)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        for rows in BulkService._batches(entity_id):
+            writer.writerows(
+                [
+                    json.dumps(v) if isinstance(v, (dict, list)) else v
+                    for v in (row.get(name) for name in header)
+                ]
+                for row in rows
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
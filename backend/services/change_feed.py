@@ -0,0 +1,96 @@
+# backend/services/change_feed.py
+import threading
+from instrumentation import timed
+
+ROWS_EVENT = "rows"
+METADATA_EVENT = "metadata"
+# Room of clients following metadata changes of every entity (entity lists)
+ENTITIES_ROOM = "entities"
+
+
+def entity_room(entity_id: str) -> str:
+    return f"entity:{entity_id}"
+
+
+class ChangeFeed:
+    """
+    In-process notifications of committed writes, for clients that keep
+    grids open (see realtime.py for the Socket.IO transport).
+
+    Services publish after their transaction has committed, so a client
+    that refetches on an event always sees the change. Each event carries
+    the revision its write produced (the counters the ETags are built
+    from), so a client can drop events older than the data it holds.
+    Nothing is replayed: after a reconnect a client should reload.
+
+    - `rows` events go to the entity's room:
+      {entity, revision, created: [records], updated: [records], deleted: [ids]}
+      with records in wire form, or {entity, revision, reload: true} when a
+      write touched too many rows to send (bulk import).
+    - `metadata` events go to the entity's room and ENTITIES_ROOM:
+      {entity, revision, deleted}
+
+    Listeners are called synchronously as listener(event, rooms, payload)
+    and must not block; nothing is built when there are none.
+    """
+
+    def __init__(self):
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.published = 0
+        self.failed = 0
+
+    def subscribe(self, listener):
+        """Register `listener`; returns a function that removes it."""
+        with self._lock:
+            self._listeners = self._listeners + [listener]
+
+        def unsubscribe():
+            with self._lock:
+                self._listeners = [l for l in self._listeners if l is not listener]
+
+        return unsubscribe
+
+    @property
+    def active(self) -> bool:
+        return bool(self._listeners)
+
+    def _publish(self, event: str, rooms: list, payload: dict):
+        listeners = self._listeners
+        with timed("publish"):
+            for listener in listeners:
+                try:
+                    listener(event, rooms, payload)
+                except Exception:
+                    # The write has committed already; a broken transport must not fail it
+                    with self._lock:
+                        self.failed += 1
+        with self._lock:
+            self.published += 1
+
+    def rows(self, entity_id: str, revision: int, created=(), updated=(), deleted=(), reload: bool = False):
+        if not self._listeners:
+            return
+        payload = {"entity": entity_id, "revision": revision}
+        if reload:
+            payload["reload"] = True
+        else:
+            payload.update(created=list(created), updated=list(updated), deleted=list(deleted))
+        self._publish(ROWS_EVENT, [entity_room(entity_id)], payload)
+
+    def metadata(self, entity_id: str, revision: int, deleted: bool = False):
+        if not self._listeners:
+            return
+        payload = {"entity": entity_id, "revision": revision, "deleted": deleted}
+        self._publish(METADATA_EVENT, [entity_room(entity_id), ENTITIES_ROOM], payload)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "listeners": len(self._listeners),
+                "published": self.published,
+                "failed": self.failed,
+            }
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,432 @@
+# backend/services/codec_service.py
+import json
+import logging
+import threading
+from sqlalchemy import text
+from db import engine, read_engine
+from services.metadata_cache import metadata_cache
+from services.revision_service import RevisionService
+
+CODECS = ("json", "positional")
+MIGRATE_BATCH_SIZE = 2000
+
+_COMPACT = (",", ":")
+
+logger = logging.getLogger(__name__)
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def json_path(field: str) -> str:
+    return '$."{}"'.format(field.replace('"', '\\"'))
+
+
+class Codec:
+    """
+    How one entity's rows are stored in entity_rows.data.
+
+    - json: one JSON object per row (compact separators).
+    - positional: a JSON array of values ordered by the entity's layout,
+      a list of field names that only ever grows, so a field keeps its
+      position for good. Key names are not repeated per row; absent and
+      null values are both stored as null and read back as absent.
+
+    Decoding is self-describing (object vs array), so rows written under
+    either codec can be read at any time, including while a migration
+    between codecs is halfway through. Positional rows stay queryable by
+    SQLite: `value_sql` returns json_extract over `$[i]`.
+
+    Codecs cached by CodecService are shared and only ever hold committed
+    layouts. Writes that need new positions extend the stored layout inside
+    their own transaction and use that copy, so a rollback cannot leave
+    positions in memory that the database never kept.
+    """
+
+    def __init__(self, entity_id: str, name: str = "json", layout=(), migrating: bool = False):
+        self.entity_id = entity_id
+        self.name = name
+        self.migrating = migrating
+        self._set_layout(list(layout))
+
+    def _set_layout(self, layout: list):
+        self.layout = layout
+        self.positions = {name: i for i, name in enumerate(layout)}
+
+    def encode(self, conn, record: dict) -> str:
+        """Serialize a record; may extend the stored layout inside the caller's transaction."""
+        if self.name == "json":
+            return json.dumps(record, separators=_COMPACT)
+
+        positions = self.positions
+        if any(k not in positions for k in record):
+            layout = CodecService.extend_layout(conn, self.entity_id, record)
+            positions = {name: i for i, name in enumerate(layout)}
+        values = [None] * (max((positions[k] for k in record), default=-1) + 1)
+        for key, value in record.items():
+            values[positions[key]] = value
+        return json.dumps(values, separators=_COMPACT)
+
+    def decode(self, data: str) -> dict:
+        value = json.loads(data)
+        if isinstance(value, dict):
+            return value
+        layout = self.layout
+        if len(value) > len(layout):
+            # Written with a layout extended by another process
+            layout = CodecService.reload(self).layout
+        # Positions the stored layout does not name cannot be read back
+        return {layout[i]: v for i, v in enumerate(value[:len(layout)]) if v is not None}
+
+    def value_sql(self, field: str, column: str = "data") -> str:
+        """SQL expression for a field's value in entity_rows.data (or e.g. new.data)."""
+        by_key = f"json_extract({column}, {_literal(json_path(field))})"
+        position = self.positions.get(field)
+        if position is None and self.name != "json":
+            # Another process may have given the field a position
+            position = CodecService.reload(self).positions.get(field)
+        if position is None or (self.name == "json" and not self.migrating):
+            return by_key
+        # Arrays yield NULL for a key path and objects for an index path,
+        # so this reads both row formats
+        return f"COALESCE(json_extract({column}, '$[{position}]'), {by_key})"
+
+    def patch_sql(self, conn, patch: dict, params: dict) -> str:
+        """
+        SQL expression for `data` with the merge patch (RFC 7396) `patch`
+        applied, binding its values into `params`. Reads both row formats
+        like `value_sql`. Positional rows are rebuilt from the layout read
+        under the write lock (extended there like `encode` if needed), so
+        positions added by other processes are carried over.
+        """
+        params["patch"] = json.dumps(patch, separators=_COMPACT)
+        if self.name == "json" and not self.migrating:
+            return "json_patch(data, :patch)"
+
+        if self.name == "json":
+            # Arrays not yet migrated back become objects first (patching
+            # them onto {} drops their nulls)
+            pairs = ", ".join(f"{_literal(f)}, data -> '$[{i}]'" for i, f in enumerate(self.layout))
+            return (f"json_patch(CASE json_type(data) WHEN 'array' "
+                    f"THEN json_patch('{{}}', json_object({pairs})) ELSE data END, :patch)")
+
+        layout = CodecService.extend_layout(conn, self.entity_id, patch)
+        items = []
+        for i, field in enumerate(layout):
+            if field not in patch:
+                items.append(f"data -> '$[{i}]'")
+            elif patch[field] is None:
+                items.append("NULL")
+            else:
+                params[f"p{i}"] = json.dumps(patch[field], separators=_COMPACT)
+                if isinstance(patch[field], dict):
+                    items.append(f"json_patch(COALESCE(data -> '$[{i}]', '{{}}'), :p{i})")
+                else:
+                    items.append(f"json(:p{i})")
+        # Objects not yet migrated to positional are patched as they are
+        return (f"CASE json_type(data) WHEN 'array' THEN json_array({', '.join(items)}) "
+                f"ELSE json_patch(data, :patch) END")
+
+
+class CodecService:
+    """
+    Per-entity storage codecs (entity_codecs) and online migration between
+    them. Entities without a row in entity_codecs use plain JSON.
+    """
+
+    _codecs = {}  # entity id -> (metadata revision, Codec)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _load(conn, entity_id: str) -> Codec:
+        row = conn.execute(
+            text("SELECT codec, layout, migrating FROM entity_codecs WHERE entity_id = :eid"),
+            {"eid": entity_id},
+        ).mappings().first()
+        if row is None:
+            return Codec(entity_id)
+        return Codec(entity_id, row["codec"], json.loads(row["layout"] or "[]"), bool(row["migrating"]))
+
+    @staticmethod
+    def for_entity(entity_id: str) -> Codec:
+        """
+        Cached codec of a (canonical) entity id. Codec switches bump the
+        entity's metadata revision, which is checked on every call, so a
+        switch made by another process is seen before any SQL is built.
+        """
+        with read_engine.connect() as conn:
+            revision = conn.execute(
+                text("SELECT revision FROM entities WHERE id = :id"),
+                {"id": entity_id},
+            ).scalar()
+            cached = CodecService._codecs.get(entity_id)
+            if cached is not None and cached[0] == revision:
+                return cached[1]
+            codec = CodecService._load(conn, entity_id)
+        with CodecService._lock:
+            cached = CodecService._codecs.get(entity_id)
+            if cached is not None and cached[0] == revision:
+                return cached[1]
+            CodecService._codecs[entity_id] = (revision, codec)
+        return codec
+
+    @staticmethod
+    def load(conn, entity_id: str) -> Codec:
+        """
+        Stored codec read through `conn` under the write lock (taken by a
+        no-op UPDATE), so it cannot change before the transaction commits.
+        """
+        conn.execute(
+            text("UPDATE entity_codecs SET layout = layout WHERE entity_id = :eid"),
+            {"eid": entity_id},
+        )
+        return CodecService._load(conn, entity_id)
+
+    @staticmethod
+    def reload(codec: Codec) -> Codec:
+        """Extend a cached codec to the committed layout."""
+        with read_engine.connect() as conn:
+            fresh = CodecService._load(conn, codec.entity_id)
+        with CodecService._lock:
+            if len(fresh.layout) > len(codec.layout):
+                codec._set_layout(fresh.layout)
+        return codec
+
+    @staticmethod
+    def invalidate(entity_id: str):
+        with CodecService._lock:
+            CodecService._codecs.pop(entity_id, None)
+
+    @staticmethod
+    def extend_layout(conn, entity_id: str, names=()) -> list:
+        """
+        The stored layout with `names` appended (keeping whatever other
+        processes appended), read under the write lock (see `load`). Cached
+        codecs are not touched: they pick the layout up once it has been
+        committed (see `reload`).
+        """
+        stored = CodecService.load(conn, entity_id).layout
+        layout = stored + [n for n in dict.fromkeys(names) if n not in stored]
+        if len(layout) > len(stored):
+            conn.execute(
+                text("UPDATE entity_codecs SET layout = :layout WHERE entity_id = :eid"),
+                {"eid": entity_id, "layout": json.dumps(layout)},
+            )
+        return layout
+
+    @staticmethod
+    def _save(conn, entity_id: str, name: str, migrating: bool):
+        conn.execute(
+            text("""
+                INSERT INTO entity_codecs (entity_id, codec, layout, migrating)
+                VALUES (:eid, :codec, '[]', :migrating)
+                ON CONFLICT(entity_id) DO UPDATE SET
+                    codec = excluded.codec,
+                    migrating = excluded.migrating
+            """),
+            {"eid": entity_id, "codec": name, "migrating": int(migrating)},
+        )
+
+    @staticmethod
+    def remove(conn, entity_id: str):
+        conn.execute(text("DELETE FROM entity_codecs WHERE entity_id = :eid"), {"eid": entity_id})
+
+    @staticmethod
+    def info(entity_id: str) -> dict:
+        """Codec state and stored size of an entity's rows."""
+        codec = CodecService.for_entity(entity_id)
+        with read_engine.connect() as conn:
+            size = conn.execute(
+                text("""
+                    SELECT COUNT(*) AS row_count, COALESCE(SUM(length(CAST(data AS BLOB))), 0) AS data_bytes
+                    FROM entity_rows
+                    WHERE entity_id = :eid
+                """),
+                {"eid": entity_id},
+            ).mappings().first()
+        return {
+            "codec": codec.name,
+            "migrating": codec.migrating,
+            # Last batch report of a migration running in this process
+            "progress": migrations.progress(entity_id),
+            "layout": codec.layout,
+            "row_count": size["row_count"],
+            "data_bytes": size["data_bytes"],
+        }
+
+    # -----------------------------
+    # Migration
+    # -----------------------------
+    @staticmethod
+    def _switch(conn, entity_id: str, name: str, migrating: bool, fields=()):
+        """Store the codec state and bump the metadata revision; `_switched` after commit."""
+        # Imported here: both services depend on this module
+        from services.projection_service import ProjectionService
+        from services.search_service import SearchService
+
+        CodecService._save(conn, entity_id, name, migrating)
+        if fields:
+            CodecService.extend_layout(conn, entity_id, fields)
+        # Projections and search triggers over a field path follow the
+        # codec (see value_sql)
+        ProjectionService.sync(conn, entity_id)
+        SearchService.sync(conn, entity_id)
+        # Other processes revalidate their cached codec against it (for_entity)
+        RevisionService.bump_metadata(conn, entity_id)
+
+    @staticmethod
+    def _switched(entity_id: str):
+        CodecService.invalidate(entity_id)
+        metadata_cache.invalidate(entity_id)
+
+    @staticmethod
+    def start_migration(entity_id: str, target: str, fields=()):
+        """
+        Switch an entity to `target` and mark it as migrating; its rows are
+        converted afterwards by `convert`. `fields` seeds the positional
+        layout (the entity's field order).
+        """
+        if target not in CODECS:
+            raise ValueError(f"Unknown codec '{target}', expected one of: {', '.join(CODECS)}")
+        with engine.begin() as conn:
+            CodecService._switch(conn, entity_id, target, True, fields if target == "positional" else ())
+        CodecService._switched(entity_id)
+
+    @staticmethod
+    def convert(entity_id: str, batch_size: int = MIGRATE_BATCH_SIZE):
+        """
+        Re-encode the rows of a migrating entity to its stored codec,
+        yielding a progress report per batch: {batch, converted,
+        total_converted}. The last batch clears the migrating flag.
+
+        New writes use the new codec from the start and reads decode both
+        formats, so the entity stays available throughout. Rows are
+        converted in keyset batches, one short write transaction each.
+        Rows already in the target format are skipped, so an interrupted
+        run can simply be started again; if the codec is switched again
+        meanwhile, the run starts over.
+        """
+        last_id = batch_number = total = 0
+        name = None
+        while True:
+            with engine.begin() as conn:
+                # The batch reads under the write lock taken by load
+                codec = CodecService.load(conn, entity_id)
+                if codec.name != name:
+                    name, last_id = codec.name, 0
+                want_array = name == "positional"
+                rows = conn.execute(
+                    text("""
+                        SELECT id, data
+                        FROM entity_rows
+                        WHERE entity_id = :eid AND id > :last_id
+                        ORDER BY id
+                        LIMIT :limit
+                    """),
+                    {"eid": entity_id, "last_id": last_id, "limit": batch_size},
+                ).mappings().all()
+
+                updates = [
+                    {"id": r["id"], "data": codec.encode(conn, codec.decode(r["data"]))}
+                    for r in rows
+                    if r["data"].lstrip().startswith("[") != want_array
+                ]
+                if updates:
+                    conn.execute(
+                        text("UPDATE entity_rows SET data = :data WHERE id = :id"),
+                        updates,
+                    )
+                done = len(rows) < batch_size
+                if done:
+                    CodecService._switch(conn, entity_id, name, False)
+                    # Null values are dropped by the positional codec: invalidate row ETags
+                    RevisionService.bump_rows(conn, entity_id)
+
+            batch_number += 1
+            total += len(updates)
+            if done:
+                CodecService._switched(entity_id)
+            yield {"batch": batch_number, "converted": len(updates), "total_converted": total}
+            if done:
+                return
+            last_id = rows[-1]["id"]
+
+    @staticmethod
+    def migrate(entity_id: str, target: str, fields=(), batch_size: int = MIGRATE_BATCH_SIZE):
+        """Synchronous migration to `target` (scripts, tests), yielding `convert`'s reports."""
+        CodecService.start_migration(entity_id, target, fields)
+        yield from CodecService.convert(entity_id, batch_size)
+
+
+class MigrationRunner:
+    """
+    Runs codec migrations in the background, apart from the request that
+    started them, so a client that disconnects cannot stop one halfway.
+
+    The stored state drives the jobs: an entity whose entity_codecs row is
+    still marked migrating has rows left to convert, and `resume` (called
+    at startup) restarts those, e.g. after a crash or a redeploy.
+
+    `spawn(fn)` runs fn() in the background: a daemon thread by default,
+    asgi.py sets it to a task on its event loop, where the async engine
+    can be driven.
+    """
+
+    def __init__(self):
+        self.spawn = self._thread
+        self._running = {}  # entity id -> last progress report
+        self._again = set()  # entity ids switched again while converting
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _thread(fn):
+        threading.Thread(target=fn, name="codec-migration", daemon=True).start()
+
+    def start(self, entity_id: str, target: str, fields=()):
+        """Switch the entity to `target` now and convert its rows in the background."""
+        CodecService.start_migration(entity_id, target, fields)
+        self._launch(entity_id)
+
+    def resume(self) -> list:
+        """Restart the migrations left unfinished; returns their entity ids."""
+        with read_engine.connect() as conn:
+            entity_ids = conn.execute(
+                text("SELECT entity_id FROM entity_codecs WHERE migrating = 1")
+            ).scalars().all()
+        for entity_id in entity_ids:
+            self._launch(entity_id)
+        return entity_ids
+
+    def progress(self, entity_id: str):
+        """Last progress report of a migration running in this process, else None."""
+        with self._lock:
+            return self._running.get(entity_id)
+
+    def _launch(self, entity_id: str):
+        with self._lock:
+            if entity_id in self._running:
+                # Already converting: the job runs once more when done
+                self._again.add(entity_id)
+                return
+            self._running[entity_id] = {"batch": 0, "converted": 0, "total_converted": 0}
+        self.spawn(lambda: self._run(entity_id))
+
+    def _run(self, entity_id: str):
+        while True:
+            try:
+                for report in CodecService.convert(entity_id):
+                    with self._lock:
+                        self._running[entity_id] = report
+                logger.info("codec migration %s: done", entity_id)
+            except Exception:
+                # Still marked migrating: retried on the next resume / start
+                logger.exception("codec migration %s failed", entity_id)
+            with self._lock:
+                if entity_id not in self._again:
+                    self._running.pop(entity_id, None)
+                    return
+                self._again.discard(entity_id)
+
+
+migrations = MigrationRunner()
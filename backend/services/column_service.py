@@ -1,15 +1,19 @@
 # backend/services/column_service.py
 import json
 from sqlalchemy import text
-from db import engine
+from db import engine, read_engine
+from services.change_feed import change_feed
+from services.metadata_cache import metadata_cache
+from services.projection_service import ProjectionService
+from services.revision_service import RevisionService
 
 class ColumnService:
     @staticmethod
     def list(entity_id: str):
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             rows = conn.execute(
                 text("""
-                    SELECT id, header_name, field, renderer, renderer_params, hidden, sort_order
+                    SELECT id, header_name, field, renderer, renderer_params, hidden, indexed, sort_order
                     FROM entity_columns
                     WHERE entity_id = :eid
                     ORDER BY sort_order ASC
@@ -34,7 +38,10 @@ class ColumnService:
                 """),
                 {"entity_id": entity_id, **data},
             )
-            return res.lastrowid
+            revision = RevisionService.bump_metadata(conn, entity_id)
+        metadata_cache.invalidate(entity_id)
+        change_feed.metadata(entity_id, revision)
+        return res.lastrowid
 
     @staticmethod
     def update(entity_id: str, column_id: int, data: dict):
@@ -53,6 +60,10 @@ class ColumnService:
                 """),
                 {"id": column_id, "entity_id": entity_id, **data},
             )
+            ProjectionService.sync(conn, entity_id)
+            revision = RevisionService.bump_metadata(conn, entity_id)
+        metadata_cache.invalidate(entity_id)
+        change_feed.metadata(entity_id, revision)
 
     @staticmethod
     def delete(entity_id: str, column_id: int):
@@ -64,3 +75,7 @@ class ColumnService:
                 """),
                 {"id": column_id, "entity_id": entity_id},
             )
+            ProjectionService.sync(conn, entity_id)
+            revision = RevisionService.bump_metadata(conn, entity_id)
+        metadata_cache.invalidate(entity_id)
+        change_feed.metadata(entity_id, revision)
@@ -0,0 +1,258 @@
+# backend/services/column_store.py
+import os
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from sqlalchemy import text
+from db import read_engine
+from instrumentation import count_rows, timed
+
+
+def _numpy():
+    # Imported on first use: only large aggregations need it
+    import numpy
+    return numpy
+
+
+def _sqlite_order(value):
+    """Sort key matching SQLite: NULL, then numbers, then text."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, str):
+        return (2, value)
+    return (1, value)
+
+
+def _number(value) -> float:
+    """SQLite's SUM / AVG view of a value: text counts as its numeric prefix, usually 0."""
+    if value is None:
+        return 0.0
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return 0.0
+    return float(value)
+
+
+class Column:
+    """
+    One field of an entity, aligned with its rows (in id order). The
+    arrays are derived on first use, so a field that is only summed never
+    pays for sorting its distinct values:
+
+    - `uniques`: the distinct values in SQLite order (NULL first)
+    - `ranks`: per row, the index of its value in `uniques`; usable as
+      group codes, for min / max and for comparisons
+    - `present`: per row, whether the value is not NULL
+    - `numbers`: per row, the value as used by SUM / AVG (0 for NULL)
+    """
+
+    def __init__(self, values: list):
+        self._values = values  # dropped once ranks exist; uniques + ranks hold the same
+        self._uniques = None
+        self._ranks = None
+        self._numbers = None
+        self._integral = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        values = self._values
+        return len(values) if values is not None else len(self._ranks)
+
+    def _rank(self):
+        with self._lock:
+            if self._ranks is not None:
+                return
+            np = _numpy()
+            values = self._values
+            uniques = sorted(set(values), key=_sqlite_order)
+            index = {v: i for i, v in enumerate(uniques)}
+            self._uniques = uniques
+            self._ranks = np.fromiter((index[v] for v in values), dtype=np.int64, count=len(values))
+            self._values = None
+
+    @property
+    def uniques(self) -> list:
+        if self._uniques is None:
+            self._rank()
+        return self._uniques
+
+    @property
+    def ranks(self):
+        if self._ranks is None:
+            self._rank()
+        return self._ranks
+
+    @property
+    def present(self):
+        uniques = self.uniques
+        if uniques and uniques[0] is None:
+            return self.ranks != 0
+        return _numpy().ones(len(self), dtype=bool)
+
+    @property
+    def numbers(self):
+        if self._numbers is None:
+            np = _numpy()
+            with self._lock:
+                values = self._values
+            if values is not None:
+                self._numbers = np.fromiter((_number(v) for v in values), dtype=np.float64, count=len(values))
+            else:
+                lookup = np.fromiter((_number(v) for v in self._uniques), dtype=np.float64)
+                self._numbers = lookup[self._ranks]
+        return self._numbers
+
+    @property
+    def integral(self) -> bool:
+        """True if every non-null value is an integer: SUM then stays an integer, as in SQLite."""
+        if self._integral is None:
+            with self._lock:
+                values = self._values if self._values is not None else self._uniques
+            self._integral = all(isinstance(v, int) for v in values if v is not None)
+        return self._integral
+
+    def position(self, value) -> int:
+        """Where `value` sorts among `uniques` (bisect_left)."""
+        return bisect_left(self.uniques, _sqlite_order(value), key=_sqlite_order)
+
+    def matches(self, value):
+        i = self.position(value)
+        uniques = self.uniques
+        if value is None or i == len(uniques) or _sqlite_order(uniques[i]) != _sqlite_order(value):
+            return _numpy().zeros(len(self), dtype=bool)
+        return self.ranks == i
+
+    def compare(self, op: str, value):
+        """Rows where `v <op> value` holds in SQLite (NULLs never match)."""
+        i = self.position(value)
+        uniques = self.uniques
+        hit = i < len(uniques) and _sqlite_order(uniques[i]) == _sqlite_order(value)
+        ranks = self.ranks
+        if op == "<":
+            mask = ranks < i
+        elif op == "<=":
+            mask = ranks < i + hit
+        elif op == ">":
+            mask = ranks >= i + hit
+        else:  # ">="
+            mask = ranks >= i
+        return mask & self.present if value is not None else _numpy().zeros(len(self), dtype=bool)
+
+
+class _Entry:
+    def __init__(self, revision: int):
+        self.revision = revision
+        self.columns = {}  # field -> Column
+
+
+class ColumnStore:
+    """
+    Process-local columnar copies of large entities' fields, for
+    AggregateService. An entity's columns are valid for one rows revision:
+    the first aggregation after a write rescans the fields it needs (one
+    SQL pass over entity_rows), later ones are computed from memory.
+    Entities are evicted least recently used first.
+    """
+
+    def __init__(self, max_entities: int = 8, min_rows: int = 20_000):
+        self.max_entities = max_entities
+        self.min_rows = min_rows
+        self._entries = OrderedDict()  # entity id -> _Entry
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _state(entity_id: str):
+        """(rows revision, row count) of an entity."""
+        with read_engine.connect() as conn:
+            row = conn.execute(
+                text("""
+                    SELECT e.rows_revision, COALESCE(s.row_count, 0)
+                    FROM entities e
+                    LEFT JOIN entity_stats s ON s.entity_id = e.id
+                    WHERE e.id = :eid
+                """),
+                {"eid": entity_id},
+            ).first()
+        return (row[0] or 0, row[1]) if row else (0, 0)
+
+    def columns(self, entity_id: str, fields: dict):
+        """
+        {field: Column} for `fields` ({field: SQL value expression}), or
+        None if the entity is too small to be worth caching or changed
+        while it was being scanned (the caller then queries SQLite).
+        """
+        revision, row_count = self._state(entity_id)
+        if row_count < self.min_rows:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(entity_id)
+            if entry is None or entry.revision != revision:
+                entry = _Entry(revision)
+            missing = [f for f in fields if f not in entry.columns]
+            if not missing:
+                self._entries[entity_id] = entry
+                self._entries.move_to_end(entity_id)
+                self.hits += 1
+                return {f: entry.columns[f] for f in fields}
+
+        with read_engine.connect() as conn:
+            rows = conn.execute(
+                text(f"""
+                    SELECT {", ".join(fields[f] for f in missing)}
+                    FROM entity_rows
+                    WHERE entity_id = :eid
+                    ORDER BY id
+                """),
+                {"eid": entity_id},
+            ).all()
+        count_rows("ColumnStore.build", len(rows))
+        if self._state(entity_id)[0] != revision:
+            return None
+
+        with timed("columns"):
+            built = {f: Column([r[i] for r in rows]) for i, f in enumerate(missing)}
+        del rows
+
+        with self._lock:
+            self.builds += 1
+            current = self._entries.get(entity_id)
+            if current is not None and current.revision == revision:
+                entry = current
+            entry.columns.update(built)
+            self._entries[entity_id] = entry
+            self._entries.move_to_end(entity_id)
+            while len(self._entries) > self.max_entities:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return {f: entry.columns[f] for f in fields}
+
+    def invalidate(self, entity_id: str = None):
+        with self._lock:
+            if entity_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(entity_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entities": len(self._entries),
+                "columns": sum(len(e.columns) for e in self._entries.values()),
+                "max_entities": self.max_entities,
+                "min_rows": self.min_rows,
+                "hits": self.hits,
+                "builds": self.builds,
+                "evictions": self.evictions,
+            }
+
+
+column_store = ColumnStore(
+    int(os.environ.get("COLUMN_STORE_ENTITIES", "8")),
+    int(os.environ.get("COLUMN_STORE_MIN_ROWS", "20000")),
+)
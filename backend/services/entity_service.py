@@ -1,6 +1,19 @@
 from flask import json
-from sqlalchemy import text
-from db import engine
+from sqlalchemy import bindparam, text
+from db import engine, read_engine
+from serialization import to_wire
+from instrumentation import instrumented, timed
+from services.change_feed import change_feed
+from services.codec_service import CodecService
+from services.column_store import column_store
+from services.metadata_cache import metadata_cache
+from services.projection_service import ProjectionService
+from services.revision_service import RevisionService
+from services.search_service import SearchService
+from services.stats_service import StatsService
+
+# Entities loaded per batch by get_many, well under SQLite's bound parameter limit
+LOAD_CHUNK_SIZE = 500
 
 
 class EntityService:
@@ -8,59 +21,190 @@ class EntityService:
     def _int_to_bool(value) -> bool:
         return bool(value)
 
+    # (version, wire list) of the last list() result
+    _list_cache = (None, None)
+
     @staticmethod
-    def list():
-        """List all entities"""
-        with engine.connect() as conn:
+    @instrumented
+    def list(version: tuple = None):
+        """
+        List all entities with their summary counts (row, field and column
+        counts, last modified). `version` is RevisionService.snapshot(): as
+        long as it is unchanged the previous result is served from memory.
+        """
+        cached_version, cached = EntityService._list_cache
+        if version is not None and version == cached_version:
+            return cached
+
+        with read_engine.connect() as conn:
             rows = conn.execute(
                 text("""
-                    SELECT id, title, api, form_type, component, created_at
-                    FROM entities
-                    ORDER BY created_at DESC
+                    SELECT e.id, e.title, e.api, e.form_type, e.component, e.created_at,
+                           COALESCE(s.row_count, 0) AS row_count,
+                           COALESCE(s.field_count, 0) AS field_count,
+                           COALESCE(s.column_count, 0) AS column_count,
+                           COALESCE(s.last_modified, e.created_at) AS last_modified
+                    FROM entities e
+                    LEFT JOIN entity_stats s ON s.entity_id = e.id
+                    ORDER BY e.created_at DESC
                 """)
             ).mappings().all()
 
-        return [dict(row) for row in rows]
+        entities = to_wire([dict(row) for row in rows])
+        if version is not None:
+            EntityService._list_cache = (version, entities)
+        return entities
 
     @staticmethod
+    def _compiled_many(entity_ids) -> dict:
+        """
+        {lowercased id: (metadata, wire form)} for the given entities, served
+        from the metadata cache; misses are loaded together in one batch.
+        The camelCase wire form is built once per load so responses do not
+        have to re-walk it. Unknown ids are left out.
+
+        Cache hits are checked against entities.revision (one query), so
+        metadata changed by another process is reloaded.
+        """
+        compiled = {}
+        versions = {}
+        for entity_id in entity_ids:
+            key = entity_id.lower()
+            if key in compiled or key in versions:
+                continue
+            cached = metadata_cache.get(entity_id)
+            if cached is not None:
+                compiled[key] = cached
+            else:
+                versions[key] = metadata_cache.version(entity_id)
+
+        if compiled:
+            stored = EntityService._revisions(list(compiled))
+            for key in [k for k, (e, _) in compiled.items() if stored.get(k) != e["revision"]]:
+                metadata_cache.invalidate(key)
+                del compiled[key]
+                versions[key] = metadata_cache.version(key)
+
+        if versions:
+            for e in EntityService._load_many(list(versions)):
+                key = e["id"].lower()
+                compiled[key] = (e, to_wire(e))
+                metadata_cache.put(key, versions[key], compiled[key])
+
+        return compiled
+
+    @staticmethod
+    def _compiled(entity_id: str):
+        return EntityService._compiled_many([entity_id]).get(entity_id.lower())
+
+    @staticmethod
+    @instrumented
     def get_full(entity_id: str):
-        with engine.connect() as conn:
-            e = conn.execute(
+        """
+        Compiled metadata for one entity, served from the metadata cache.
+        The returned dict is shared and must not be mutated.
+        """
+        compiled = EntityService._compiled(entity_id)
+        return compiled[0] if compiled else None
+
+    @staticmethod
+    def get_full_wire(entity_id: str):
+        """Same as get_full, already in camelCase wire form (shared, read-only)."""
+        compiled = EntityService._compiled(entity_id)
+        return compiled[1] if compiled else None
+
+    @staticmethod
+    @instrumented
+    def get_many(entity_ids, wire: bool = False):
+        """
+        Batched get_full: compiled metadata for several entities, in the
+        order requested, using at most four queries per uncached chunk.
+        Unknown ids are skipped. With `wire=True` the camelCase wire forms
+        are returned instead. Returned dicts are shared and read-only.
+        """
+        compiled = EntityService._compiled_many(entity_ids)
+        result = []
+        seen = set()
+        for entity_id in entity_ids:
+            key = entity_id.lower()
+            if key in compiled and key not in seen:
+                seen.add(key)
+                result.append(compiled[key][1 if wire else 0])
+        return result
+
+    @staticmethod
+    def _revisions(keys) -> dict:
+        """{lowercased id: metadata revision} of the given (lowercased) entity ids."""
+        ids_param = bindparam("ids", expanding=True)
+        revisions = {}
+        with read_engine.connect() as conn:
+            for start in range(0, len(keys), LOAD_CHUNK_SIZE):
+                revisions.update(conn.execute(
+                    text("""
+                        SELECT lower(id), revision
+                        FROM entities
+                        WHERE id COLLATE NOCASE IN :ids
+                    """).bindparams(ids_param),
+                    {"ids": keys[start:start + LOAD_CHUNK_SIZE]},
+                ).all())
+        return revisions
+
+    @staticmethod
+    def _load_many(entity_ids) -> list:
+        """Load and parse entities (any casing) with their columns, fields and actions."""
+        entities = []
+        for start in range(0, len(entity_ids), LOAD_CHUNK_SIZE):
+            entities.extend(EntityService._load_chunk(entity_ids[start:start + LOAD_CHUNK_SIZE]))
+        return entities
+
+    @staticmethod
+    def _load_chunk(entity_ids) -> list:
+        ids_param = bindparam("ids", expanding=True)
+        with read_engine.connect() as conn:
+            entities = conn.execute(
                 text("""
-                    SELECT id, title, api, form_type, component
+                    SELECT id, title, api, form_type, component, revision
                     FROM entities
-                    WHERE LOWER(id) = LOWER(:id)
-                """),
-                {"id": entity_id},
-            ).mappings().first()
+                    WHERE id COLLATE NOCASE IN :ids
+                """).bindparams(ids_param),
+                {"ids": entity_ids},
+            ).mappings().all()
 
-            if not e:
-                return None
+            if not entities:
+                return []
 
-            e = dict(e)
+            # Child tables are keyed by the canonical id
+            by_id = {}
+            for e in entities:
+                e = dict(e)
+                e["columns"] = []
+                e["fields"] = []
+                e["actions"] = []
+                by_id[e["id"]] = e
+            params = {"ids": list(by_id)}
 
             # columns
             cols = conn.execute(
                 text("""
-                    SELECT id, header_name, field, renderer,
-                           renderer_params, hidden, sort_order
+                    SELECT id, entity_id, header_name, field, renderer,
+                           renderer_params, hidden, indexed, sort_order
                     FROM entity_columns
-                    WHERE LOWER(entity_id) = LOWER(:id)
-                    ORDER BY sort_order
-                """),
-                {"id": entity_id},
+                    WHERE entity_id IN :ids
+                    ORDER BY entity_id, sort_order
+                """).bindparams(ids_param),
+                params,
             ).mappings().all()
 
             # fields
             flds = conn.execute(
                 text("""
-                    SELECT id, name, label, type, required, config,
+                    SELECT id, entity_id, name, label, type, required, searchable, config,
                            depends_on, options_api, option_label, option_value, sort_order
                     FROM entity_fields
-                    WHERE LOWER(entity_id) = LOWER(:id)
-                    ORDER BY sort_order
-                """),
-                {"id": entity_id},
+                    WHERE entity_id IN :ids
+                    ORDER BY entity_id, sort_order
+                """).bindparams(ids_param),
+                params,
             ).mappings().all()
 
             # actions (admin sees everything)
@@ -68,90 +212,94 @@ class EntityService:
                 text("""
                     SELECT *
                     FROM entity_actions
-                    WHERE LOWER(entity_id) = LOWER(:id)
-                """),
-                {"id": entity_id},
+                    WHERE entity_id IN :ids
+                """).bindparams(ids_param),
+                params,
             ).mappings().all()
 
         # JSON parsing + boolean normalization
-        parsed_cols = []
-        for c in cols:
-            c = dict(c)
-            c["renderer_params"] = json.loads(c["renderer_params"] or "{}")
-            c["hidden"] = EntityService._int_to_bool(c["hidden"])
-            parsed_cols.append(c)
-
-        parsed_flds = []
-        for f in flds:
-            f = dict(f)
-            f["required"] = EntityService._int_to_bool(f["required"])
-            # Map DB columns to API keys (camelCase)
-            if f.get("options_api") is not None:
-                f["optionsAPI"] = f.pop("options_api")
-            if f.get("option_label") is not None:
-                f["optionLabel"] = f.pop("option_label")
-            if f.get("option_value") is not None:
-                f["optionValue"] = f.pop("option_value")
-
-            # Parse and merge JSON config if present, normalize legacy token
-            try:
-                cfg = json.loads(f.get("config") or "{}")
-            except Exception:
-                cfg = {}
-
-            # No legacy token handling; expecting `requiredIf.operator` (equals|present)
-
-            # Merge config keys to top-level (e.g., requiredIf)
-            f.update(cfg)
-            # Remove raw config key (already merged)
-            if "config" in f:
-                del f["config"]
-
-            parsed_flds.append(f)
-
-        parsed_acts = []
-        for a in acts:
-            a = dict(a)
-            a["form"] = json.loads(a["form"] or "{}")
-            a["dialog_options"] = json.loads(a["dialog_options"] or "{}")
-            parsed_acts.append(a)
-
-        e["columns"] = parsed_cols
-        e["fields"] = parsed_flds
-        e["actions"] = parsed_acts
-
-        return e
+        with timed("json"):
+            for c in cols:
+                c = dict(c)
+                owner = by_id[c.pop("entity_id")]
+                c["renderer_params"] = json.loads(c["renderer_params"] or "{}")
+                c["hidden"] = EntityService._int_to_bool(c["hidden"])
+                c["indexed"] = EntityService._int_to_bool(c["indexed"])
+                owner["columns"].append(c)
+
+            for f in flds:
+                f = dict(f)
+                owner = by_id[f.pop("entity_id")]
+                f["required"] = EntityService._int_to_bool(f["required"])
+                f["searchable"] = EntityService._int_to_bool(f["searchable"])
+                # Map DB columns to API keys (camelCase)
+                if f.get("options_api") is not None:
+                    f["optionsAPI"] = f.pop("options_api")
+                if f.get("option_label") is not None:
+                    f["optionLabel"] = f.pop("option_label")
+                if f.get("option_value") is not None:
+                    f["optionValue"] = f.pop("option_value")
+
+                # Parse and merge JSON config if present, normalize legacy token
+                try:
+                    cfg = json.loads(f.get("config") or "{}")
+                except Exception:
+                    cfg = {}
+
+                # No legacy token handling; expecting `requiredIf.operator` (equals|present)
+
+                # Merge config keys to top-level (e.g., requiredIf)
+                f.update(cfg)
+                # Remove raw config key (already merged)
+                if "config" in f:
+                    del f["config"]
+
+                owner["fields"].append(f)
+
+            for a in acts:
+                a = dict(a)
+                a["form"] = json.loads(a["form"] or "{}")
+                a["dialog_options"] = json.loads(a["dialog_options"] or "{}")
+                by_id[a["entity_id"]]["actions"].append(a)
+
+        return list(by_id.values())
 
     @staticmethod
-    def list_full():
+    @instrumented
+    def list_full(wire: bool = False):
         """
         ADMIN ONLY.
         Returns a full schema dump of all entities.
         Includes internal IDs and admin-only configuration.
         NOT SAFE for frontend runtime usage.
         """
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             ids = conn.execute(
                 text("SELECT id FROM entities ORDER BY created_at")
             ).scalars().all()
 
-            entities = []
-            for entity_id in ids:
-                entities.append(
-                    EntityService.get_full(entity_id)
-                )
+        return EntityService.get_many(ids, wire=wire)
 
-        return entities
+    @staticmethod
+    def resolve_id(entity_id: str):
+        """
+        Resolve a user supplied entity id (any casing) to the canonical
+        `entities.id`. Controllers call this once per request and pass the
+        canonical id down, so services can use exact, indexed lookups.
+        Served from the metadata cache once the entity has been loaded.
+        """
+        entity = EntityService.get_full(entity_id)
+        return entity["id"] if entity else None
 
     @staticmethod
     def get(entity_id: str):
         """Get single entity (case-insensitive)"""
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             row = conn.execute(
                 text("""
                     SELECT id, title, api, form_type, component, created_at
                     FROM entities
-                    WHERE LOWER(id) = LOWER(:id)
+                    WHERE id = :id COLLATE NOCASE
                 """),
                 {"id": entity_id},
             ).mappings().first()
@@ -168,145 +316,255 @@ class EntityService:
                 """),
                 data,
             )
+            revision = RevisionService.bump_metadata(conn, data["id"])
+        metadata_cache.invalidate(data["id"])
+        change_feed.metadata(data["id"], revision)
         return data["id"]
 
     @staticmethod
+    @instrumented
+    def create_full(data: dict):
+        """
+        ADMIN ONLY.
+        Creates an entity with its columns, fields and actions.
+        Accepts camelCase or snake_case payloads.
+        """
+        EntityService.create({
+            "id": data["id"],
+            "title": data.get("title"),
+            "api": data.get("api"),
+            "form_type": data.get("form_type") or data.get("formType"),
+            "component": data.get("component"),
+        })
+        EntityService.update_full(data["id"], data)
+        return data["id"]
+
+    @staticmethod
+    @instrumented
     def delete(entity_id: str):
         with engine.begin() as conn:
             conn.execute(
                 text("""
                     DELETE FROM entities
-                    WHERE LOWER(id) = LOWER(:id)
+                    WHERE id = :id
                 """),
                 {"id": entity_id},
             )
+            ProjectionService.sync(conn, entity_id)
+            StatsService.remove(conn, entity_id)
+            SearchService.remove(conn, entity_id)
+            CodecService.remove(conn, entity_id)
+            revision = RevisionService.bump_metadata(conn)
+        metadata_cache.invalidate(entity_id)
+        CodecService.invalidate(entity_id)
+        column_store.invalidate(entity_id)
+        change_feed.metadata(entity_id, revision, deleted=True)
+
+    # Child tables synced by update_full: table -> (columns, JSON columns)
+    _CHILD_TABLES = {
+        "entity_columns": (
+            ("header_name", "field", "renderer", "renderer_params", "hidden", "indexed", "sort_order"),
+            ("renderer_params",),
+        ),
+        "entity_fields": (
+            ("name", "label", "type", "required", "searchable", "depends_on", "config",
+             "options_api", "option_label", "option_value", "sort_order"),
+            ("config",),
+        ),
+        "entity_actions": (
+            ("label", "tooltip", "type", "icon", "icon_color", "form", "api",
+             "id_field", "method", "confirm", "handler", "dialog_options"),
+            ("form", "dialog_options"),
+        ),
+    }
+
+    @staticmethod
+    def _column_row(c: dict) -> dict:
+        return {
+            "id": c.get("id"),
+            "header_name": c.get("header_name") or c.get("headerName"),
+            "field": c.get("field"),
+            "renderer": c.get("renderer"),
+            "renderer_params": c.get("renderer_params") or c.get("rendererParams", {}),
+            "hidden": int(bool(c.get("hidden"))),
+            "indexed": int(bool(c.get("indexed"))),
+            "sort_order": c.get("sort_order", c.get("sortOrder", 0)),
+        }
+
+    @staticmethod
+    def _field_row(f: dict) -> dict:
+        # Build config JSON: prefer explicit `config` key, but also
+        # accept top-level keys (e.g., `requiredIf`) from UI and merge them.
+        cfg = f.get("config") or {}
+        # If UI sent known rule keys at top-level, merge them into cfg
+        if f.get("requiredIf") is not None and "requiredIf" not in cfg:
+            cfg = dict(cfg)
+            cfg["requiredIf"] = f.get("requiredIf")
+
+        return {
+            "id": f.get("id"),
+            "name": f.get("name"),
+            "label": f.get("label"),
+            "type": f.get("type"),
+            "required": int(bool(f.get("required"))),
+            "searchable": int(bool(f.get("searchable"))),
+            "depends_on": f.get("depends_on") or f.get("dependsOn"),
+            "config": cfg or {},
+            "options_api": f.get("options_api") or f.get("optionsAPI"),
+            "option_label": f.get("option_label") or f.get("optionLabel"),
+            "option_value": f.get("option_value") or f.get("optionValue"),
+            "sort_order": f.get("sort_order", f.get("sortOrder", 0)),
+        }
+
+    @staticmethod
+    def _action_row(a: dict) -> dict:
+        confirm = a.get("confirm")
+        return {
+            "id": a["id"],
+            "label": a.get("label"),
+            "tooltip": a.get("tooltip"),
+            "type": a.get("type"),
+            "icon": a.get("icon"),
+            "icon_color": a.get("icon_color") or a.get("iconColor"),
+            "form": a.get("form", {}),
+            "api": a.get("api"),
+            "id_field": a.get("id_field") or a.get("idField"),
+            "method": a.get("method"),
+            "confirm": None if confirm is None else int(bool(confirm)),
+            "handler": a.get("handler"),
+            "dialog_options": a.get("dialog_options") or a.get("dialogOptions", {}),
+        }
+
+    @staticmethod
+    def _sync_children(conn, table: str, entity_id: str, rows: list) -> bool:
+        """
+        Bring one child table in line with `rows` (dicts from the _*_row
+        helpers). Only rows that differ are written, in executemany batches;
+        ids of unchanged and updated rows are kept. Returns True if anything
+        was written.
+        """
+        columns, json_columns = EntityService._CHILD_TABLES[table]
+
+        existing = {}
+        for r in conn.execute(
+            text(f"SELECT id, {', '.join(columns)} FROM {table} WHERE entity_id = :eid"),
+            {"eid": entity_id},
+        ).mappings():
+            r = dict(r)
+            for c in json_columns:
+                r[c] = json.loads(r[c] or "{}")
+            existing[r["id"]] = r
+
+        inserts, updates, kept = [], [], set()
+        for row in rows:
+            current = existing.get(row["id"])
+            if current is None:
+                inserts.append(row)
+                continue
+            kept.add(row["id"])
+            if any(row[c] != current[c] for c in columns):
+                updates.append(row)
+
+        deletes = [{"id": i, "entity_id": entity_id} for i in existing if i not in kept]
+
+        def params(batch):
+            out = []
+            for row in batch:
+                row = {**row, "entity_id": entity_id}
+                for c in json_columns:
+                    row[c] = json.dumps(row[c])
+                out.append(row)
+            return out
+
+        if deletes:
+            conn.execute(
+                text(f"DELETE FROM {table} WHERE id = :id AND entity_id = :entity_id"),
+                deletes,
+            )
+        if updates:
+            assignments = ", ".join(f"{c} = :{c}" for c in columns)
+            conn.execute(
+                text(f"UPDATE {table} SET {assignments} WHERE id = :id AND entity_id = :entity_id"),
+                params(updates),
+            )
+        if inserts:
+            names = ("id", "entity_id") + columns
+            conn.execute(
+                text(f"""
+                    INSERT INTO {table} ({', '.join(names)})
+                    VALUES ({', '.join(':' + n for n in names)})
+                """),
+                params(inserts),
+            )
+
+        return bool(deletes or updates or inserts)
 
     @staticmethod
+    @instrumented
     def update_full(entity_id: str, data: dict):
         """
         ADMIN ONLY.
         Replaces full entity schema (entity + columns + fields + actions).
         Accepts camelCase or snake_case payloads.
+
+        The new definition is diffed against the stored one: unchanged rows
+        are left alone, ids of existing rows are stable, and nothing is
+        written (nor the revision bumped) if the definition is identical.
         """
+        base = {
+            "id": entity_id,
+            "title": data.get("title"),
+            "api": data.get("api"),
+            "form_type": data.get("form_type") or data.get("formType"),
+            "component": data.get("component"),
+        }
+
         with engine.begin() as conn:
             # --- update base entity ---
-            conn.execute(
+            current = conn.execute(
                 text("""
-                    UPDATE entities
-                    SET title = :title,
-                        api = :api,
-                        form_type = :form_type,
-                        component = :component
-                    WHERE LOWER(id) = LOWER(:id)
+                    SELECT id, title, api, form_type, component
+                    FROM entities
+                    WHERE id = :id
                 """),
-                {
-                    "id": entity_id,
-                    "title": data.get("title"),
-                    "api": data.get("api"),
-                    "form_type": data.get("form_type") or data.get("formType"),
-                    "component": data.get("component"),
-                },
-            )
-
-            # --- wipe dependent tables ---
-            conn.execute(
-                text("DELETE FROM entity_columns WHERE LOWER(entity_id) = LOWER(:id)"),
-                {"id": entity_id},
-            )
-            conn.execute(
-                text("DELETE FROM entity_fields WHERE LOWER(entity_id) = LOWER(:id)"),
-                {"id": entity_id},
-            )
-            conn.execute(
-                text("DELETE FROM entity_actions WHERE LOWER(entity_id) = LOWER(:id)"),
                 {"id": entity_id},
-            )
-
-            # --- reinsert columns ---
-            for c in data.get("columns", []):
-                conn.execute(
-                    text("""
-                        INSERT INTO entity_columns (
-                            id, entity_id, header_name, field,
-                            renderer, renderer_params, hidden, sort_order
-                        )
-                        VALUES (
-                            :id, :entity_id, :header_name, :field,
-                            :renderer, :renderer_params, :hidden, :sort_order
-                        )
-                    """),
-                    {
-                        "id": c.get("id"),
-                        "entity_id": entity_id,
-                        "header_name": c.get("header_name") or c.get("headerName"),
-                        "field": c.get("field"),
-                        "renderer": c.get("renderer"),
-                        "renderer_params": json.dumps(
-                            c.get("renderer_params") or c.get("rendererParams", {})
-                        ),
-                        "hidden": int(bool(c.get("hidden"))),
-                        "sort_order": c.get("sort_order", c.get("sortOrder", 0)),
-                    },
-                )
-
-            # --- reinsert fields ---
-            for f in data.get("fields", []):
-                # Build config JSON: prefer explicit `config` key, but also
-                # accept top-level keys (e.g., `requiredIf`) from UI and merge them.
-                cfg = f.get("config") or {}
-                # If UI sent known rule keys at top-level, merge them into cfg
-                if f.get("requiredIf") is not None and "requiredIf" not in cfg:
-                    cfg = dict(cfg)
-                    cfg["requiredIf"] = f.get("requiredIf")
+            ).mappings().first()
 
+            changed = current is None or dict(current) != base
+            if changed:
                 conn.execute(
                     text("""
-                        INSERT INTO entity_fields (
-                            id, entity_id, name, label, type,
-                            required, depends_on, config, sort_order
-                        )
-                        VALUES (
-                            :id, :entity_id, :name, :label, :type,
-                            :required, :depends_on, :config, :sort_order
-                        )
+                        UPDATE entities
+                        SET title = :title,
+                            api = :api,
+                            form_type = :form_type,
+                            component = :component
+                        WHERE id = :id
                     """),
-                    {
-                        "id": f.get("id"),
-                        "entity_id": entity_id,
-                        "name": f.get("name"),
-                        "label": f.get("label"),
-                        "type": f.get("type"),
-                        "required": int(bool(f.get("required"))),
-                        "depends_on": f.get("depends_on") or f.get("dependsOn"),
-                        "config": json.dumps(cfg or {}),
-                        "sort_order": f.get("sort_order", f.get("sortOrder", 0)),
-                    },
+                    base,
                 )
 
-            # --- reinsert actions ---
-            for a in data.get("actions", []):
-                conn.execute(
-                    text("""
-                        INSERT INTO entity_actions (
-                            id, entity_id, name, label, type,
-                            form, dialog_options
-                        )
-                        VALUES (
-                            :id, :entity_id, :name, :label, :type,
-                            :form, :dialog_options
-                        )
-                    """),
-                    {
-                        "id": a["id"],
-                        "entity_id": entity_id,
-                        "name": a.get("name"),
-                        "label": a.get("label"),
-                        "type": a.get("type"),
-                        "form": json.dumps(
-                            a.get("form", {})
-                        ),
-                        "dialog_options": json.dumps(
-                            a.get("dialog_options") or a.get("dialogOptions", {})
-                        ),
-                    },
-                )
+            # --- sync dependent tables ---
+            children = {
+                "entity_columns": [EntityService._column_row(c) for c in data.get("columns", [])],
+                "entity_fields": [EntityService._field_row(f) for f in data.get("fields", [])],
+                "entity_actions": [EntityService._action_row(a) for a in data.get("actions", [])],
+            }
+            for table, rows in children.items():
+                if EntityService._sync_children(conn, table, entity_id, rows):
+                    changed = True
+
+            # --- add / drop typed projections for indexed columns ---
+            if ProjectionService.sync(conn, entity_id):
+                changed = True
+
+            # --- full-text index over searchable fields ---
+            if SearchService.sync(conn, entity_id):
+                changed = True
+
+            if changed:
+                revision = RevisionService.bump_metadata(conn, entity_id)
+
+        if changed:
+            metadata_cache.invalidate(entity_id)
+            change_feed.metadata(entity_id, revision)
@@ -1,6 +1,11 @@
 import json
 from sqlalchemy import text
-from db import engine
+from db import engine, read_engine
+from services.change_feed import change_feed
+from services.metadata_cache import metadata_cache
+from services.projection_service import ProjectionService
+from services.revision_service import RevisionService
+from services.search_service import SearchService
 
 
 class FieldService:
@@ -14,12 +19,12 @@ class FieldService:
 
     @staticmethod
     def list(entity_id: str):
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             rows = conn.execute(
                 text("""
                     SELECT id, name, label, type, required, config, depends_on, sort_order
                     FROM entity_fields
-                    WHERE LOWER(entity_id) = LOWER(:eid)
+                    WHERE entity_id = :eid
                     ORDER BY sort_order ASC
                 """),
                 {"eid": entity_id},
@@ -69,7 +74,12 @@ class FieldService:
                 """),
                 {"entity_id": entity_id, "config": config_str, **data},
             )
-            return res.lastrowid
+            # A projection's column type follows its field's type
+            ProjectionService.sync(conn, entity_id)
+            revision = RevisionService.bump_metadata(conn, entity_id)
+        metadata_cache.invalidate(entity_id)
+        change_feed.metadata(entity_id, revision)
+        return res.lastrowid
 
     @staticmethod
     def update(entity_id: str, field_id: int, data: dict):
@@ -95,10 +105,15 @@ class FieldService:
                         depends_on = :depends_on,
                         sort_order = :sort_order
                     WHERE id = :id
-                      AND LOWER(entity_id) = LOWER(:entity_id)
+                      AND entity_id = :entity_id
                 """),
                 {"id": field_id, "entity_id": entity_id, "config": config_str, **data},
             )
+            ProjectionService.sync(conn, entity_id)
+            SearchService.sync(conn, entity_id)
+            revision = RevisionService.bump_metadata(conn, entity_id)
+        metadata_cache.invalidate(entity_id)
+        change_feed.metadata(entity_id, revision)
 
     @staticmethod
     def delete(entity_id: str, field_id: int):
@@ -107,7 +122,12 @@ class FieldService:
                 text("""
                     DELETE FROM entity_fields
                     WHERE id = :id
-                      AND LOWER(entity_id) = LOWER(:entity_id)
+                      AND entity_id = :entity_id
                 """),
                 {"id": field_id, "entity_id": entity_id},
             )
+            ProjectionService.sync(conn, entity_id)
+            SearchService.sync(conn, entity_id)
+            revision = RevisionService.bump_metadata(conn, entity_id)
+        metadata_cache.invalidate(entity_id)
+        change_feed.metadata(entity_id, revision)
@@ -0,0 +1,80 @@
+# backend/services/metadata_cache.py
+import os
+import threading
+from collections import OrderedDict
+
+
+class MetadataCache:
+    """
+    Bounded LRU cache for compiled entity metadata (EntityService.get_full).
+
+    Every entity has a version stamp that is bumped on invalidation. A
+    reader captures the version before querying SQLite and `put` drops the
+    value if a write invalidated the entity in the meantime, so a slow
+    reader can never re-insert stale metadata.
+
+    Cached values are shared between requests and must be treated as
+    read-only.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # key -> (version, value)
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(entity_id: str) -> str:
+        return entity_id.lower()
+
+    def version(self, entity_id: str) -> int:
+        with self._lock:
+            return self._versions.get(self._key(entity_id), 0)
+
+    def get(self, entity_id: str):
+        key = self._key(entity_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self._versions.get(key, 0):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, entity_id: str, version: int, value) -> bool:
+        key = self._key(entity_id)
+        with self._lock:
+            if version != self._versions.get(key, 0):
+                return False
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, entity_id: str):
+        key = self._key(entity_id)
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._entries.pop(key, None)
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+metadata_cache = MetadataCache(int(os.environ.get("METADATA_CACHE_SIZE", "256")))
@@ -0,0 +1,103 @@
+# backend/services/options_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Pending:
+    """A lookup in flight; concurrent callers for the same key wait on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class OptionsCache:
+    """
+    TTL + LRU cache for dynamic-select option lists, keyed by the resolved
+    options URL (so each parent value has its own entry).
+
+    `get_or_load` coalesces concurrent misses: the first caller runs the
+    loader, the others wait for its result, so the source is hit once per
+    key. Failures are passed to every waiter and are not cached.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def get_or_load(self, key: str, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                pending = self._pending[key] = _Pending()
+                owner = True
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = loader()
+        except Exception as e:
+            pending.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, pending.value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return pending.value
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "errors": self.errors,
+            }
+
+
+options_cache = OptionsCache(
+    int(os.environ.get("OPTIONS_CACHE_SIZE", "1024")),
+    float(os.environ.get("OPTIONS_CACHE_TTL", "300")),
+)
@@ -0,0 +1,166 @@
+# backend/services/options_service.py
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urljoin, urlsplit
+from serialization import Wire, WireList
+from instrumentation import instrumented
+from services.entity_service import EntityService
+from services.options_cache import options_cache
+
+OPTIONS_TIMEOUT = float(os.environ.get("OPTIONS_TIMEOUT", "10"))
+# Base for relative options_api paths (e.g. "/api/countries"). Never taken
+# from the request (its Host header is client-controlled): without it,
+# relative sources are left for the client to fetch.
+OPTIONS_BASE_URL = os.environ.get("OPTIONS_BASE_URL")
+# Comma separated host names that may be fetched (besides OPTIONS_BASE_URL's);
+# empty allows any absolute options_api URL
+OPTIONS_ALLOWED_HOSTS = {
+    h.strip().lower() for h in os.environ.get("OPTIONS_ALLOWED_HOSTS", "").split(",") if h.strip()
+}
+MAX_PARALLEL_LOOKUPS = 8
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+class OptionsError(Exception):
+    """The options source for a field could not be read."""
+
+
+class OptionsUnresolved(OptionsError):
+    """The options source is not fetched server-side; `url` is left for the client."""
+
+    def __init__(self, url: str):
+        super().__init__(f"Options source {url} is not resolved server-side")
+        self.url = url
+
+
+class OptionsService:
+    """
+    Server-side option lists for select / dynamic-select fields.
+
+    `options_api` templates are resolved like SchemaForm.tsx does it
+    (`{country}` -> the parent value) and fetched through the shared
+    options cache, so every parent value is looked up at most once per TTL
+    no matter how many forms ask for it at the same time.
+
+    Only OPTIONS_BASE_URL and OPTIONS_ALLOWED_HOSTS decide what may be
+    fetched; other sources are returned unresolved (OptionsUnresolved).
+    """
+
+    @staticmethod
+    def _resolve_url(template: str, values: dict) -> str:
+        return _PLACEHOLDER.sub(
+            lambda m: quote(str(values.get(m.group(1)) or ""), safe=""),
+            template,
+        )
+
+    @staticmethod
+    def _source_url(template: str, values: dict) -> str:
+        """Absolute URL to fetch for a template; raises OptionsUnresolved if it may not be fetched."""
+        url = OptionsService._resolve_url(template, values)
+        if not urlsplit(url).netloc:
+            if not OPTIONS_BASE_URL:
+                raise OptionsUnresolved(url)
+            url = urljoin(OPTIONS_BASE_URL, url)
+        parts = urlsplit(url)
+        allowed = OPTIONS_ALLOWED_HOSTS
+        if OPTIONS_BASE_URL:
+            allowed = allowed | {urlsplit(OPTIONS_BASE_URL).hostname}
+        if parts.scheme not in ("http", "https") or (allowed and parts.hostname not in allowed):
+            raise OptionsUnresolved(url)
+        return url
+
+    @staticmethod
+    def _fetch(url: str):
+        # Imported on first use: requests (and urllib3 / ssl) is the
+        # slowest import of the app and only needed for dynamic selects
+        import requests
+
+        try:
+            res = requests.get(url, timeout=OPTIONS_TIMEOUT)
+            res.raise_for_status()
+            data = res.json()
+        except (requests.RequestException, ValueError) as e:
+            raise OptionsError(f"Options source {url} failed: {e}")
+        if not isinstance(data, list):
+            raise OptionsError(f"Options source {url} did not return a list")
+        # Source payloads are passed through as is, keys included
+        return WireList(data)
+
+    @staticmethod
+    def field_options(field: dict, values: dict) -> list:
+        """
+        Options for one compiled field, given the current form values.
+        Returns [] while a dependent field's parent has no value.
+        """
+        if field.get("type") == "select":
+            return WireList(field.get("options") or [])
+
+        template = field.get("optionsAPI")
+        if not template:
+            return WireList()
+        if field.get("depends_on") and not values.get(field["depends_on"]):
+            return WireList()
+
+        url = OptionsService._source_url(template, values)
+        return options_cache.get_or_load(url, lambda: OptionsService._fetch(url))
+
+    @staticmethod
+    def _option_fields(entity: dict, names=None) -> list:
+        fields = [f for f in entity["fields"] if f.get("type") in ("select", "dynamic-select")]
+        if names is not None:
+            fields = [f for f in fields if f["name"] in names]
+        return fields
+
+    @staticmethod
+    @instrumented
+    def get(entity_id: str, field_name: str, values: dict):
+        """Options for one field; None if the entity or field does not exist."""
+        entity = EntityService.get_full(entity_id)
+        if not entity:
+            return None
+        return OptionsService.options_for_field(entity, field_name, values)
+
+    @staticmethod
+    def options_for_field(entity: dict, field_name: str, values: dict):
+        """get() for already loaded entity metadata; does not touch the database."""
+        field = next(iter(OptionsService._option_fields(entity, {field_name})), None)
+        if field is None:
+            return None
+        return OptionsService.field_options(field, values)
+
+    @staticmethod
+    @instrumented
+    def get_many(entity_id: str, values: dict, names=None):
+        """
+        Batch mode: option lists for every select / dynamic-select field of
+        an entity (or only `names`), looked up in parallel. Returns
+        {field: {"options": [...]}} with {"error": ...} for failed sources
+        and {"optionsAPI": url} for unresolved ones, or None if the entity
+        does not exist.
+        """
+        entity = EntityService.get_full(entity_id)
+        if not entity:
+            return None
+        return OptionsService.options_for(entity, values, names)
+
+    @staticmethod
+    def options_for(entity: dict, values: dict, names=None):
+        """get_many() for already loaded entity metadata; does not touch the database."""
+        fields = OptionsService._option_fields(entity, names)
+        if not fields:
+            return Wire()
+
+        def lookup(field):
+            try:
+                return Wire(options=OptionsService.field_options(field, values))
+            except OptionsUnresolved as e:
+                return Wire(optionsAPI=e.url)
+            except OptionsError as e:
+                return Wire(error=str(e))
+
+        with ThreadPoolExecutor(max_workers=min(len(fields), MAX_PARALLEL_LOOKUPS)) as pool:
+            results = list(pool.map(lookup, fields))
+        # Keyed by field name, which must not be camelCased
+        return Wire((f["name"], r) for f, r in zip(fields, results))
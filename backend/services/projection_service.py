@@ -0,0 +1,141 @@
+# backend/services/projection_service.py
+from sqlalchemy import text
+from services.codec_service import CodecService, json_path
+
+# Declared type (and so affinity) of a projection by field type; TEXT otherwise
+COLUMN_TYPES = {"number": "NUMERIC", "checkbox": "INTEGER"}
+
+
+class ProjectionService:
+    """
+    Typed projection columns for record fields that are sorted / filtered
+    often.
+
+    A column flagged `indexed` in entity_columns gets a VIRTUAL generated
+    column on entity_rows over json_extract (NULL for other entities) and
+    an (entity_id, projection, id) index, so RecordService.list_page can
+    sort and filter with an index scan instead of decoding every row.
+    Generated columns need no backfill: adding one is a schema change and
+    the index build reads the existing rows once.
+
+    The column is declared with the type of its field (COLUMN_TYPES), so
+    values compare and sort with that affinity, and the index is partial
+    (WHERE entity_id = ...): writes to other entities do not maintain it.
+
+    Projections are recorded in entity_projections and kept in sync from
+    the same transaction that changes entity_columns or the entity's
+    storage codec (the value expression depends on it, see Codec.value_sql).
+    """
+
+    @staticmethod
+    def column_name(column_id: int) -> str:
+        return f"proj_{int(column_id)}"
+
+    @staticmethod
+    def for_entity(entity: dict) -> dict:
+        """{field: projection column} for compiled entity metadata."""
+        return {
+            c["field"]: ProjectionService.column_name(c["id"])
+            for c in entity["columns"]
+            if c.get("indexed")
+        }
+
+    @staticmethod
+    def _literal(value: str) -> str:
+        return "'" + value.replace("'", "''") + "'"
+
+    @staticmethod
+    def _legacy_source(field: str) -> str:
+        # Projections created before storage codecs have no recorded source
+        return f"json_extract(data, {ProjectionService._literal(json_path(field))})"
+
+    @staticmethod
+    def _drop(conn, name: str):
+        conn.execute(text(f"DROP INDEX IF EXISTS idx_entity_rows_{name}"))
+        conn.execute(text(f"ALTER TABLE entity_rows DROP COLUMN {name}"))
+        conn.execute(
+            text("DELETE FROM entity_projections WHERE column_name = :name"),
+            {"name": name},
+        )
+
+    @staticmethod
+    def _add(conn, entity_id: str, name: str, field: str, source: str, column_type: str):
+        conn.execute(
+            text(f"""
+                ALTER TABLE entity_rows ADD COLUMN {name} {column_type}
+                GENERATED ALWAYS AS (
+                    CASE WHEN entity_id = {ProjectionService._literal(entity_id)}
+                         THEN {source}
+                    END
+                ) VIRTUAL
+            """)
+        )
+        conn.execute(
+            text(f"""
+                CREATE INDEX idx_entity_rows_{name}
+                ON entity_rows (entity_id, {name}, id)
+                WHERE entity_id = {ProjectionService._literal(entity_id)}
+            """)
+        )
+        conn.execute(
+            text("""
+                INSERT INTO entity_projections (column_name, entity_id, field, source, column_type)
+                VALUES (:name, :eid, :field, :source, :column_type)
+            """),
+            {"name": name, "eid": entity_id, "field": field, "source": source, "column_type": column_type},
+        )
+
+    @staticmethod
+    def sync(conn, entity_id: str) -> bool:
+        """
+        Add / drop projections so they match the entity's indexed columns.
+        Must run inside the caller's write transaction. Returns True if the
+        schema changed.
+        """
+        indexed = {
+            ProjectionService.column_name(r["id"]): (r["field"], COLUMN_TYPES.get(r["type"], "TEXT"))
+            for r in conn.execute(
+                text("""
+                    SELECT c.id, c.field, f.type
+                    FROM entity_columns c
+                    JOIN entities e ON e.id = c.entity_id
+                    LEFT JOIN entity_fields f ON f.entity_id = c.entity_id AND f.name = c.field
+                    WHERE c.entity_id = :eid AND c.indexed
+                """),
+                {"eid": entity_id},
+            ).mappings()
+        }
+        codec = CodecService.load(conn, entity_id)
+        if codec.name == "positional" and indexed:
+            # Give indexed fields a position before their expression is fixed
+            codec._set_layout(CodecService.extend_layout(conn, entity_id, [f for f, _ in indexed.values()]))
+        desired = {
+            name: (field, codec.value_sql(field), column_type)
+            for name, (field, column_type) in indexed.items()
+        }
+
+        # Projections from before typed columns (no column_type) are rebuilt
+        current = {
+            r["column_name"]: (
+                r["field"], r["source"] or ProjectionService._legacy_source(r["field"]), r["column_type"]
+            )
+            for r in conn.execute(
+                text("""
+                    SELECT column_name, field, source, column_type
+                    FROM entity_projections
+                    WHERE entity_id = :eid
+                """),
+                {"eid": entity_id},
+            ).mappings()
+        }
+
+        changed = False
+        for name, spec in current.items():
+            if desired.get(name) != spec:
+                ProjectionService._drop(conn, name)
+                changed = True
+        for name, spec in desired.items():
+            if current.get(name) != spec:
+                ProjectionService._add(conn, entity_id, name, *spec)
+                changed = True
+        return changed
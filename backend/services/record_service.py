@@ -1,40 +1,288 @@
 # backend/services/field_service.py
+import base64
 import json
 from sqlalchemy import text
-from db import engine
+from db import read_engine
+from serialization import Wire, WireList, to_wire
+from instrumentation import count_rows, instrumented, timed
+from services.change_feed import change_feed
+from services.codec_service import Codec, CodecService
+from services.entity_service import EntityService
+from services.projection_service import ProjectionService
+from services.revision_service import RevisionService
+from services.validation_service import ValidationError, ValidationService
+from services.write_queue import write_queue
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+MAX_PATCH_BATCH = 1000
+
+# AG Grid filter model operators -> SQL templates over a json_extract() value.
+# `{v}` is the extracted value, `{p}` / `{p_to}` are the bound parameters.
+_FILTER_OPS = {
+    "equals": "{v} = {p}",
+    "notEqual": "({v} IS NULL OR {v} != {p})",
+    "lessThan": "{v} < {p}",
+    "lessThanOrEqual": "{v} <= {p}",
+    "greaterThan": "{v} > {p}",
+    "greaterThanOrEqual": "{v} >= {p}",
+    "inRange": "{v} BETWEEN {p} AND {p_to}",
+    "contains": "{v} LIKE {p} ESCAPE '\\'",
+    "notContains": "({v} IS NULL OR {v} NOT LIKE {p} ESCAPE '\\')",
+    "startsWith": "{v} LIKE {p} ESCAPE '\\'",
+    "endsWith": "{v} LIKE {p} ESCAPE '\\'",
+    "blank": "({v} IS NULL OR {v} = '')",
+    "notBlank": "({v} IS NOT NULL AND {v} != '')",
+}
+
+# filterType of text / number / date / set filters (None: older clients)
+_FILTER_TYPES = (None, "text", "number", "date", "set")
+
+_LIKE_PATTERNS = {
+    "contains": "%{}%",
+    "notContains": "%{}%",
+    "startsWith": "{}%",
+    "endsWith": "%{}",
+}
 
 
 class RecordService:
     @staticmethod
+    def _row(r, codec: Codec) -> Wire:
+        """One entity_rows row in camelCase wire form."""
+        row = to_wire(codec.decode(r["data"]))
+        row["id"] = r["id"]
+        row["createdAt"] = r["created_at"]
+        return row
+
+    @staticmethod
+    def _encode_cursor(value, record_id: int) -> str:
+        raw = json.dumps([value, record_id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            value, record_id = json.loads(base64.urlsafe_b64decode(padded))
+            return value, int(record_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    def _sortable_fields(entity_id: str):
+        """(column fields, {field: projection column}) for an entity."""
+        entity = EntityService.get_full(entity_id)
+        if not entity:
+            return set(), {}
+        return {c["field"] for c in entity["columns"]}, ProjectionService.for_entity(entity)
+
+    @staticmethod
+    def filter_model(filters) -> dict:
+        """An AG Grid filter model ({field: filter}), or ValueError if it is not an object."""
+        if filters is None:
+            return {}
+        if not isinstance(filters, dict):
+            raise ValueError("filter must be an AG Grid filter model object, keyed by field")
+        return filters
+
+    @staticmethod
+    def _filter_clause(index, field: str, spec: dict, params: dict, v: str) -> str:
+        """
+        Translate one AG Grid filter model entry into a SQL predicate over
+        the value expression `v` (a projection column or Codec.value_sql).
+        Supports text/number/date filters (`type` + `filter`/`filterTo`,
+        or `dateFrom`/`dateTo`), set filters (`values`) and combined
+        filters (`operator` AND / OR over `conditions`, or the older
+        `condition1` / `condition2`). Raises ValueError for anything else.
+        """
+        if not isinstance(spec, dict):
+            raise ValueError(f"Filter for '{field}' must be an object")
+        filter_type = spec.get("filterType")
+        if filter_type not in _FILTER_TYPES:
+            raise ValueError(f"Unsupported filterType '{filter_type}' for '{field}'")
+
+        if "operator" in spec or "conditions" in spec:
+            operator = str(spec.get("operator", "")).upper()
+            conditions = spec.get("conditions")
+            if conditions is None:
+                conditions = [c for c in (spec.get("condition1"), spec.get("condition2")) if c is not None]
+            if operator not in ("AND", "OR") or not isinstance(conditions, list) or not conditions:
+                raise ValueError(f"Combined filter for '{field}' needs operator AND / OR and a list of conditions")
+            clauses = [
+                RecordService._filter_clause(
+                    f"{index}c{n}", field,
+                    {"filterType": filter_type, **c} if isinstance(c, dict) else c, params, v,
+                )
+                for n, c in enumerate(conditions)
+            ]
+            return "(" + f" {operator} ".join(clauses) + ")"
+
+        if filter_type == "set":
+            values = spec.get("values")
+            if not isinstance(values, list):
+                raise ValueError(f"Set filter for '{field}' needs a list of values")
+            if not values:
+                return "0"
+            names = []
+            for n, value in enumerate(values):
+                params[f"f{index}_{n}"] = value
+                names.append(f":f{index}_{n}")
+            return f"{v} IN ({', '.join(names)})"
+
+        op = spec.get("type")
+        if op not in _FILTER_OPS:
+            raise ValueError(f"Unsupported filter type '{op}' for '{field}'")
+
+        value = spec.get("filter", spec.get("dateFrom"))
+        value_to = spec.get("filterTo", spec.get("dateTo"))
+        if op not in ("blank", "notBlank") and (value is None or (op == "inRange" and value_to is None)):
+            raise ValueError(f"Filter '{op}' for '{field}' needs a value")
+        if op in _LIKE_PATTERNS:
+            escaped = str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            value = _LIKE_PATTERNS[op].format(escaped)
+
+        sql = _FILTER_OPS[op].format(v=v, p=f":f{index}", p_to=f":f{index}_to")
+        params[f"f{index}"] = value
+        params[f"f{index}_to"] = value_to
+        return sql
+
+    @staticmethod
+    def _keyset_clause(descending: bool, has_value: bool) -> str:
+        """
+        Rows strictly after the cursor for ORDER BY v, id (both in the same
+        direction). SQLite sorts NULLs first ascending and last descending.
+        """
+        if descending:
+            if not has_value:
+                return "(v IS NULL AND id < :cid)"
+            return "(v < :cv OR (v = :cv AND id < :cid) OR v IS NULL)"
+        if not has_value:
+            return "((v IS NULL AND id > :cid) OR v IS NOT NULL)"
+        return "(v > :cv OR (v = :cv AND id > :cid))"
+
+    @staticmethod
+    @instrumented
+    def list_page(entity_id: str, limit=None, cursor=None, sort=None,
+                  filters=None, start_row=None):
+        """
+        Keyset-paginated listing pushed down into SQLite.
+
+        - `sort` is a field from entity_columns, prefixed with '-' for
+          descending; defaults to newest first (id DESC).
+        - `filters` is an AG Grid filter model keyed by column field.
+        - `cursor` is the opaque `next_cursor` of the previous page.
+        - `start_row` is the AG Grid request offset; it is only used to
+          report `row_count` once the last page has been reached.
+
+        Returns an envelope matching AG Grid's server-side row model:
+        {rowData, rowCount, nextCursor}, already in wire form.
+        """
+        limit = DEFAULT_PAGE_SIZE if limit is None else int(limit)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        filters = RecordService.filter_model(filters)
+
+        descending = True
+        sort_field = None
+        if sort:
+            descending = sort.startswith("-")
+            sort_field = sort.lstrip("-+")
+
+        params = {"eid": entity_id, "limit": limit + 1}
+        where = ["entity_id = :eid"]
+
+        allowed, projections = RecordService._sortable_fields(entity_id)
+        if sort_field and sort_field not in allowed:
+            raise ValueError(f"Cannot sort on unknown field '{sort_field}'")
+        unknown = set(filters) - allowed
+        if unknown:
+            raise ValueError(f"Cannot filter on unknown field(s): {', '.join(sorted(unknown))}")
+
+        codec = CodecService.for_entity(entity_id)
+        with read_engine.connect() as conn:
+            for index, (field, spec) in enumerate(sorted(filters.items())):
+                where.append(RecordService._filter_clause(
+                    index, field, spec, params, projections.get(field) or codec.value_sql(field)
+                ))
+
+            if sort_field in projections:
+                sort_expr = projections[sort_field]
+            elif sort_field:
+                sort_expr = codec.value_sql(sort_field)
+            else:
+                sort_expr = "NULL"
+
+            keyset = ""
+            if cursor:
+                value, params["cid"] = RecordService._decode_cursor(cursor)
+                if sort_field:
+                    params["cv"] = value
+                    keyset = "WHERE " + RecordService._keyset_clause(descending, value is not None)
+                else:
+                    keyset = "WHERE id < :cid" if descending else "WHERE id > :cid"
+
+            direction = "DESC" if descending else "ASC"
+            # Unsorted pages order by id alone, which the (entity_id, id) index serves
+            order = f"v {direction}, id {direction}" if sort_field else f"id {direction}"
+            rows = conn.execute(
+                text(f"""
+                    SELECT id, data, created_at, v
+                    FROM (
+                        SELECT id, data, created_at, {sort_expr} AS v
+                        FROM entity_rows
+                        WHERE {" AND ".join(where)}
+                    )
+                    {keyset}
+                    ORDER BY {order}
+                    LIMIT :limit
+                """),
+                params,
+            ).mappings().all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        count_rows("RecordService.list_page", len(rows))
+
+        next_cursor = None
+        row_count = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = RecordService._encode_cursor(last["v"], last["id"])
+        elif start_row is not None:
+            row_count = int(start_row) + len(rows)
+
+        with timed("json"):
+            row_data = WireList(RecordService._row(r, codec) for r in rows)
+        return Wire(rowData=row_data, rowCount=row_count, nextCursor=next_cursor)
+
+    @staticmethod
+    @instrumented
     def list(entity_id: str):
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             rows = conn.execute(
                 text("""
                     SELECT id, data, created_at
                     FROM entity_rows
-                    WHERE LOWER(entity_id) = LOWER(:eid)
+                    WHERE entity_id = :eid
                     ORDER BY id DESC
                 """),
                 {"eid": entity_id},
             ).mappings().all()
 
-        return [
-            {
-                "id": r["id"],
-                **json.loads(r["data"]),
-                "created_at": r["created_at"],
-            }
-            for r in rows
-        ]
+        count_rows("RecordService.list", len(rows))
+        codec = CodecService.for_entity(entity_id)
+        with timed("json"):
+            return WireList(RecordService._row(r, codec) for r in rows)
 
     @staticmethod
+    @instrumented
     def get(entity_id: str, record_id: int):
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             row = conn.execute(
                 text("""
                     SELECT id, data, created_at
                     FROM entity_rows
-                    WHERE id = :id AND LOWER(entity_id) = LOWER(:eid)
+                    WHERE id = :id AND entity_id = :eid
                 """),
                 {"id": record_id, "eid": entity_id},
             ).mappings().first()
@@ -42,51 +290,141 @@ class RecordService:
         if not row:
             return None
 
-        return {
-            "id": row["id"],
-            **json.loads(row["data"]),
-            "created_at": row["created_at"],
-        }
+        return RecordService._row(row, CodecService.for_entity(entity_id))
 
     @staticmethod
+    @instrumented
     def create(entity_id: str, data: dict):
-        with engine.begin() as conn:
-            res = conn.execute(
+        ValidationService.validate(entity_id, data)
+        codec = CodecService.for_entity(entity_id)
+
+        def insert(conn):
+            row = conn.execute(
                 text("""
                     INSERT INTO entity_rows (entity_id, data)
                     VALUES (:eid, :data)
+                    RETURNING id, created_at
                 """),
-                {
-                    "eid": entity_id,
-                    "data": json.dumps(data),
-                },
-            )
-            return res.lastrowid
+                {"eid": entity_id, "data": codec.encode(conn, data)},
+            ).mappings().one()
+            return row, RevisionService.bump_rows(conn, entity_id, 1)
+
+        row, revision = write_queue.submit(insert)
+        if change_feed.active:
+            change_feed.rows(entity_id, revision, created=[RecordService._changed(row, data)])
+        return row["id"]
 
     @staticmethod
+    @instrumented
     def update(entity_id: str, record_id: int, data: dict):
-        with engine.begin() as conn:
-            conn.execute(
+        ValidationService.validate(entity_id, data)
+        codec = CodecService.for_entity(entity_id)
+
+        def update(conn):
+            row = conn.execute(
                 text("""
                     UPDATE entity_rows
                     SET data = :data
-                    WHERE id = :id AND LOWER(entity_id) = LOWER(:eid)
+                    WHERE id = :id AND entity_id = :eid
+                    RETURNING id, created_at
                 """),
-                {
-                    "id": record_id,
-                    "eid": entity_id,
-                    "data": json.dumps(data),
-                },
-            )
+                {"id": record_id, "eid": entity_id, "data": codec.encode(conn, data)},
+            ).mappings().first()
+            if row is None:
+                return None, None
+            return row, RevisionService.bump_rows(conn, entity_id)
+
+        row, revision = write_queue.submit(update)
+        if row is not None and change_feed.active:
+            change_feed.rows(entity_id, revision, updated=[RecordService._changed(row, data)])
 
     @staticmethod
+    @instrumented
+    def patch(entity_id: str, patches: list):
+        """
+        Apply merge patches (RFC 7396) to records, all in one transaction.
+        `patches` is a list of {"id": record id, "data": patch}; keys set
+        to null are removed. The merge runs inside SQLite (json_patch, or
+        per position for the positional codec), so a single-cell edit
+        neither sends nor rereads the whole record.
+
+        Each patch is validated against the rules of the fields it sets.
+        Returns the patched records in wire form, in request order; ids
+        that do not exist are left out.
+        """
+        if not isinstance(patches, list):
+            raise ValidationError({"": "Expected a list of {id, data} patches"})
+        if len(patches) > MAX_PATCH_BATCH:
+            raise ValueError(f"At most {MAX_PATCH_BATCH} patches per request")
+
+        items, errors = [], {}
+        for n, item in enumerate(patches):
+            if not isinstance(item, dict) or not isinstance(item.get("data"), dict):
+                errors[str(n)] = f"Patch {n} must be an object with an id and a data object"
+                continue
+            try:
+                record_id = int(item.get("id"))
+            except (TypeError, ValueError):
+                errors[str(n)] = f"Patch {n} has no valid record id"
+                continue
+            try:
+                ValidationService.validate(entity_id, item["data"], partial=True)
+            except ValidationError as e:
+                errors.update({f"{record_id}.{field}": message for field, message in e.errors.items()})
+            items.append((record_id, item["data"]))
+        if errors:
+            raise ValidationError(errors)
+
+        def patch(conn):
+            # Stored codec state: the merge SQL depends on it (see patch_sql)
+            stored = CodecService.load(conn, entity_id)
+            rows = []
+            for record_id, data in items:
+                params = {"id": record_id, "eid": entity_id}
+                row = conn.execute(
+                    text(f"""
+                        UPDATE entity_rows
+                        SET data = {stored.patch_sql(conn, data, params)}
+                        WHERE id = :id AND entity_id = :eid
+                        RETURNING id, data, created_at
+                    """),
+                    params,
+                ).mappings().first()
+                if row is not None:
+                    rows.append(row)
+            return rows, RevisionService.bump_rows(conn, entity_id) if rows else None
+
+        rows, revision = write_queue.submit(patch)
+        count_rows("RecordService.patch", len(rows))
+        codec = CodecService.for_entity(entity_id)
+        with timed("json"):
+            records = WireList(RecordService._row(r, codec) for r in rows)
+        if records:
+            change_feed.rows(entity_id, revision, updated=records)
+        return records
+
+    @staticmethod
+    @instrumented
     def delete(entity_id: str, record_id: int):
-        with engine.begin() as conn:
-            conn.execute(
+        def delete(conn):
+            deleted = conn.execute(
                 text("""
                     DELETE FROM entity_rows
-                    WHERE id = :id AND LOWER(entity_id) = LOWER(:eid)
+                    WHERE id = :id AND entity_id = :eid
+                    RETURNING id
                 """),
                 {"id": record_id, "eid": entity_id},
-            )
+            ).scalars().all()
+            return deleted, RevisionService.bump_rows(conn, entity_id, -len(deleted)) if deleted else None
+
+        deleted, revision = write_queue.submit(delete)
+        if deleted:
+            change_feed.rows(entity_id, revision, deleted=deleted)
 
+    @staticmethod
+    def _changed(row, data: dict) -> Wire:
+        """Wire form of a record just written from `data`, for the change feed."""
+        record = to_wire(data)
+        record["id"] = row["id"]
+        record["createdAt"] = row["created_at"]
+        return record
@@ -0,0 +1,88 @@
+# backend/services/revision_service.py
+from sqlalchemy import text
+from db import read_engine
+from services.stats_service import StatsService
+
+METADATA = "metadata"
+ROWS = "rows"
+
+
+class RevisionService:
+    """
+    Monotonic revision counters used to build ETags.
+
+    Bumps run inside the caller's write transaction so a revision is only
+    visible once the data it describes has been committed. They also keep
+    the entity's summary counts (StatsService) up to date.
+    """
+
+    @staticmethod
+    def _next(conn, name: str) -> int:
+        return conn.execute(
+            text("""
+                INSERT INTO revisions (name, value) VALUES (:name, 1)
+                ON CONFLICT(name) DO UPDATE SET value = value + 1
+                RETURNING value
+            """),
+            {"name": name},
+        ).scalar()
+
+    @staticmethod
+    def bump_metadata(conn, entity_id: str = None) -> int:
+        """Record a metadata write (entity create/update/delete, fields, columns)."""
+        rev = RevisionService._next(conn, METADATA)
+        if entity_id is not None:
+            conn.execute(
+                text("UPDATE entities SET revision = :rev WHERE id = :id"),
+                {"rev": rev, "id": entity_id},
+            )
+            StatsService.metadata_changed(conn, entity_id)
+        return rev
+
+    @staticmethod
+    def bump_rows(conn, entity_id: str, delta: int = 0) -> int:
+        """Record a write to an entity's rows; `delta` is the change in row count."""
+        rev = RevisionService._next(conn, ROWS)
+        conn.execute(
+            text("UPDATE entities SET rows_revision = :rev WHERE id = :id"),
+            {"rev": rev, "id": entity_id},
+        )
+        StatsService.rows_changed(conn, entity_id, delta)
+        return rev
+
+    @staticmethod
+    def current(name: str = METADATA) -> int:
+        with read_engine.connect() as conn:
+            value = conn.execute(
+                text("SELECT value FROM revisions WHERE name = :name"),
+                {"name": name},
+            ).scalar()
+        return value or 0
+
+    @staticmethod
+    def snapshot() -> tuple:
+        """(metadata, rows) global revisions, read together."""
+        with read_engine.connect() as conn:
+            values = dict(conn.execute(
+                text("SELECT name, value FROM revisions WHERE name IN (:m, :r)"),
+                {"m": METADATA, "r": ROWS},
+            ).all())
+        return values.get(METADATA, 0), values.get(ROWS, 0)
+
+    @staticmethod
+    def metadata(entity_id: str):
+        """Metadata revision of one entity (any casing), None if it does not exist."""
+        with read_engine.connect() as conn:
+            return conn.execute(
+                text("SELECT revision FROM entities WHERE id = :id COLLATE NOCASE"),
+                {"id": entity_id},
+            ).scalar()
+
+    @staticmethod
+    def rows(entity_id: str) -> int:
+        with read_engine.connect() as conn:
+            value = conn.execute(
+                text("SELECT rows_revision FROM entities WHERE id = :id"),
+                {"id": entity_id},
+            ).scalar()
+        return value or 0
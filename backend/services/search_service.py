@@ -0,0 +1,217 @@
+# backend/services/search_service.py
+import hashlib
+import json
+from sqlalchemy import text
+from db import read_engine
+from serialization import Wire, WireList
+from instrumentation import count_rows, instrumented, timed
+from services.codec_service import CodecService
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class SearchService:
+    """
+    Full-text search over the fields flagged `searchable` in entity_fields.
+
+    Each entity with searchable fields gets an FTS5 table (rowid =
+    entity_rows.id, one `body` column holding the fields' values) and
+    AFTER INSERT / UPDATE / DELETE triggers on entity_rows that keep it
+    current, so every write path (single records, bulk import, other
+    processes) is covered without any Python involvement.
+
+    The setup is recorded in entity_search and kept in sync from the same
+    transaction that changes entity_fields or the entity's storage codec.
+    A change of fields rebuilds the index from entity_rows in one
+    INSERT ... SELECT; a codec change only recreates the triggers, since
+    the indexed text stays the same.
+    """
+
+    @staticmethod
+    def table_name(entity_id: str) -> str:
+        return "search_" + hashlib.sha1(entity_id.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _literal(value: str) -> str:
+        return "'" + value.replace("'", "''") + "'"
+
+    @staticmethod
+    def _body_sql(codec, fields, column: str) -> str:
+        return " || ' ' || ".join(
+            f"COALESCE({codec.value_sql(f, column)}, '')" for f in fields
+        )
+
+    @staticmethod
+    def _drop_triggers(conn, table: str):
+        for suffix in ("ai", "au", "ad"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_{suffix}"))
+
+    @staticmethod
+    def _create_triggers(conn, entity_id: str, table: str, body: str):
+        eid = SearchService._literal(entity_id)
+        conn.execute(text(f"""
+            CREATE TRIGGER {table}_ai AFTER INSERT ON entity_rows
+            WHEN new.entity_id = {eid}
+            BEGIN
+                INSERT INTO {table} (rowid, body) VALUES (new.id, {body.replace("{row}", "new")});
+            END
+        """))
+        # Updates that leave the text alone (e.g. codec migrations) skip the index
+        conn.execute(text(f"""
+            CREATE TRIGGER {table}_au AFTER UPDATE OF data ON entity_rows
+            WHEN new.entity_id = {eid}
+             AND ({body.replace("{row}", "old")}) IS NOT ({body.replace("{row}", "new")})
+            BEGIN
+                DELETE FROM {table} WHERE rowid = old.id;
+                INSERT INTO {table} (rowid, body) VALUES (new.id, {body.replace("{row}", "new")});
+            END
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER {table}_ad AFTER DELETE ON entity_rows
+            WHEN old.entity_id = {eid}
+            BEGIN
+                DELETE FROM {table} WHERE rowid = old.id;
+            END
+        """))
+
+    @staticmethod
+    def sync(conn, entity_id: str) -> bool:
+        """
+        Bring the search index of `entity_id` in line with entity_fields.
+        Must run inside the caller's write transaction. Returns True if the
+        schema changed.
+        """
+        fields = conn.execute(
+            text("""
+                SELECT name
+                FROM entity_fields
+                WHERE entity_id = :eid AND searchable = 1
+                ORDER BY sort_order, id
+            """),
+            {"eid": entity_id},
+        ).scalars().all()
+        current = conn.execute(
+            text("SELECT fields, source FROM entity_search WHERE entity_id = :eid"),
+            {"eid": entity_id},
+        ).mappings().first()
+        table = SearchService.table_name(entity_id)
+
+        if not fields:
+            if current is None:
+                return False
+            SearchService.remove(conn, entity_id)
+            return True
+
+        codec = CodecService.load(conn, entity_id)
+        if codec.name == "positional":
+            # Give searchable fields a position before the triggers are fixed
+            codec._set_layout(CodecService.extend_layout(conn, entity_id, fields))
+        # `{row}` is replaced by the trigger's new / old row
+        source = SearchService._body_sql(codec, fields, "{row}.data")
+
+        if current is not None and json.loads(current["fields"]) == fields:
+            if current["source"] == source:
+                return False
+            SearchService._drop_triggers(conn, table)
+            SearchService._create_triggers(conn, entity_id, table, source)
+        else:
+            SearchService._drop_triggers(conn, table)
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+            conn.execute(text(f"""
+                CREATE VIRTUAL TABLE {table} USING fts5(
+                    body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+                )
+            """))
+            conn.execute(
+                text(f"""
+                    INSERT INTO {table} (rowid, body)
+                    SELECT id, {SearchService._body_sql(codec, fields, "data")}
+                    FROM entity_rows
+                    WHERE entity_id = :eid
+                """),
+                {"eid": entity_id},
+            )
+            SearchService._create_triggers(conn, entity_id, table, source)
+
+        conn.execute(
+            text("""
+                INSERT OR REPLACE INTO entity_search (entity_id, fields, source)
+                VALUES (:eid, :fields, :source)
+            """),
+            {"eid": entity_id, "fields": json.dumps(fields), "source": source},
+        )
+        return True
+
+    @staticmethod
+    def _match(query: str) -> str:
+        """
+        FTS5 query for free text typed into a quick filter: every word must
+        match as a prefix. Words are quoted, so FTS5 operators and syntax
+        characters in the input are searched for literally.
+        """
+        terms = query.split()
+        if not terms:
+            raise ValueError("Search query is empty")
+        return " ".join('"{}"*'.format(t.replace('"', '""')) for t in terms)
+
+    @staticmethod
+    @instrumented
+    def search(entity_id: str, query: str, limit=None, offset=None):
+        """
+        Records matching `query`, best match first (bm25), in the same
+        envelope as RecordService.list_page: {rowData, rowCount,
+        nextOffset}. `rowCount` is reported once the last page is reached.
+        """
+        # Imported here: record_service imports the entity / codec services
+        from services.record_service import RecordService
+
+        limit = DEFAULT_PAGE_SIZE if limit is None else int(limit)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, int(offset or 0))
+        match = SearchService._match(query)
+
+        with read_engine.connect() as conn:
+            if conn.execute(
+                text("SELECT 1 FROM entity_search WHERE entity_id = :eid"),
+                {"eid": entity_id},
+            ).first() is None:
+                raise ValueError("Entity has no searchable fields")
+
+            table = SearchService.table_name(entity_id)
+            # Rank inside FTS5 first, then fetch only the page's rows
+            rows = conn.execute(
+                text(f"""
+                    SELECT r.id, r.data, r.created_at
+                    FROM (
+                        SELECT rowid, rank
+                        FROM {table}
+                        WHERE {table} MATCH :match
+                        ORDER BY rank
+                        LIMIT :limit OFFSET :offset
+                    ) m
+                    JOIN entity_rows r ON r.id = m.rowid
+                    ORDER BY m.rank, r.id
+                """),
+                {"match": match, "limit": limit + 1, "offset": offset},
+            ).mappings().all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        count_rows("SearchService.search", len(rows))
+
+        codec = CodecService.for_entity(entity_id)
+        with timed("json"):
+            row_data = WireList(RecordService._row(r, codec) for r in rows)
+        return Wire(
+            rowData=row_data,
+            rowCount=None if has_more else offset + len(rows),
+            nextOffset=offset + limit if has_more else None,
+        )
+
+    @staticmethod
+    def remove(conn, entity_id: str):
+        table = SearchService.table_name(entity_id)
+        SearchService._drop_triggers(conn, table)
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(text("DELETE FROM entity_search WHERE entity_id = :eid"), {"eid": entity_id})
@@ -0,0 +1,68 @@
+# backend/services/stats_service.py
+from sqlalchemy import text
+
+# Exact counts for one entity (or all, when :eid is NULL)
+_REFRESH_SQL = """
+    INSERT OR REPLACE INTO entity_stats
+        (entity_id, row_count, field_count, column_count, last_modified)
+    SELECT
+        e.id,
+        (SELECT COUNT(*) FROM entity_rows r WHERE r.entity_id = e.id),
+        (SELECT COUNT(*) FROM entity_fields f WHERE f.entity_id = e.id),
+        (SELECT COUNT(*) FROM entity_columns c WHERE c.entity_id = e.id),
+        CURRENT_TIMESTAMP
+    FROM entities e
+    WHERE :eid IS NULL OR e.id = :eid
+"""
+
+
+class StatsService:
+    """
+    Per-entity summary counts (entity_stats) served with the entity list.
+
+    Maintained incrementally inside the caller's write transaction, from
+    RevisionService's bumps, so the counts commit together with the rows
+    and metadata they describe and never need a scan of entity_rows.
+    """
+
+    @staticmethod
+    def refresh(conn, entity_id: str = None):
+        """Recount one entity, or every entity. Used by migrations and seeding."""
+        conn.execute(text(_REFRESH_SQL), {"eid": entity_id})
+
+    @staticmethod
+    def metadata_changed(conn, entity_id: str):
+        res = conn.execute(
+            text("""
+                UPDATE entity_stats
+                SET field_count = (SELECT COUNT(*) FROM entity_fields WHERE entity_id = :eid),
+                    column_count = (SELECT COUNT(*) FROM entity_columns WHERE entity_id = :eid),
+                    last_modified = CURRENT_TIMESTAMP
+                WHERE entity_id = :eid
+            """),
+            {"eid": entity_id},
+        )
+        if res.rowcount == 0:
+            # First write for a new entity
+            StatsService.refresh(conn, entity_id)
+
+    @staticmethod
+    def rows_changed(conn, entity_id: str, delta: int = 0):
+        res = conn.execute(
+            text("""
+                UPDATE entity_stats
+                SET row_count = row_count + :delta,
+                    last_modified = CURRENT_TIMESTAMP
+                WHERE entity_id = :eid
+            """),
+            {"eid": entity_id, "delta": delta},
+        )
+        if res.rowcount == 0:
+            StatsService.refresh(conn, entity_id)
+
+    @staticmethod
+    def remove(conn, entity_id: str):
+        conn.execute(
+            text("DELETE FROM entity_stats WHERE entity_id = :eid"),
+            {"eid": entity_id},
+        )
@@ -0,0 +1,187 @@
+# backend/services/validation_service.py
+import threading
+from datetime import date
+from instrumentation import instrumented
+from services.entity_service import EntityService
+
+
+class ValidationError(ValueError):
+    """A record failed its entity's field rules; `errors` maps field -> message."""
+
+    def __init__(self, errors: dict):
+        super().__init__("; ".join(errors.values()))
+        self.errors = errors
+
+
+def _is_empty(value) -> bool:
+    # Mirrors SchemaForm.tsx: undefined, null, blank string or empty array
+    return (
+        value is None
+        or (isinstance(value, str) and value.strip() == "")
+        or (isinstance(value, list) and len(value) == 0)
+    )
+
+
+def _js_str(value) -> str:
+    """String(value) as the UI computes it, so requiredIf.equals matches both sides."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_date(value) -> bool:
+    if not isinstance(value, str):
+        return False
+    try:
+        date.fromisoformat(value[:10])
+    except ValueError:
+        return False
+    return True
+
+
+# Field type -> (predicate, message suffix). Types not listed are not checked.
+_TYPE_CHECKS = {
+    "text": (lambda v: isinstance(v, str), "must be text"),
+    "number": (_is_number, "must be a number"),
+    "checkbox": (lambda v: isinstance(v, bool), "must be true or false"),
+    "date": (_is_date, "must be a date (YYYY-MM-DD)"),
+}
+
+
+class ValidationService:
+    """
+    Server-side version of the rules SchemaForm.tsx enforces: required,
+    requiredIf (equals / present), field types and select option sets.
+
+    Each entity's fields are compiled once into a list of closures; the
+    compiled validator is cached per entity and rebuilt when the entity's
+    metadata revision changes.
+    """
+
+    _validators = {}  # lowercased entity id -> (revision, validator)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _required_check(field: dict):
+        name = field["name"]
+        message = f"{field.get('label') or name} is required"
+
+        if field.get("required"):
+            return lambda data: message if _is_empty(data.get(name)) else None
+
+        rule = field.get("requiredIf")
+        if not isinstance(rule, dict) or not rule.get("field"):
+            return None
+
+        other = rule["field"]
+        if rule.get("operator") == "present":
+            def check(data):
+                if not _is_empty(data.get(other)) and _is_empty(data.get(name)):
+                    return message
+            return check
+
+        if rule.get("operator") in (None, "equals"):
+            expected = _js_str(rule.get("value"))
+
+            def check(data):
+                # String(undefined) never equals a configured value in the UI
+                if other in data and _js_str(data[other]) == expected and _is_empty(data.get(name)):
+                    return message
+            return check
+
+        return None
+
+    @staticmethod
+    def _value_check(field: dict):
+        name = field["name"]
+        label = field.get("label") or name
+
+        if field.get("type") == "select" and field.get("options"):
+            key = field.get("optionValue") or "value"
+            allowed = {
+                _js_str(o.get(key) if isinstance(o, dict) else o)
+                for o in field["options"]
+            }
+
+            def check(data):
+                value = data.get(name)
+                if not _is_empty(value) and _js_str(value) not in allowed:
+                    return f"{label} must be one of the listed options"
+            return check
+
+        if field.get("type") in _TYPE_CHECKS:
+            predicate, suffix = _TYPE_CHECKS[field["type"]]
+            message = f"{label} {suffix}"
+
+            def check(data):
+                value = data.get(name)
+                if not _is_empty(value) and not predicate(value):
+                    return message
+            return check
+
+        return None
+
+    @staticmethod
+    def compile(entity: dict):
+        """
+        Build a validator(data, partial=False) -> {field: message} for
+        compiled entity metadata. A partial check (merge patches) only runs
+        the rules of the fields present in `data`, so requiredIf rules on
+        fields outside it are not rechecked.
+        """
+        checks = []
+        for field in entity["fields"]:
+            for build in (ValidationService._required_check, ValidationService._value_check):
+                check = build(field)
+                if check is not None:
+                    checks.append((field["name"], check))
+
+        def validate(data: dict, partial: bool = False) -> dict:
+            errors = {}
+            for name, check in checks:
+                if name in errors or (partial and name not in data):
+                    continue
+                message = check(data)
+                if message:
+                    errors[name] = message
+            return errors
+
+        return validate
+
+    @staticmethod
+    def validator(entity_id: str):
+        """Cached validator for an entity, or None if the entity does not exist."""
+        entity = EntityService.get_full(entity_id)
+        if not entity:
+            return None
+
+        key = entity["id"].lower()
+        cached = ValidationService._validators.get(key)
+        if cached is not None and cached[0] == entity["revision"]:
+            return cached[1]
+
+        validate = ValidationService.compile(entity)
+        with ValidationService._lock:
+            ValidationService._validators[key] = (entity["revision"], validate)
+        return validate
+
+    @staticmethod
+    @instrumented
+    def validate(entity_id: str, data: dict, partial: bool = False):
+        """Raise ValidationError if `data` breaks the entity's field rules."""
+        validate = ValidationService.validator(entity_id)
+        if validate is None:
+            return
+        if not isinstance(data, dict):
+            raise ValidationError({"": "Expected a JSON object"})
+        errors = validate(data, partial)
+        if errors:
+            raise ValidationError(errors)
@@ -0,0 +1,116 @@
+# backend/services/write_queue.py
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from db import ASYNC_DRIVER, engine
+
+
+class WriteQueue:
+    """
+    Group commit for small writes.
+
+    `submit(op)` hands `op(conn)` to a single writer thread, which collects
+    whatever else arrives within `window` seconds (up to `max_batch` ops)
+    and runs the lot in one transaction, so a burst of grid edits pays one
+    commit instead of one per request. The caller blocks until its batch
+    has committed and gets back its own op's return value.
+
+    If a batch fails, its ops are retried one transaction each, so only the
+    op that actually failed raises (in its own caller) and the others still
+    commit. Ops may therefore run more than once and must keep all of their
+    effects inside `conn`: nothing in memory may change until `submit` has
+    returned (e.g. codecs only extend their layout through the
+    transaction, see CodecService.extend_layout).
+
+    When disabled (the default), or under the async driver where the
+    engine can only be driven from the request's greenlet, `submit` runs
+    the op in its own transaction on the calling thread.
+    """
+
+    def __init__(self, enabled: bool = False, window: float = 0.002, max_batch: int = 64):
+        self.enabled = enabled and not ASYNC_DRIVER
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.ops = 0
+        self.batches = 0
+        self.retried = 0
+        self.largest_batch = 0
+
+    def submit(self, op):
+        if not self.enabled:
+            with engine.begin() as conn:
+                return op(conn)
+
+        self._ensure_started()
+        future = Future()
+        self._queue.put((op, future))
+        return future.result()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            with engine.begin() as conn:
+                results = [op(conn) for op, _ in batch]
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Isolate the failing op; everything else still commits
+            with self._lock:
+                self.retried += len(batch)
+            for item in batch:
+                self._flush([item])
+            return
+
+        with self._lock:
+            self.ops += len(batch)
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(batch))
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "window_ms": self.window * 1000,
+                "max_batch": self.max_batch,
+                "ops": self.ops,
+                "batches": self.batches,
+                "largest_batch": self.largest_batch,
+                "retried": self.retried,
+                "pending": self._queue.qsize(),
+            }
+
+
+write_queue = WriteQueue(
+    os.environ.get("WRITE_BATCHING") == "1",
+    float(os.environ.get("WRITE_BATCH_WINDOW_MS", "2")) / 1000,
+    int(os.environ.get("WRITE_BATCH_SIZE", "64")),
+)
@@ -0,0 +1,68 @@
+# backend/tests/conftest.py
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+# db.py reads DB_FILE at import: point it at a scratch database first
+_TMP = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ["DB_FILE"] = os.path.join(_TMP, "test.db")
+os.environ.setdefault("CHANGE_FEED", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from migrate_db import init_database  # noqa: E402
+
+init_database(seed=False)
+
+
+def entity_definition(entity_id: str) -> dict:
+    """create_full payload with a few typed, filterable columns."""
+    fields = [
+        {"name": "title", "label": "Title", "type": "text", "required": True, "searchable": True},
+        {"name": "amount", "label": "Amount", "type": "number"},
+        {"name": "status", "label": "Status", "type": "text"},
+    ]
+    return {
+        "id": entity_id,
+        "title": entity_id.title(),
+        "api": f"/api/data/{entity_id}",
+        "formType": "schema",
+        "fields": [dict(f, sortOrder=i) for i, f in enumerate(fields)],
+        "columns": [
+            {"headerName": f["label"], "field": f["name"], "sortOrder": i}
+            for i, f in enumerate(fields)
+        ],
+        "actions": [],
+    }
+
+
+@pytest.fixture
+def entity():
+    """A fresh entity (plain JSON codec); deleted afterwards."""
+    from services.entity_service import EntityService
+
+    entity_id = f"test{uuid.uuid4().hex[:8]}"
+    EntityService.create_full(entity_definition(entity_id))
+    yield entity_id
+    EntityService.delete(entity_id)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Flask test client."""
+    from app import create_app
+
+    return create_app().test_client()
+
+
+@pytest.fixture(params=["json", "positional"])
+def any_entity(request, entity):
+    """`entity` stored with each codec."""
+    from services.codec_service import CodecService
+
+    if request.param != "json":
+        for _ in CodecService.migrate(entity, request.param):
+            pass
+    return entity
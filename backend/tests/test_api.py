@@ -0,0 +1,104 @@
+# backend/tests/test_api.py
+import json
+import pytest
+from conftest import entity_definition
+
+
+@pytest.mark.parametrize("path", ["bulk-delete", "bulk-update"])
+@pytest.mark.parametrize("body", [[1, 2], "ids", 3])
+def test_bulk_endpoints_expect_an_object(client, entity, path, body):
+    res = client.post(f"/api/data/{entity}/{path}", json=body)
+    assert res.status_code == 400
+    assert res.json == {"error": "Expected a JSON object"}
+
+
+
+def test_codec_put_expects_an_object(client, entity):
+    res = client.put(f"/api/admin/entities/{entity}/codec", json=["positional"])
+    assert res.status_code == 400
+    assert res.json == {"error": "Expected a JSON object"}
+
+
+@pytest.mark.parametrize("body", [{"intervalMs": 0}, {"intervalMs": -1}, {"slowMs": 0}, {"slowMs": "fast"},
+                                  {"intervalMs": float("nan")}, {"intervalMs": "often"}])
+def test_profiler_rejects_non_positive_settings(client, body):
+    before = client.get("/health/profiler").json
+    res = client.put("/health/profiler", json=body)
+    assert res.status_code == 400
+    assert client.get("/health/profiler").json == before
+
+
+def test_profiler_interval_is_in_milliseconds(client):
+    before = client.get("/health/profiler").json
+    try:
+        res = client.put("/health/profiler", json={"intervalMs": 2})
+        assert res.status_code == 200 and res.json["intervalMs"] == 2
+        res = client.put("/health/profiler", json={"intervalMs": "x"})
+        assert res.json == {"error": "intervalMs must be a number"}
+    finally:
+        client.put("/health/profiler", json={"intervalMs": before["intervalMs"]})
+
+
+def test_malformed_filter_is_a_bad_request(client, entity):
+    for spec in ('["title"]', '{"title": "Ada"}', '{"title": {"filterType": "text", "type": "equals"}}'):
+        res = client.get(f"/api/data/{entity}", query_string={"limit": 10, "filter": spec})
+        assert res.status_code == 400, spec
+        res = client.post(f"/api/data/{entity}/bulk-delete", json={"filter": json.loads(spec)})
+        assert res.status_code == 400, spec
+
+
+@pytest.mark.parametrize("paged", [False, True])
+def test_record_list_etag(client, entity, paged):
+    url = f"/api/data/{entity}" + ("?limit=10" if paged else "")
+    tag = client.get(url).headers["ETag"]
+    res = client.get(url, headers={"If-None-Match": tag})
+    assert res.status_code == 304 and res.headers["ETag"] == tag
+
+    record_id = client.post(f"/api/data/{entity}", json={"title": "Ada"}).json
+    res = client.get(url, headers={"If-None-Match": tag})
+    assert res.status_code == 200 and res.headers["ETag"] != tag
+
+    for write in (lambda: client.patch(f"/api/data/{entity}/{record_id}", json={"amount": 1}),
+                  lambda: client.delete(f"/api/data/{entity}/{record_id}")):
+        tag = client.get(url).headers["ETag"]
+        write()
+        assert client.get(url, headers={"If-None-Match": tag}).status_code == 200
+
+
+@pytest.mark.parametrize("prefix", ["/api/entity", "/api/admin/entities"])
+def test_entity_metadata_etag(client, entity, prefix):
+    url = f"{prefix}/{entity}"
+    tag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": tag}).status_code == 304
+
+    # Record writes leave the metadata tag alone, metadata writes change it
+    client.post(f"/api/data/{entity}", json={"title": "Ada"})
+    assert client.get(url, headers={"If-None-Match": tag}).status_code == 304
+
+    definition = entity_definition(entity)
+    definition["title"] = "Renamed"
+    client.put(f"/api/admin/entities/{entity}", json=definition)
+    res = client.get(url, headers={"If-None-Match": tag})
+    assert res.status_code == 200 and res.headers["ETag"] != tag
+    assert res.json["title"] == "Renamed"
+
+
+@pytest.mark.parametrize("url", ["/api/entity/", "/api/admin/entities"])
+def test_entity_list_etag(client, entity, url):
+    tag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": tag}).status_code == 304
+
+    client.put(f"/api/admin/entities/{entity}", json=dict(entity_definition(entity), title="Renamed"))
+    assert client.get(url, headers={"If-None-Match": tag}).status_code == 200
+
+
+def test_entity_list_etag_follows_row_counts(client, entity):
+    tag = client.get("/api/entity/").headers["ETag"]
+    client.post(f"/api/data/{entity}", json={"title": "Ada"})
+    res = client.get("/api/entity/", headers={"If-None-Match": tag})
+    assert res.status_code == 200
+    assert next(e for e in res.json if e["id"] == entity)["rowCount"] == 1
+
+
+def test_unknown_entity_is_not_cached(client):
+    assert client.get("/api/entity/nope", headers={"If-None-Match": '"m-1"'}).status_code == 404
@@ -0,0 +1,99 @@
+# backend/tests/test_bulk.py
+import pytest
+from services.bulk_service import BulkService
+from services.record_service import RecordService
+from services.validation_service import ValidationError
+
+
+@pytest.fixture
+def records(any_entity):
+    ids = [RecordService.create(any_entity, {"title": f"Row {n}", "amount": n, "status": "open"})
+           for n in range(10)]
+    return any_entity, ids
+
+
+def _by_title(entity_id: str) -> dict:
+    return {r["title"]: r for r in RecordService.list(entity_id)}
+
+
+def test_update_by_ids(records):
+    entity_id, ids = records
+    result = BulkService.update_where(entity_id, {"status": "done", "note": "x"}, ids=ids[:3] + [10 ** 9])
+    assert result == {"updated": 3, "chunks": 1}
+    rows = _by_title(entity_id)
+    assert [rows[f"Row {n}"]["status"] for n in range(4)] == ["done", "done", "done", "open"]
+    assert rows["Row 0"]["note"] == "x" and rows["Row 0"]["amount"] == 0
+
+
+def test_update_by_filter_in_chunks_removes_nulled_fields(records):
+    entity_id, _ = records
+    over = {"amount": {"filterType": "number", "type": "greaterThanOrEqual", "filter": 5}}
+    result = BulkService.update_where(entity_id, {"status": None}, filters=over, chunk_size=2)
+    assert result == {"updated": 5, "chunks": 3}
+    rows = _by_title(entity_id)
+    assert "status" not in rows["Row 7"] and rows["Row 4"]["status"] == "open"
+
+
+def test_delete_by_filter_and_ids(records):
+    entity_id, ids = records
+    under = {"amount": {"filterType": "number", "type": "lessThan", "filter": 3}}
+    assert BulkService.delete_where(entity_id, filters=under, chunk_size=2) == {"deleted": 3, "chunks": 2}
+    # ids and filter together select the intersection
+    assert BulkService.delete_where(entity_id, ids=ids[:5], filters={
+        "amount": {"filterType": "number", "type": "equals", "filter": 4},
+    }) == {"deleted": 1, "chunks": 1}
+    assert sorted(_by_title(entity_id)) == [f"Row {n}" for n in (3, 5, 6, 7, 8, 9)]
+    assert BulkService.count(entity_id) == 6
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"ids": "1,2"},
+    {"ids": ["a"]},
+    {"filters": ["amount"]},
+    {"filters": {"nope": {"filterType": "text", "type": "equals", "filter": 1}}},
+])
+def test_bad_selection(records, kwargs):
+    entity_id, _ = records
+    with pytest.raises(ValueError):
+        BulkService.delete_where(entity_id, **kwargs)
+    with pytest.raises(ValueError):
+        BulkService.update_where(entity_id, {"status": "x"}, **kwargs)
+    assert BulkService.count(entity_id) == 10
+
+
+def test_update_values_are_validated(records):
+    entity_id, ids = records
+    for values in ({}, ["status"], {"title": ""}):
+        with pytest.raises(ValidationError):
+            BulkService.update_where(entity_id, values, ids=ids)
+
+
+def test_bulk_endpoints(client, records):
+    entity_id, ids = records
+    res = client.post(f"/api/data/{entity_id}/bulk-update", query_string={"chunk_size": 2},
+                      json={"set": {"status": "done"}, "ids": ids[:5]})
+    assert res.status_code == 200 and res.json == {"updated": 5, "chunks": 3}
+    res = client.post(f"/api/data/{entity_id}/bulk-delete", json={"filter": {
+        "status": {"filterType": "text", "type": "equals", "filter": "done"},
+    }})
+    assert res.status_code == 200 and res.json["deleted"] == 5
+    assert BulkService.count(entity_id) == 5
+
+
+def test_bulk_endpoint_errors(client, records):
+    entity_id, ids = records
+    res = client.post(f"/api/data/{entity_id}/bulk-update", json={"set": {"amount": "x"}, "ids": ids})
+    assert res.status_code == 400 and set(res.json["errors"]) == {"amount"}
+    assert client.post(f"/api/data/{entity_id}/bulk-delete", json={}).status_code == 400
+    assert client.post("/api/data/nope/bulk-delete", json={"ids": ids}).status_code == 404
+    assert BulkService.count(entity_id) == 10
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_export_streams_every_row(client, records, fmt):
+    entity_id, _ = records
+    res = client.get(f"/api/data/{entity_id}/export", query_string={"format": fmt})
+    assert res.status_code == 200 and "X-Row-Count" not in res.headers
+    lines = res.get_data(as_text=True).splitlines()
+    assert len(lines) == 10 + (fmt == "csv")
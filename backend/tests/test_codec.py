@@ -0,0 +1,95 @@
+# backend/tests/test_codec.py
+import pytest
+from sqlalchemy import text
+from db import engine
+from services.codec_service import CodecService, migrations
+from services.record_service import RecordService
+from services.revision_service import RevisionService
+
+
+@pytest.fixture
+def positional(entity):
+    for _ in CodecService.migrate(entity, "positional"):
+        pass
+    return entity
+
+
+def _stored(record_id: int) -> str:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT data FROM entity_rows WHERE id = :id"), {"id": record_id}).scalar()
+
+
+def test_positional_round_trip(positional):
+    record_id = RecordService.create(positional, {"title": "Ada", "amount": 3})
+    assert _stored(record_id).startswith("[")
+    record = RecordService.get(positional, record_id)
+    assert record["title"] == "Ada" and record["amount"] == 3
+
+
+def test_rolled_back_layout_is_not_cached(positional):
+    codec = CodecService.for_entity(positional)
+    layout = list(codec.layout)
+    with pytest.raises(RuntimeError):
+        with engine.begin() as conn:
+            codec.encode(conn, {"title": "Ada", "nickname": "Countess"})
+            raise RuntimeError("rollback")
+    assert codec.layout == layout
+
+    record_id = RecordService.create(positional, {"title": "Ada", "nickname": "Countess"})
+    assert RecordService.get(positional, record_id)["nickname"] == "Countess"
+    assert [r["title"] for r in RecordService.list(positional)] == ["Ada"]
+
+
+def test_patch_after_rollback(positional):
+    record_id = RecordService.create(positional, {"title": "Ada", "amount": 1})
+    codec = CodecService.for_entity(positional)
+    with pytest.raises(RuntimeError):
+        with engine.begin() as conn:
+            codec.patch_sql(conn, {"nickname": "Countess"}, {})
+            raise RuntimeError("rollback")
+
+    [record] = RecordService.patch(positional, [{"id": record_id, "data": {"amount": 2, "nickname": "Countess"}}])
+    assert record["amount"] == 2 and record["nickname"] == "Countess"
+    assert RecordService.get(positional, record_id) == record
+
+
+def test_decode_skips_unknown_positions(positional):
+    codec = CodecService.for_entity(positional)
+    extra = len(codec.layout) + 3
+    assert codec.decode(f'["Ada"{", 1" * extra}]')["title"] == "Ada"
+
+
+def test_interrupted_migration_resumes(entity, monkeypatch):
+    ids = [RecordService.create(entity, {"title": f"Row {n}", "amount": n}) for n in range(5)]
+    # A client that disconnected after the first batch
+    reports = CodecService.migrate(entity, "positional", batch_size=2)
+    next(reports)
+    reports.close()
+    assert CodecService.info(entity)["migrating"]
+
+    monkeypatch.setattr(migrations, "spawn", lambda fn: fn())
+    assert entity in migrations.resume()
+    info = CodecService.info(entity)
+    assert info["codec"] == "positional" and not info["migrating"]
+    assert all(_stored(record_id).startswith("[") for record_id in ids)
+    assert RecordService.get(entity, ids[3])["amount"] == 3
+
+
+def test_switch_by_another_process_is_seen(entity):
+    record_id = RecordService.create(entity, {"title": "Ada", "amount": 1})
+    assert CodecService.for_entity(entity).name == "json"
+    # What another worker's migration leaves behind: this process' cache is not told
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO entity_codecs (entity_id, codec, layout, migrating) "
+                 "VALUES (:eid, 'json', '[\"title\", \"amount\"]', 1)"),
+            {"eid": entity},
+        )
+        conn.execute(text("UPDATE entity_rows SET data = '[\"Ada\", 1]' WHERE id = :id"), {"id": record_id})
+        RevisionService.bump_metadata(conn, entity)
+
+    assert CodecService.for_entity(entity).migrating
+    page = RecordService.list_page(entity, filters={"amount": {"filterType": "number", "type": "equals", "filter": 1}})
+    assert [r["id"] for r in page["rowData"]] == [record_id]
+    [record] = RecordService.patch(entity, [{"id": record_id, "data": {"amount": 2}}])
+    assert record["title"] == "Ada" and record["amount"] == 2
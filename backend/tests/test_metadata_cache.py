@@ -0,0 +1,36 @@
+# backend/tests/test_metadata_cache.py
+from sqlalchemy import text
+from db import engine
+from services.entity_service import EntityService
+from services.revision_service import RevisionService
+from services.validation_service import ValidationService
+
+
+def _edit_elsewhere(entity_id: str, sql: str):
+    """A metadata write made by another process: this one's caches are not told."""
+    with engine.begin() as conn:
+        conn.execute(text(sql), {"eid": entity_id})
+        RevisionService.bump_metadata(conn, entity_id)
+
+
+def test_cached_metadata_follows_other_processes(entity):
+    assert EntityService.get_full(entity)["title"] == entity.title()
+    assert EntityService.get_full(entity) is EntityService.get_full(entity)
+
+    _edit_elsewhere(entity, "UPDATE entities SET title = 'Renamed' WHERE id = :eid")
+    meta = EntityService.get_full(entity)
+    assert meta["title"] == "Renamed"
+    assert meta["revision"] == RevisionService.metadata(entity)
+
+
+def test_validation_rules_follow_other_processes(entity):
+    assert ValidationService.validator(entity)({"title": "Ada"}) == {}
+    _edit_elsewhere(entity, "UPDATE entity_fields SET required = 1 WHERE entity_id = :eid AND name = 'amount'")
+    assert "amount" in ValidationService.validator(entity)({"title": "Ada"})
+
+
+def test_deleted_elsewhere(entity):
+    assert EntityService.get_full(entity)
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM entities WHERE id = :eid"), {"eid": entity})
+    assert EntityService.get_full(entity) is None
@@ -0,0 +1,28 @@
+# backend/tests/test_options.py
+import pytest
+from services import options_service
+from services.options_service import OptionsService, OptionsUnresolved
+
+FIELD = {"name": "country", "type": "dynamic-select", "optionsAPI": "/api/countries?region={region}"}
+ENTITY = {"fields": [FIELD]}
+
+
+def test_relative_source_without_base_url_is_unresolved(monkeypatch):
+    monkeypatch.setattr(options_service, "OPTIONS_BASE_URL", None)
+    with pytest.raises(OptionsUnresolved) as e:
+        OptionsService.field_options(FIELD, {"region": "EU"})
+    assert e.value.url == "/api/countries?region=EU"
+    assert OptionsService.options_for(ENTITY, {"region": "EU"}) == {
+        "country": {"optionsAPI": "/api/countries?region=EU"}
+    }
+
+
+def test_source_url_stays_on_allowed_hosts(monkeypatch):
+    monkeypatch.setattr(options_service, "OPTIONS_BASE_URL", "http://options.internal/")
+    monkeypatch.setattr(options_service, "OPTIONS_ALLOWED_HOSTS", {"lookup.example.com"})
+    source = OptionsService._source_url
+    assert source("/api/countries", {}) == "http://options.internal/api/countries"
+    assert source("https://lookup.example.com/{q}", {"q": "a/b"}) == "https://lookup.example.com/a%2Fb"
+    for template in ("http://169.254.169.254/latest", "//evil.example/x", "file:///etc/passwd"):
+        with pytest.raises(OptionsUnresolved):
+            source(template, {})
@@ -0,0 +1,57 @@
+# backend/tests/test_patch.py
+import pytest
+from services.record_service import RecordService
+from services.revision_service import RevisionService
+from services.validation_service import ValidationError
+
+
+def _records(entity_id: str) -> dict:
+    return {r["id"]: r for r in RecordService.list(entity_id)}
+
+
+def test_null_removes_a_key(any_entity):
+    record_id = RecordService.create(any_entity, {"title": "Ada", "amount": 1, "status": "draft"})
+    [record] = RecordService.patch(any_entity, [{"id": record_id, "data": {"status": None, "amount": 2}}])
+    assert record["amount"] == 2 and record["title"] == "Ada"
+    assert "status" not in record
+    assert "status" not in RecordService.get(any_entity, record_id)
+
+
+def test_missing_ids_are_left_out(any_entity):
+    record_id = RecordService.create(any_entity, {"title": "Ada"})
+    records = RecordService.patch(any_entity, [{"id": 0, "data": {"amount": 1}},
+                                               {"id": record_id, "data": {"amount": 2}}])
+    assert [r["id"] for r in records] == [record_id]
+
+    revision = RevisionService.rows(any_entity)
+    assert RecordService.patch(any_entity, [{"id": 0, "data": {"amount": 1}}]) == []
+    assert RevisionService.rows(any_entity) == revision
+
+
+def test_batch_is_all_or_nothing(any_entity):
+    ada = RecordService.create(any_entity, {"title": "Ada", "amount": 1})
+    alan = RecordService.create(any_entity, {"title": "Alan", "amount": 2})
+    before = _records(any_entity)
+
+    with pytest.raises(ValidationError) as e:
+        RecordService.patch(any_entity, [{"id": ada, "data": {"amount": 10}},
+                                         {"id": alan, "data": {"amount": "many"}},
+                                         {"id": ada, "data": {"title": None}}])
+    assert set(e.value.errors) == {f"{alan}.amount", f"{ada}.title"}
+    assert _records(any_entity) == before
+
+
+@pytest.mark.parametrize("body", [{"id": 1}, [{"id": 1}], [{"id": "x", "data": {}}]])
+def test_malformed_batch_is_a_bad_request(client, entity, body):
+    res = client.patch(f"/api/data/{entity}", json=body)
+    assert res.status_code == 400 and "errors" in res.json
+
+
+def test_patch_endpoint(client, entity):
+    record_id = client.post(f"/api/data/{entity}", json={"title": "Ada", "status": "draft"}).json
+    res = client.patch(f"/api/data/{entity}/{record_id}", json={"status": None})
+    assert res.status_code == 200 and "status" not in res.json
+
+    assert client.patch(f"/api/data/{entity}/0", json={"amount": 1}).status_code == 404
+    res = client.patch(f"/api/data/{entity}/{record_id}", json={"amount": "x"})
+    assert res.status_code == 400 and set(res.json["errors"]) == {f"{record_id}.amount"}
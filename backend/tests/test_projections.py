@@ -0,0 +1,96 @@
+# backend/tests/test_projections.py
+import json
+import pytest
+from sqlalchemy import text
+from conftest import entity_definition
+from db import engine, read_engine
+from services.entity_service import EntityService
+from services.projection_service import ProjectionService
+from services.record_service import RecordService
+
+
+def _index(entity_id: str, *fields):
+    definition = entity_definition(entity_id)
+    for column in definition["columns"]:
+        column["indexed"] = column["field"] in fields
+    EntityService.update_full(entity_id, definition)
+
+
+def _projections(entity_id: str) -> dict:
+    return ProjectionService.for_entity(EntityService.get_full(entity_id))
+
+
+def _schema(name: str) -> dict:
+    with read_engine.connect() as conn:
+        column = next((c for c in conn.execute(text("PRAGMA table_xinfo(entity_rows)")).mappings()
+                       if c["name"] == name), None)
+        index = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = :n"),
+            {"n": f"idx_entity_rows_{name}"},
+        ).scalar()
+    return {"column": column, "index": index}
+
+
+@pytest.fixture
+def indexed(any_entity):
+    _index(any_entity, "amount", "title")
+    for title, amount in [("Ada", 9), ("Grace", 10), ("Alan", 2.5), ("Linus", None), ("Ken", 100)]:
+        RecordService.create(any_entity, {"title": title, "amount": amount} if amount is not None else {"title": title})
+    return any_entity
+
+
+def test_typed_partial_projection(indexed):
+    projections = _projections(indexed)
+    assert set(projections) == {"amount", "title"}
+    amount, title = _schema(projections["amount"]), _schema(projections["title"])
+    assert amount["column"]["type"] == "NUMERIC" and title["column"]["type"] == "TEXT"
+    assert f"WHERE entity_id = '{indexed}'" in amount["index"]
+
+
+def test_sort_and_filter_through_projection(indexed):
+    page = RecordService.list_page(indexed, sort="amount")
+    assert [r["title"] for r in page["rowData"]] == ["Linus", "Alan", "Ada", "Grace", "Ken"]
+    page = RecordService.list_page(indexed, sort="-amount", limit=2)
+    page = RecordService.list_page(indexed, sort="-amount", limit=2, cursor=page["nextCursor"])
+    assert [r["title"] for r in page["rowData"]] == ["Ada", "Alan"]
+    page = RecordService.list_page(indexed, sort="title", filters={
+        "amount": {"filterType": "number", "type": "inRange", "filter": 5, "filterTo": 50},
+    })
+    assert [r["title"] for r in page["rowData"]] == ["Ada", "Grace"]
+
+
+def test_numeric_text_sorts_as_number(entity):
+    _index(entity, "amount")
+    with engine.begin() as conn:
+        # Written by an older client: a number stored as text
+        conn.execute(
+            text("INSERT INTO entity_rows (entity_id, data) VALUES (:eid, :data)"),
+            [{"eid": entity, "data": json.dumps({"title": t, "amount": a})} for t, a in
+             [("nine", 9), ("ten", 10), ("eight", "8")]],
+        )
+    page = RecordService.list_page(entity, sort="amount")
+    assert [r["title"] for r in page["rowData"]] == ["eight", "nine", "ten"]
+
+
+def test_sort_uses_projection_index(indexed):
+    name = _projections(indexed)["amount"]
+    with read_engine.connect() as conn:
+        plan = " ".join(r[3] for r in conn.execute(
+            text(f"EXPLAIN QUERY PLAN SELECT id FROM entity_rows WHERE entity_id = :eid ORDER BY {name}, id"),
+            {"eid": indexed},
+        ))
+    assert f"idx_entity_rows_{name}" in plan and "TEMP B-TREE" not in plan
+
+
+def test_turning_indexed_off_drops_projection(indexed):
+    name = _projections(indexed)["amount"]
+    _index(indexed, "title")
+    assert set(_projections(indexed)) == {"title"}
+    assert _schema(name) == {"column": None, "index": None}
+    with read_engine.connect() as conn:
+        assert conn.execute(
+            text("SELECT COUNT(*) FROM entity_projections WHERE column_name = :n"), {"n": name}
+        ).scalar() == 0
+    # Sorting falls back to the stored value
+    page = RecordService.list_page(indexed, sort="amount")
+    assert [r["title"] for r in page["rowData"]] == ["Linus", "Alan", "Ada", "Grace", "Ken"]
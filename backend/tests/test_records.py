@@ -0,0 +1,129 @@
+# backend/tests/test_records.py
+import pytest
+from services.aggregate_service import AggregateService
+from services.record_service import RecordService
+from services.revision_service import RevisionService
+
+ROWS = [
+    {"title": "Ada", "amount": 10, "status": "active"},
+    {"title": "Grace", "amount": 20, "status": "archived"},
+    {"title": "Alan", "amount": 30, "status": "active"},
+    {"title": "Linus", "amount": 40},
+]
+
+
+@pytest.fixture
+def records(any_entity):
+    for row in ROWS:
+        RecordService.create(any_entity, row)
+    return any_entity
+
+
+def _titles(entity_id: str, filters) -> list:
+    page = RecordService.list_page(entity_id, sort="title", filters=filters)
+    return [r["title"] for r in page["rowData"]]
+
+
+@pytest.mark.parametrize("filters, titles", [
+    ({"status": {"filterType": "text", "type": "equals", "filter": "active"}}, ["Ada", "Alan"]),
+    ({"title": {"filterType": "text", "type": "startsWith", "filter": "A"}}, ["Ada", "Alan"]),
+    ({"amount": {"filterType": "number", "type": "inRange", "filter": 15, "filterTo": 35}}, ["Alan", "Grace"]),
+    ({"status": {"filterType": "text", "type": "blank"}}, ["Linus"]),
+    ({"status": {"filterType": "set", "values": ["archived"]}}, ["Grace"]),
+    ({"amount": {"filterType": "number", "operator": "OR", "conditions": [
+        {"filterType": "number", "type": "lessThan", "filter": 15},
+        {"filterType": "number", "type": "greaterThan", "filter": 35},
+    ]}}, ["Ada", "Linus"]),
+    ({"title": {"filterType": "text", "operator": "AND",
+                "condition1": {"type": "startsWith", "filter": "A"},
+                "condition2": {"type": "notContains", "filter": "d"}}}, ["Alan"]),
+])
+def test_filters(records, filters, titles):
+    assert _titles(records, filters) == titles
+
+
+@pytest.mark.parametrize("filters", [
+    ["status"],
+    {"status": "active"},
+    {"status": ["active"]},
+    {"status": {"filterType": "text", "filter": "active"}},
+    {"status": {"filterType": "text", "type": "equals"}},
+    {"status": {"filterType": "text", "type": "like", "filter": "a"}},
+    {"status": {"filterType": "multi", "filterModels": []}},
+    {"status": {"filterType": "set", "values": "active"}},
+    {"amount": {"filterType": "number", "operator": "XOR", "conditions": [{"type": "equals", "filter": 1}]}},
+    {"amount": {"filterType": "number", "operator": "OR", "conditions": []}},
+    {"amount": {"filterType": "number", "operator": "OR", "conditions": [{"type": "equals"}]}},
+    {"nope": {"filterType": "text", "type": "equals", "filter": "x"}},
+])
+def test_invalid_filters_raise_value_error(records, filters):
+    with pytest.raises(ValueError):
+        RecordService.list_page(records, filters=filters)
+    with pytest.raises(ValueError):
+        AggregateService.aggregate(records, filters=filters)
+
+
+def test_combined_filter_aggregate(records):
+    result = AggregateService.aggregate(records, aggs=[("amount", "sum")], filters={
+        "amount": {"filterType": "number", "operator": "OR", "conditions": [
+            {"type": "equals", "filter": 10}, {"type": "equals", "filter": 40},
+        ]},
+    })
+    assert result["totals"]["amount"] == 50
+
+
+def _walk(entity_id: str, limit: int, **kwargs) -> list:
+    """Every page of list_page, following nextCursor."""
+    pages, cursor = [], None
+    while True:
+        page = RecordService.list_page(entity_id, limit=limit, cursor=cursor, **kwargs)
+        pages.append([r["title"] for r in page["rowData"]])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            return pages
+
+
+def test_cursor_paging_default_order(records):
+    assert _walk(records, 3) == [["Linus", "Alan", "Grace"], ["Ada"]]
+
+
+@pytest.mark.parametrize("sort, titles", [
+    ("amount", ["Ada", "Grace", "Alan", "Linus"]),
+    ("-amount", ["Linus", "Alan", "Grace", "Ada"]),
+    # NULLs sort first ascending and last descending, ties fall back to id
+    ("status", ["Linus", "Ada", "Alan", "Grace"]),
+    ("-status", ["Grace", "Alan", "Ada", "Linus"]),
+])
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_cursor_paging_sorted(records, sort, titles, limit):
+    pages = _walk(records, limit, sort=sort)
+    assert [t for page in pages for t in page] == titles
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_cursor_paging_with_filter_and_row_count(records):
+    active = {"status": {"filterType": "text", "type": "equals", "filter": "active"}}
+    first = RecordService.list_page(records, limit=1, sort="title", filters=active, start_row=0)
+    assert [r["title"] for r in first["rowData"]] == ["Ada"] and first["rowCount"] is None
+    last = RecordService.list_page(records, limit=1, sort="title", filters=active,
+                                   cursor=first["nextCursor"], start_row=1)
+    assert [r["title"] for r in last["rowData"]] == ["Alan"]
+    assert last["nextCursor"] is None and last["rowCount"] == 2
+
+
+@pytest.mark.parametrize("kwargs", [{"cursor": "not a cursor"}, {"sort": "nope"}])
+def test_bad_paging_arguments(records, kwargs):
+    with pytest.raises(ValueError):
+        RecordService.list_page(records, **kwargs)
+
+
+def test_writes_to_missing_records_change_nothing(client, records):
+    revision = RevisionService.rows(records)
+    tag = client.get(f"/api/data/{records}").headers["ETag"]
+    list_tag = client.get("/api/entity/").headers["ETag"]
+
+    RecordService.update(records, 0, {"title": "Nobody"})
+    RecordService.delete(records, 0)
+    assert RevisionService.rows(records) == revision
+    assert client.get(f"/api/data/{records}", headers={"If-None-Match": tag}).status_code == 304
+    assert client.get("/api/entity/", headers={"If-None-Match": list_tag}).status_code == 304
@@ -0,0 +1,91 @@
+# backend/tests/test_search.py
+import pytest
+from sqlalchemy import text
+from conftest import entity_definition
+from db import read_engine
+from services.bulk_service import BulkService
+from services.entity_service import EntityService
+from services.record_service import RecordService
+from services.search_service import SearchService
+
+
+def _found(entity_id: str, query: str) -> list:
+    return sorted(r["title"] for r in SearchService.search(entity_id, query)["rowData"])
+
+
+def _schema(entity_id: str) -> set:
+    table = SearchService.table_name(entity_id)
+    with read_engine.connect() as conn:
+        return set(conn.execute(
+            text("SELECT name FROM sqlite_master WHERE name = :t OR tbl_name = 'entity_rows' AND name LIKE :t || '_%'"),
+            {"t": table},
+        ).scalars())
+
+
+def _set_searchable(entity_id: str, names: set):
+    definition = entity_definition(entity_id)
+    for field in definition["fields"]:
+        field["searchable"] = field["name"] in names
+    EntityService.update_full(entity_id, definition)
+
+
+def test_index_follows_every_write(any_entity):
+    table = SearchService.table_name(any_entity)
+    assert _schema(any_entity) == {table, f"{table}_ai", f"{table}_au", f"{table}_ad"}
+
+    ada = RecordService.create(any_entity, {"title": "Ada Lovelace", "status": "draft"})
+    RecordService.create(any_entity, {"title": "Alan Turing"})
+    list(BulkService.import_rows(any_entity, [(1, {"title": "Grace Hopper"})]))
+    assert _found(any_entity, "a") == ["Ada Lovelace", "Alan Turing"]
+    assert _found(any_entity, "hop") == ["Grace Hopper"]
+    # Only searchable fields are indexed
+    assert _found(any_entity, "draft") == []
+
+    RecordService.update(any_entity, ada, {"title": "Augusta King"})
+    assert _found(any_entity, "lovelace") == []
+    assert _found(any_entity, "augusta") == ["Augusta King"]
+    RecordService.patch(any_entity, [{"id": ada, "data": {"title": "Ada King"}}])
+    assert _found(any_entity, "king") == ["Ada King"]
+
+    RecordService.delete(any_entity, ada)
+    assert _found(any_entity, "king") == []
+
+
+def test_searchable_switch(entity):
+    RecordService.create(entity, {"title": "Ada", "status": "active"})
+    _set_searchable(entity, {"title", "status"})
+    assert _found(entity, "active") == ["Ada"]
+
+    _set_searchable(entity, set())
+    assert _schema(entity) == set()
+    with pytest.raises(ValueError):
+        SearchService.search(entity, "ada")
+
+    # Turning it back on indexes the existing rows
+    _set_searchable(entity, {"status"})
+    assert _found(entity, "act") == ["Ada"] and _found(entity, "ada") == []
+
+
+def test_offset_paging(entity):
+    for n in range(5):
+        RecordService.create(entity, {"title": f"Report {n}"})
+
+    seen, offset = [], None
+    while True:
+        page = SearchService.search(entity, "report", limit=2, offset=offset)
+        seen += [r["title"] for r in page["rowData"]]
+        offset = page["nextOffset"]
+        if offset is None:
+            break
+        assert page["rowCount"] is None
+    assert sorted(seen) == [f"Report {n}" for n in range(5)]
+    assert page["rowCount"] == 5
+
+
+def test_search_endpoint(client, entity):
+    RecordService.create(entity, {"title": "Ada"})
+    res = client.get(f"/api/data/{entity}/search", query_string={"q": "ad"})
+    assert res.status_code == 200 and [r["title"] for r in res.json["rowData"]] == ["Ada"]
+    # FTS5 syntax in the input is searched for literally, not parsed
+    assert client.get(f"/api/data/{entity}/search", query_string={"q": 'ada OR "'}).status_code == 200
+    assert client.get(f"/api/data/{entity}/search", query_string={"q": " "}).status_code == 400
@@ -0,0 +1,26 @@
+# backend/tests/test_startup.py
+import os
+import subprocess
+import sys
+import time
+
+from bench.runner import STARTUP_BUDGET_MS, STARTUP_SCRIPT
+from db import DB_FILE
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_create_app_within_startup_budget():
+    """
+    The cold start benchmark.py --startup-budget-ms checks. The best of a
+    few runs is held to the budget, so a busy test machine does not fail it.
+    """
+    env = dict(os.environ, DB_FILE=DB_FILE, CHANGE_FEED="0")
+    timings = []
+    for _ in range(3):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], check=True, cwd=BACKEND, env=env,
+                       stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    best = min(timings)
+    assert best <= STARTUP_BUDGET_MS, f"create_app took {best:.0f} ms, budget {STARTUP_BUDGET_MS} ms"
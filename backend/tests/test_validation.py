@@ -0,0 +1,80 @@
+# backend/tests/test_validation.py
+import pytest
+from conftest import entity_definition
+from services.entity_service import EntityService
+from services.validation_service import ValidationError, ValidationService
+
+FIELDS = [
+    {"name": "title", "label": "Title", "type": "text", "required": True},
+    {"name": "amount", "label": "Amount", "type": "number"},
+    {"name": "due", "label": "Due", "type": "date"},
+    {"name": "done", "label": "Done", "type": "checkbox"},
+    {"name": "kind", "label": "Kind", "type": "select",
+     "options": [{"value": 1, "label": "One"}, {"value": "two", "label": "Two"}]},
+    {"name": "reason", "label": "Reason", "type": "text",
+     "requiredIf": {"field": "done", "value": True}},
+    {"name": "note", "label": "Note", "type": "text",
+     "requiredIf": {"field": "kind", "operator": "present"}},
+]
+
+validate = ValidationService.compile({"fields": FIELDS})
+
+
+@pytest.mark.parametrize("data, invalid", [
+    ({"title": "Ada"}, set()),
+    ({"title": "  "}, {"title"}),
+    ({"title": 1}, {"title"}),
+    ({"title": "Ada", "amount": 1.5}, set()),
+    ({"title": "Ada", "amount": True}, {"amount"}),
+    ({"title": "Ada", "amount": "1"}, {"amount"}),
+    ({"title": "Ada", "due": "2024-02-29"}, set()),
+    ({"title": "Ada", "due": "2024-02-29T10:00:00Z"}, set()),
+    ({"title": "Ada", "due": "2023-02-29"}, {"due"}),
+    ({"title": "Ada", "due": "29/02/2024"}, {"due"}),
+    ({"title": "Ada", "done": False}, set()),
+    ({"title": "Ada", "done": 1}, {"done"}),
+    ({"title": "Ada", "done": "yes"}, {"done"}),
+    ({"title": "Ada", "kind": "1", "note": "n"}, set()),
+    ({"title": "Ada", "kind": "three", "note": "n"}, {"kind"}),
+])
+def test_field_rules(data, invalid):
+    assert set(validate(data)) == invalid
+
+
+def test_required_if():
+    assert set(validate({"title": "Ada", "done": True})) == {"reason"}
+    assert validate({"title": "Ada", "done": True, "reason": "shipped"}) == {}
+    assert set(validate({"title": "Ada", "kind": "two"})) == {"note"}
+
+
+def test_partial_validation_checks_only_the_given_fields():
+    # A patch leaving title out is fine; a patch blanking it is not
+    assert validate({"amount": 2}, partial=True) == {}
+    assert set(validate({"title": None}, partial=True)) == {"title"}
+    assert set(validate({"amount": "2"}, partial=True)) == {"amount"}
+    # requiredIf rules only run for fields present in the patch
+    assert validate({"done": True}, partial=True) == {}
+    assert set(validate({"done": True, "reason": ""}, partial=True)) == {"reason"}
+
+
+def test_validate_raises_with_field_errors(entity):
+    with pytest.raises(ValidationError) as e:
+        ValidationService.validate(entity, {"amount": "x"})
+    assert set(e.value.errors) == {"title", "amount"}
+    with pytest.raises(ValidationError):
+        ValidationService.validate(entity, ["title"])
+    ValidationService.validate(entity, {"amount": 1}, partial=True)
+
+
+def test_validator_is_rebuilt_on_metadata_change(entity):
+    before = ValidationService.validator(entity)
+    assert ValidationService.validator(entity) is before
+    assert before({"title": "Ada", "amount": "x"})
+
+    definition = entity_definition(entity)
+    definition["fields"][1]["type"] = "text"
+    EntityService.update_full(entity, definition)
+
+    after = ValidationService.validator(entity)
+    assert after is not before
+    assert after({"title": "Ada", "amount": "x"}) == {}
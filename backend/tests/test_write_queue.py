@@ -0,0 +1,52 @@
+# backend/tests/test_write_queue.py
+import threading
+import pytest
+from services import record_service
+from services.codec_service import CodecService
+from services.record_service import RecordService
+from services.write_queue import WriteQueue
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    # A long window so that concurrent submits share one batch
+    queue = WriteQueue(enabled=True, window=0.2)
+    monkeypatch.setattr(record_service, "write_queue", queue)
+    return queue
+
+
+def test_failed_batch_retries_and_reads_back(any_entity, queue):
+    codec = CodecService.for_entity(any_entity)
+    start = threading.Barrier(5)
+    results, errors = {}, []
+
+    def create(n):
+        start.wait()
+        results[n] = RecordService.create(any_entity, {"title": f"Row {n}", f"extra{n}": n})
+
+    def fail(conn):
+        # Extends the layout like a real write, then breaks the batch
+        codec.encode(conn, {"title": "Broken", "broken": True})
+        raise RuntimeError("op failed")
+
+    def submit_failing():
+        start.wait()
+        try:
+            queue.submit(fail)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=create, args=(n,)) for n in range(4)]
+    threads.append(threading.Thread(target=submit_failing))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(errors) == 1
+    assert queue.stats()["retried"] == 5
+    for n, record_id in results.items():
+        record = RecordService.get(any_entity, record_id)
+        assert record["title"] == f"Row {n}" and record[f"extra{n}"] == n
+    assert "broken" not in CodecService.for_entity(any_entity).layout
+    assert len(RecordService.list(any_entity)) == 4
@@ -64,6 +64,15 @@ export function ColumnsTab({ columns, update, add, remove }: ColumnsTabProps) {
                 }
                 label="Hide column"
               />
+              <FormControlLabel
+                control={
+                  <Switch
+                    checked={!!c.indexed}
+                    onChange={(e) => update(i, { indexed: e.target.checked })}
+                  />
+                }
+                label="Index for sorting / filtering"
+              />
               <Button color="error" onClick={() => remove(i)} size="small">
                 Remove
               </Button>
@@ -81,6 +90,7 @@ export function ColumnsTab({ columns, update, add, remove }: ColumnsTabProps) {
             renderer: "",
             rendererParams: {},
             hide: false,
+            indexed: false,
           })
         }
       >
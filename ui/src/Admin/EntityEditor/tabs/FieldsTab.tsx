@@ -146,6 +146,18 @@ export function FieldsTab({ fields, update, add, remove }: FieldsTabProps) {
                 label="Required"
               />
 
+              <FormControlLabel
+                control={
+                  <Switch
+                    checked={!!f.searchable}
+                    onChange={(e) =>
+                      updateField(i, { searchable: e.target.checked })
+                    }
+                  />
+                }
+                label="Searchable (full-text)"
+              />
+
               <FormControlLabel
                 control={
                   <Switch
@@ -256,6 +268,7 @@ export function FieldsTab({ fields, update, add, remove }: FieldsTabProps) {
             label: "",
             type: "text",
             required: false,
+            searchable: false,
             requiredIf: undefined,
             readOnly: false,
           })
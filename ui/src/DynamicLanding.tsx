@@ -121,6 +121,7 @@ export function DynamicLanding() {
               }
             >
               {e.title}
+              {e.rowCount != null && ` (${e.rowCount})`}
             </Button>
           );
         })}
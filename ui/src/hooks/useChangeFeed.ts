@@ -0,0 +1,114 @@
+// ui/src/hooks/useChangeFeed.ts
+import { useEffect, useRef } from "react";
+import { BASE_URL } from "./useFetchAPI";
+
+export type RowsEvent = {
+  entity: string;
+  revision: number;
+  created?: any[];
+  updated?: any[];
+  deleted?: number[];
+  reload?: boolean; // too many rows changed (bulk import): refetch
+};
+
+export type MetadataEvent = {
+  entity: string;
+  revision: number;
+  deleted: boolean;
+};
+
+export type ChangeFeedHandlers = {
+  onRows?: (event: RowsEvent) => void;
+  onMetadata?: (event: MetadataEvent) => void;
+  // Events are not replayed: anything sent while disconnected is lost
+  onReconnect?: () => void;
+};
+
+const MAX_RETRY_MS = 30_000;
+
+/**
+ * Follows the backend change feed (backend/realtime.py) for one entity, or
+ * the metadata of all entities when `entityId` is undefined.
+ *
+ * Speaks the Socket.IO v5 / Engine.IO v4 protocol over a plain WebSocket
+ * (default namespace, events only), which is all the feed needs.
+ * Returns a ref that is true while subscribed.
+ */
+export function useChangeFeed(
+  entityId: string | undefined,
+  handlers: ChangeFeedHandlers
+) {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+  const connected = useRef(false);
+
+  useEffect(() => {
+    const url =
+      BASE_URL.replace(/^http/, "ws") + "/socket.io/?EIO=4&transport=websocket";
+    let socket: WebSocket | null = null;
+    let retry = 1000;
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    let opened = false;
+    let closed = false;
+
+    const connect = () => {
+      socket = new WebSocket(url);
+
+      socket.onmessage = ({ data }) => {
+        if (typeof data !== "string") return;
+        if (data === "2") return socket?.send("3"); // ping -> pong
+        if (data.startsWith("0")) return socket?.send("40"); // open -> join "/"
+        if (data.startsWith("40")) {
+          socket?.send(
+            "42" + JSON.stringify(["subscribe", entityId ? { entity: entityId } : null])
+          );
+          connected.current = true;
+          retry = 1000;
+          if (opened) handlersRef.current.onReconnect?.();
+          opened = true;
+          return;
+        }
+        if (data.startsWith("42")) {
+          const [name, payload] = JSON.parse(data.slice(2));
+          if (name === "rows") handlersRef.current.onRows?.(payload);
+          else if (name === "metadata") handlersRef.current.onMetadata?.(payload);
+        }
+      };
+
+      socket.onclose = () => {
+        connected.current = false;
+        if (closed) return;
+        timer = setTimeout(connect, retry);
+        retry = Math.min(retry * 2, MAX_RETRY_MS);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      connected.current = false;
+      clearTimeout(timer);
+      socket?.close();
+    };
+  }, [entityId]);
+
+  return connected;
+}
+
+/** Apply a rows event to a list of records (newest first, as listed); updates replace the record. */
+export function applyRowsEvent<T extends { id: number }>(
+  rows: T[],
+  event: RowsEvent
+): T[] {
+  const updated = new Map((event.updated ?? []).map((r) => [r.id, r]));
+  const deleted = new Set(event.deleted ?? []);
+  const known = new Set(rows.map((r) => r.id));
+  const created = (event.created ?? []).filter((r) => !known.has(r.id));
+
+  return [
+    ...created.reverse(),
+    ...rows
+      .filter((r) => !deleted.has(r.id))
+      .map((r) => updated.get(r.id) ?? r),
+  ];
+}
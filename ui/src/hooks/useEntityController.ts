@@ -1,5 +1,8 @@
 import { useEffect, useState, useCallback } from "react";
+import { useQueryClient } from "@tanstack/react-query";
 import { useAPI } from "../hooks/useAPI";
+import { applyRowsEvent, useChangeFeed } from "../hooks/useChangeFeed";
+import { BASE_URL, useFetchAPI } from "../hooks/useFetchAPI";
 
 export type Entity = {
   id: string;
@@ -11,6 +14,10 @@ export type Entity = {
   formType: "schema" | "component";
   actions?: any[];
   rows?: any[];
+  rowCount?: number;
+  fieldCount?: number;
+  columnCount?: number;
+  lastModified?: string;
 };
 
 export function useEntityController() {
@@ -70,6 +77,33 @@ export function useEntityController() {
       .finally(() => setLoading((prev) => ({ ...prev, rows: false })));
   }, [activeEntity?.api]);
 
+  /** Reload rows, bypassing the GET cache (changes may come from other clients) */
+  const queryClient = useQueryClient();
+  const { fetchInternal } = useFetchAPI();
+  const reloadRows = useCallback(async () => {
+    if (!activeEntity?.api) return;
+    const rows = await fetchInternal<any[]>(activeEntity.api, { cache: false });
+    setActiveEntity((prev) => prev && { ...prev, rows: rows ?? [] });
+  }, [activeEntity?.api, fetchInternal]);
+
+  /** Patch rows in place from the backend change feed */
+  const feedConnected = useChangeFeed(activeEntity?.id, {
+    onRows: (event) => {
+      // The cached GET of the list no longer matches
+      queryClient.invalidateQueries({
+        predicate: (q) => q.queryKey[1] === `${BASE_URL}${activeEntity?.api}`,
+      });
+      if (event.reload) {
+        reloadRows();
+        return;
+      }
+      setActiveEntity(
+        (prev) => prev && { ...prev, rows: applyRowsEvent(prev.rows ?? [], event) }
+      );
+    },
+    onReconnect: reloadRows,
+  });
+
   /** CRUD submit handler */
   const submitEntityData = useCallback(
     async (data: any, mode: "create" | "edit") => {
@@ -84,9 +118,11 @@ export function useEntityController() {
 
         await fetchRows(url, { method, body: data });
 
-        // Refresh rows after submit
-        const updatedRows = await fetchRows(activeEntity.api);
-        setActiveEntity((prev) => prev && { ...prev, rows: updatedRows ?? [] });
+        // The change feed patches the grid; refetch only without it
+        if (!feedConnected.current) {
+          const updatedRows = await fetchRows(activeEntity.api);
+          setActiveEntity((prev) => prev && { ...prev, rows: updatedRows ?? [] });
+        }
       } catch (err) {
         console.error("Failed to submit:", err);
       }
@@ -2,7 +2,7 @@
 import { useCallback } from "react";
 import { useQueryClient } from "@tanstack/react-query";
 
-const BASE_URL =
+export const BASE_URL =
   window.location.hostname === "localhost"
     ? "http://127.0.0.1:5050"
     : "https://metadata-driven-dynamic-forms.onrender.com";
@@ -19,6 +19,39 @@ export type FetchOptions = {
 
 const DEFAULT_TTL = 5 * 60 * 1000;
 
+/** Path of a cached GET's URL, without BASE_URL and query string */
+const pathOf = (fullUrl: string) => fullUrl.slice(BASE_URL.length).split("?")[0];
+
+const ENTITY_URL = /^\/api\/(data|entity|admin\/entities)\/([^/?]+)/;
+const ENTITY_LISTS = ["/api/entity", "/api/entity/", "/api/admin/entities"];
+
+/**
+ * Which cached GET paths a write to `url` can change. A record write
+ * changes its entity's record endpoints and the entity lists (row
+ * counts); a metadata write also changes the entity's metadata, options
+ * and bootstrap. Writes outside an entity change every GET.
+ */
+const affectedBy = (url: string): ((path: string) => boolean) => {
+  const match = url.match(ENTITY_URL);
+  if (!match) return () => true;
+  const [, area, entityId] = match;
+  const prefixes = [`/api/data/${entityId}`];
+  if (area !== "data") {
+    prefixes.push(`/api/entity/${entityId}`, `/api/admin/entities/${entityId}`);
+  }
+  return (path) => {
+    // Entity ids resolve case-insensitively on the server
+    const p = path.toLowerCase();
+    return (
+      ENTITY_LISTS.includes(p) ||
+      prefixes.some((prefix) => {
+        const pre = prefix.toLowerCase();
+        return p === pre || p.startsWith(pre + "/");
+      })
+    );
+  };
+};
+
 export function useFetchAPI() {
   const queryClient = useQueryClient();
 
@@ -82,9 +115,12 @@ export function useFetchAPI() {
       const result = await executor();
 
       if (method !== "GET") {
+        const affected = affectedBy(url);
         queryClient.invalidateQueries({
           predicate: (q) =>
-            Array.isArray(q.queryKey) && q.queryKey[0] === "GET",
+            Array.isArray(q.queryKey) &&
+            q.queryKey[0] === "GET" &&
+            affected(pathOf(String(q.queryKey[1]))),
         });
       }
 
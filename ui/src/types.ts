@@ -29,6 +29,8 @@ export interface FieldConfig {
     operator?: "equals" | "present";
   };
   readOnly?: boolean;
+  // Include in the entity's full-text search index
+  searchable?: boolean;
   options?: { label: string; value: string | number }[];
   optionsAPI?: string;
   optionLabel?: string; // default: "label"